@@ -1,20 +1,31 @@
 import argparse
+import contextlib
+import json
+import sys
 from pathlib import Path
+from typing import Dict, List
 
+from al_tools import db
 from al_tools.core import (
     generate_audio,
+    generate_audio_all_locales,
     AudioExistsAction,
     generate_joined_source_fields,
     ambiguity_detection,
+    audit_query_plans,
     csv2sqlite,
     sqlite2csv,
     export_review,
     import_review,
+    load_in_memory,
+    write_if_changed,
 )
-from al_tools.registry import DeckRegistry
+from al_tools.registry import Deck, DeckRegistry
 from al_tools.content import ContentGenerator, generate_deck_overview_page
+from al_tools.crowdanki import build_decks
 from al_tools.deck_creator import create_625_deck
 from al_tools.i18n import get_apkg_filename, get_language_name
+from al_tools.tts_cache import TtsCache
 
 
 def _locale_to_directory(locale: str) -> str:
@@ -40,14 +51,14 @@ def cli():
         "--locale",
         type=str,
         required=True,
-        help="Locale (e.g., en_us, ES_ES - case insensitive)",
+        help="Locale (e.g., en_us, ES_ES - case insensitive), or 'all' for all locales with TTS voices",
     )
     audio_parser.add_argument(
         "-o",
         "--output",
         type=str,
         default=None,
-        help="Output audio folder (default: src/media/audio/{LOCALE})",
+        help="Output audio folder (default: src/media/audio/{LOCALE}). With --locale all, the folder containing the locale folders (default: src/media/audio)",
     )
     audio_parser.add_argument(
         "-d", "--database", type=str, default="data.db", help="Database file path"
@@ -78,11 +89,81 @@ def cli():
         "--delay",
         type=float,
         default=1.0,
-        help="Delay in seconds between TTS requests to avoid rate limiting (default: 1.0, accepts decimals like 0.5 or 1.5)",
+        help="Delay in seconds between TTS requests to avoid rate limiting (default: 1.0, accepts decimals like 0.5 or 1.5). Ignored if --requests-per-minute is given",
+    )
+    audio_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of TTS requests kept in flight concurrently (default: 1)",
+    )
+    audio_parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=None,
+        help="Maximum number of TTS requests per minute (default: derived from --delay)",
+    )
+    audio_parser.add_argument(
+        "--characters-per-minute",
+        type=float,
+        default=None,
+        help="Maximum number of characters sent to TTS per minute (default: unlimited)",
+    )
+    audio_parser.add_argument(
+        "--family-limit",
+        type=str,
+        action="append",
+        default=[],
+        metavar="FAMILY=RPM",
+        help="Maximum TTS requests per minute for a voice family, e.g. Studio=30 or Gemini=10. Can be given multiple times. Only used with --locale all",
+    )
+    audio_parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="TTS cache directory (default: $XDG_CACHE_HOME/ankilangs/tts)",
+    )
+    audio_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the TTS API, don't read or write the TTS cache",
+    )
+
+    cache_parser = subparsers.add_parser(
+        "cache",
+        help="Show or prune the TTS audio cache",
+        description="Inspect or shrink the local cache of synthesized TTS audio. The cache is keyed by voice, model, input text or SSML and audio config, so regenerating audio with identical input doesn't call the TTS API again. Pruning removes the least recently used entries first.",
+    )
+    cache_parser.add_argument("action", choices=["stats", "prune"])
+    cache_parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="TTS cache directory (default: $XDG_CACHE_HOME/ankilangs/tts)",
+    )
+    cache_parser.add_argument(
+        "--max-size",
+        type=float,
+        default=1024,
+        help="Size limit in MB that prune shrinks the cache to (default: 1024)",
+    )
+
+    # Options of the commands that only read the database
+    in_memory_parser = argparse.ArgumentParser(add_help=False)
+    in_memory_parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Import the CSV files into an in-memory database instead of using the database file (no freshness check)",
+    )
+    in_memory_parser.add_argument(
+        "--save-db",
+        action="store_true",
+        help="With --in-memory, save the in-memory database to the database file afterwards",
     )
 
     generate_parser = subparsers.add_parser(
         "generate",
+        parents=[in_memory_parser],
         help="Generate files in 'generated' folder from SQLite",
         description="Generate derived CSV files with joined source and license information from the SQLite database. These files are used by Brainbrew during the deck build process. Also ensures all vocabulary keys exist in all base language files and translation pair files.",
     )
@@ -102,6 +183,7 @@ def cli():
 
     check_parser = subparsers.add_parser(
         "check",
+        parents=[in_memory_parser],
         help="Check for data quality issues in SQLite",
         description="Detect ambiguous words missing hints, duplicate keys in CSV files, and audio file mismatches between the database and disk. Ambiguous words are those that appear multiple times with different meanings but lack disambiguation hints (pronunciation, reading, listening, or spelling hints).",
     )
@@ -117,6 +199,18 @@ def cli():
         help="Automatically fix audio issues: remove DB references for missing files and delete unreferenced files from disk",
     )
 
+    query_plan_parser = subparsers.add_parser(
+        "query-plan",
+        help="Check that hot queries use an index",
+        description="Print the EXPLAIN QUERY PLAN output of the hot query shapes (import-review updates by GUID, the sqlite2csv and export-review reads of a locale or translation pair, and check --auto-fix updates by key and locale) and exit with an error if any of them scans a whole table.",
+    )
+    query_plan_parser.add_argument(
+        "-d", "--database", type=str, default="data.db", help="Database file path"
+    )
+    query_plan_parser.add_argument(
+        "--data-dir", type=str, default="src/data", help="Data folder with CSV files"
+    )
+
     csv2sqlite_parser = subparsers.add_parser(
         "csv2sqlite",
         help="Import CSV files to SQLite",
@@ -138,6 +232,11 @@ def cli():
         action="store_true",
         help="Exit with error if database has unsaved edits (for scripts/CI)",
     )
+    csv2sqlite_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-import CSV files that changed since the last sync (falls back to a full import if the database has unsaved edits)",
+    )
 
     sqlite2csv_parser = subparsers.add_parser(
         "sqlite2csv",
@@ -163,6 +262,7 @@ def cli():
 
     export_review_parser = subparsers.add_parser(
         "export-review",
+        parents=[in_memory_parser],
         help="Export review data for native speakers",
         description="Export translation pairs, hints, and audio for native speaker review. Creates a CSV file, an Excel file with formatting and column protection, and a concatenated MP3 audio file with all target language pronunciations. The Excel file has frozen headers, auto-filters, and protects key columns from editing.",
     )
@@ -228,6 +328,7 @@ def cli():
 
     release_parser = subparsers.add_parser(
         "release",
+        parents=[in_memory_parser],
         help="Release management commands",
         description="Manage deck releases and versioning. Use --list to show all registered decks with their current versions, latest release versions, and AnkiWeb upload status.",
     )
@@ -247,6 +348,12 @@ def cli():
     release_parser.add_argument(
         "--list", action="store_true", help="List all decks and their status"
     )
+    release_parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format of --list (default: table)",
+    )
     release_parser.add_argument(
         "--registry",
         type=str,
@@ -257,6 +364,41 @@ def cli():
         "-d", "--database", type=str, default="data.db", help="Database file path"
     )
 
+    build_parser = subparsers.add_parser(
+        "build",
+        parents=[in_memory_parser],
+        help="Build the CrowdAnki decks from SQLite",
+        description="Build the CrowdAnki folder of each deck in the registry (build/<tag_name>/deck.json and media) directly from the SQLite database. Replaces the generate and Brainbrew steps of the build. Notes without a GUID get a new one in the database.",
+    )
+    build_parser.add_argument(
+        "deck_ids", nargs="*", help="Deck IDs to build (default: all decks)"
+    )
+    build_parser.add_argument(
+        "-d", "--database", type=str, default="data.db", help="Database file path"
+    )
+    build_parser.add_argument(
+        "--data-dir", type=str, default="src/data", help="Data folder with CSV files"
+    )
+    build_parser.add_argument(
+        "--registry",
+        type=str,
+        default="decks.yaml",
+        help="Path to deck registry file",
+    )
+    build_parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="build",
+        help="Output directory for the deck folders",
+    )
+    build_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of decks to build in parallel processes (default: 1)",
+    )
+
     generate_website_parser = subparsers.add_parser(
         "generate-website",
         help="Generate website pages from source content",
@@ -326,327 +468,426 @@ def cli():
     )
 
     args = parser.parse_args()
+    in_memory = getattr(args, "in_memory", False)
+    if getattr(args, "save_db", False) and not in_memory:
+        parser.error("--save-db requires --in-memory")
+
+    # Keep stdout for the result when it is JSON
+    log = sys.stderr if getattr(args, "format", None) == "json" else sys.stdout
+
+    # One connection to the database for the whole command
+    with db.session():
+        if in_memory:
+            with contextlib.redirect_stdout(log):
+                load_in_memory(
+                    Path(getattr(args, "data_dir", "src/data")), Path(args.database)
+                )
 
-    if args.command == "audio":
-        # Normalize locale to lowercase
-        locale = args.locale.lower()
+        if args.command == "audio":
+            # Normalize locale to lowercase
+            locale = args.locale.lower()
+            seed = args.seed if args.seed == "random" else int(args.seed)
+            tts_cache = (
+                None
+                if args.no_cache
+                else TtsCache(Path(args.cache_dir) if args.cache_dir else None)
+            )
 
-        # Deduce output directory if not provided
-        if args.output is None:
-            locale_dir = _locale_to_directory(locale)
-            output = Path("src/media/audio") / locale_dir
-        else:
-            output = Path(args.output)
-
-        seed = args.seed if args.seed == "random" else int(args.seed)
-        generate_audio(
-            Path(args.database),
-            locale,
-            output,
-            AudioExistsAction(args.action),
-            Path(args.data_dir),
-            seed=seed,
-            limit=args.limit,
-            delay=args.delay,
-        )
-    elif args.command == "generate":
-        generate_joined_source_fields(
-            Path(args.database), Path(args.output), Path(args.data_dir)
-        )
-    elif args.command == "check":
-        output = ambiguity_detection(
-            Path(args.database), Path(args.data_dir), auto_fix=args.auto_fix
-        )
-        print(output)
-    elif args.command == "csv2sqlite":
-        csv2sqlite(
-            Path(args.input),
-            Path(args.database),
-            force=args.force,
-            fail_if_conflict=args.fail_if_conflict,
-        )
-    elif args.command == "sqlite2csv":
-        sqlite2csv(
-            Path(args.database),
-            Path(args.output),
-            force=args.force,
-            fail_if_conflict=args.fail_if_conflict,
-        )
-    elif args.command == "export-review":
-        keys = None
-        if args.keys_file:
-            keys_path = Path(args.keys_file)
-            keys = [
-                line.strip()
-                for line in keys_path.read_text().splitlines()
-                if line.strip()
-            ]
-        export_review(
-            Path(args.database),
-            args.source,
-            args.target,
-            Path(args.output),
-            Path(args.media_dir),
-            Path(args.data_dir),
-            keys=keys,
-        )
-    elif args.command == "import-review":
-        import_review(
-            Path(args.file),
-            Path(args.database),
-            args.source,
-            args.target,
-            Path(args.media_dir),
-            Path(args.data_dir),
-        )
-    elif args.command == "release":
-        if args.list:
-            registry = DeckRegistry(Path(args.registry))
-            print_deck_list(registry, Path(args.database))
-        elif args.deck_id and args.finalize:
-            registry = DeckRegistry(Path(args.registry))
-            finalize_release(registry, args.deck_id, Path(args.finalize))
-        elif args.deck_id:
-            if not args.version:
-                print("Error: --version is required when releasing a deck")
+            if locale == "all":
+                family_limits = {}
+                for family_limit in args.family_limit:
+                    family, _, rate = family_limit.partition("=")
+                    try:
+                        family_limits[family] = float(rate)
+                    except ValueError:
+                        parser.error(
+                            f"invalid --family-limit '{family_limit}', expected FAMILY=RPM"
+                        )
+                generate_audio_all_locales(
+                    Path(args.database),
+                    Path(args.output or "src/media/audio"),
+                    AudioExistsAction(args.action),
+                    Path(args.data_dir),
+                    seed=seed,
+                    limit=args.limit,
+                    delay=args.delay,
+                    workers=args.workers,
+                    requests_per_minute=args.requests_per_minute,
+                    characters_per_minute=args.characters_per_minute,
+                    family_requests_per_minute=family_limits,
+                    tts_cache=tts_cache,
+                )
+            else:
+                # Deduce output directory if not provided
+                if args.output is None:
+                    locale_dir = _locale_to_directory(locale)
+                    output = Path("src/media/audio") / locale_dir
+                else:
+                    output = Path(args.output)
+
+                generate_audio(
+                    Path(args.database),
+                    locale,
+                    output,
+                    AudioExistsAction(args.action),
+                    Path(args.data_dir),
+                    seed=seed,
+                    limit=args.limit,
+                    delay=args.delay,
+                    workers=args.workers,
+                    requests_per_minute=args.requests_per_minute,
+                    characters_per_minute=args.characters_per_minute,
+                    tts_cache=tts_cache,
+                )
+        elif args.command == "cache":
+            cache = TtsCache(Path(args.cache_dir) if args.cache_dir else None)
+            if args.action == "prune":
+                removed, freed = cache.prune(int(args.max_size * 1024 * 1024))
+                print(f"Removed {removed} entries ({freed / 1024 / 1024:.1f} MB)")
+            stats = cache.stats()
+            print(f"Cache directory: {cache.cache_dir}")
+            print(f"Entries: {stats.entries}")
+            print(f"Size: {stats.total_bytes / 1024 / 1024:.1f} MB")
+        elif args.command == "generate":
+            generate_joined_source_fields(
+                Path(args.database), Path(args.output), Path(args.data_dir)
+            )
+        elif args.command == "check":
+            output = ambiguity_detection(
+                Path(args.database), Path(args.data_dir), auto_fix=args.auto_fix
+            )
+            print(output)
+        elif args.command == "query-plan":
+            if audit_query_plans(Path(args.database), Path(args.data_dir)):
+                sys.exit(1)
+        elif args.command == "csv2sqlite":
+            csv2sqlite(
+                Path(args.input),
+                Path(args.database),
+                force=args.force,
+                fail_if_conflict=args.fail_if_conflict,
+                incremental=args.incremental,
+            )
+        elif args.command == "sqlite2csv":
+            sqlite2csv(
+                Path(args.database),
+                Path(args.output),
+                force=args.force,
+                fail_if_conflict=args.fail_if_conflict,
+            )
+        elif args.command == "export-review":
+            keys = None
+            if args.keys_file:
+                keys_path = Path(args.keys_file)
+                keys = [
+                    line.strip()
+                    for line in keys_path.read_text().splitlines()
+                    if line.strip()
+                ]
+            export_review(
+                Path(args.database),
+                args.source,
+                args.target,
+                Path(args.output),
+                Path(args.media_dir),
+                Path(args.data_dir),
+                keys=keys,
+            )
+        elif args.command == "import-review":
+            import_review(
+                Path(args.file),
+                Path(args.database),
+                args.source,
+                args.target,
+                Path(args.media_dir),
+                Path(args.data_dir),
+            )
+        elif args.command == "release":
+            if args.list:
+                registry = DeckRegistry(Path(args.registry))
+                print_deck_list(registry, Path(args.database), args.format)
+            elif args.deck_id and args.finalize:
+                registry = DeckRegistry(Path(args.registry))
+                finalize_release(registry, args.deck_id, Path(args.finalize))
+            elif args.deck_id:
+                if not args.version:
+                    print("Error: --version is required when releasing a deck")
+                    release_parser.print_help()
+                    return
+
+                registry = DeckRegistry(Path(args.registry))
+                run_release(
+                    registry,
+                    args.deck_id,
+                    args.version,
+                    dry_run=args.dry_run,
+                )
+            else:
                 release_parser.print_help()
-                return
+        elif args.command == "build":
+            build_decks(
+                DeckRegistry(Path(args.registry)),
+                Path(args.database),
+                Path(args.data_dir),
+                Path(args.output_dir),
+                deck_ids=args.deck_ids,
+                jobs=args.jobs,
+            )
+        elif args.command == "generate-website":
+            registry = DeckRegistry(Path(args.registry))
+            output_dir = Path(args.output_dir)
 
+            if args.all:
+                generate_all_website_pages(registry, output_dir)
+            elif args.deck:
+                generate_website_page_for_deck(registry, args.deck, output_dir)
+            else:
+                generate_website_parser.print_help()
+        elif args.command == "generate-ankiweb":
             registry = DeckRegistry(Path(args.registry))
-            run_release(
-                registry,
-                args.deck_id,
-                args.version,
-                dry_run=args.dry_run,
+            output_dir = Path(args.output_dir)
+            generate_ankiweb_description(
+                registry, args.deck_id, output_dir, clipboard=args.clipboard
             )
+        elif args.command == "create-deck":
+            create_625_deck(args.source_locale, args.target_locale, args.version)
         else:
-            release_parser.print_help()
-    elif args.command == "generate-website":
-        registry = DeckRegistry(Path(args.registry))
-        output_dir = Path(args.output_dir)
-
-        if args.all:
-            generate_all_website_pages(registry, output_dir)
-        elif args.deck:
-            generate_website_page_for_deck(registry, args.deck, output_dir)
-        else:
-            generate_website_parser.print_help()
-    elif args.command == "generate-ankiweb":
-        registry = DeckRegistry(Path(args.registry))
-        output_dir = Path(args.output_dir)
-        generate_ankiweb_description(
-            registry, args.deck_id, output_dir, clipboard=args.clipboard
-        )
-    elif args.command == "create-deck":
-        create_625_deck(args.source_locale, args.target_locale, args.version)
-    else:
-        parser.print_help()
+            parser.print_help()
 
+        if in_memory and args.save_db:
+            db.save_in_memory(Path(args.database))
+            print(f"Saved in-memory database to {args.database}", file=log)
 
-def print_deck_list(registry: DeckRegistry, db_path: Path = Path("data.db")):
-    """Print a formatted list of all decks and their status."""
-    import sqlite3
-    from al_tools.core import _ensure_db_exists, _check_db_freshness
 
-    decks = sorted(registry.all(), key=lambda d: d.deck_id)
+def _deck_list_entries(registry: DeckRegistry, db_path: Path) -> List[Dict]:
+    """Collect the status of all decks for the deck list.
 
-    if not decks:
-        print("No decks found in registry.")
-        return
+    Completeness is counted with one aggregated query per table and the last
+    releases are resolved with one git call, however many decks there are.
+    """
+    from al_tools.core import ensure_db_exists, check_db_freshness
 
     # Ensure database exists and is fresh
     data_dir = Path("src/data")
-    _ensure_db_exists(db_path, data_dir)
-    _check_db_freshness(db_path, data_dir, force=True)
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir, force=True)
 
-    # Connect to database
-    conn = sqlite3.connect(db_path)
+    conn = db.connect(db_path)
     cursor = conn.cursor()
 
     # Get total vocabulary count for percentage calculations
     cursor.execute("SELECT COUNT(*) FROM vocabulary")
     total_vocab = cursor.fetchone()[0]
 
-    # Calculate column widths
-    max_id_len = max(len(d.deck_id) for d in decks)
-    max_version_len = max(len(d.version) for d in decks)
+    # Translations and audio of the target locales of 625 decks
+    cursor.execute(
+        """
+        SELECT locale,
+               SUM(text IS NOT NULL AND text <> ''),
+               SUM(audio IS NOT NULL AND audio <> '')
+        FROM base_language
+        GROUP BY locale
+        """
+    )
+    base_counts = {locale: (text, audio) for locale, text, audio in cursor}
 
-    # Print header
-    print()
-    print(
-        f"{'DECK':<{max_id_len}}  {'VERSION':<{max_version_len}}  {'TRANSL':<7}  {'AUDIO':<6}  {'LAST RELEASE':<13}  ANKIWEB"
+    # Pairs of minimal pairs decks and how many have both audio files
+    cursor.execute(
+        """
+        SELECT source_locale, target_locale, COUNT(*),
+               SUM(audio1 IS NOT NULL AND audio1 <> ''
+                   AND audio2 IS NOT NULL AND audio2 <> '')
+        FROM minimal_pairs
+        GROUP BY source_locale, target_locale
+        """
     )
-    print("-" * (max_id_len + max_version_len + 7 + 6 + 13 + 30))
+    pair_counts = {(src, tgt): (total, audio) for src, tgt, total, audio in cursor}
 
-    # Print each deck
-    for deck in decks:
-        last_release = registry.get_latest_release_version(deck.deck_id)
-        last_release_str = last_release if last_release else "-"
+    db.close(conn)
 
-        ankiweb_str = f"✓ {deck.ankiweb_id}" if deck.ankiweb_id else "✗ (not uploaded)"
+    last_releases = registry.get_latest_release_versions()
 
-        # Calculate completion percentages based on deck type
+    entries = []
+    for deck in sorted(registry.all(), key=lambda d: d.deck_id):
         if deck.deck_type == "625":
-            # For 625 decks, check if target locale has actual text
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM base_language
-                WHERE locale = ? AND text IS NOT NULL AND text <> ''
-                """,
-                (deck.target_locale,),
-            )
-            translation_count = cursor.fetchone()[0]
-            translation_pct_raw = (
-                int((translation_count / total_vocab) * 100) if total_vocab > 0 else 0
+            translated, audio = base_counts.get(deck.target_locale, (0, 0))
+            total = total_vocab
+        elif deck.deck_type == "minimal_pairs":
+            # Every existing pair counts as translated
+            translated, audio = pair_counts.get(
+                (deck.source_locale, deck.target_locale), (0, 0)
             )
+            total = translated
+        else:
+            # Unknown deck type
+            translated, audio, total = 0, 0, 0
+
+        entries.append(
+            {
+                "deck_id": deck.deck_id,
+                "deck_type": deck.deck_type,
+                "version": deck.version,
+                "last_release": last_releases[deck.deck_id],
+                "ankiweb_id": deck.ankiweb_id,
+                "translated": translated,
+                "audio": audio,
+                "total": total,
+            }
+        )
+    return entries
 
-            # Show "<1%" for partial progress, avoid showing "0%" when there's some progress
-            if translation_count > 0 and translation_pct_raw == 0:
-                translation_pct = "<1"
-            else:
-                translation_pct = translation_pct_raw
-
-            # Check target locale audio completion
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM base_language
-                WHERE locale = ? AND audio IS NOT NULL AND audio <> ''
-                """,
-                (deck.target_locale,),
-            )
-            audio_count = cursor.fetchone()[0]
-            audio_pct_raw = (
-                int((audio_count / total_vocab) * 100) if total_vocab > 0 else 0
-            )
 
-            # Show "<1%" for partial progress
-            if audio_count > 0 and audio_pct_raw == 0:
-                audio_pct = "<1"
-            else:
-                audio_pct = audio_pct_raw
+def _format_percentage(count: int, total: int) -> str:
+    """Format a completion percentage, e.g. '42%'."""
+    pct = int((count / total) * 100) if total > 0 else 0
+    # Show "<1%" for partial progress, avoid showing "0%" when there's some progress
+    if count > 0 and pct == 0:
+        return "<1%"
+    return f"{pct}%"
 
-        elif deck.deck_type == "minimal_pairs":
-            # For minimal_pairs decks, use minimal_pairs table
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM minimal_pairs
-                WHERE source_locale = ? AND target_locale = ?
-                """,
-                (deck.source_locale, deck.target_locale),
-            )
-            total_pairs = cursor.fetchone()[0]
-
-            # Translation percentage: just show how many pairs exist (denominator is itself)
-            translation_pct = 100 if total_pairs > 0 else 0
-
-            # Audio percentage: check how many have both audio1 and audio2
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM minimal_pairs
-                WHERE source_locale = ? AND target_locale = ?
-                AND audio1 IS NOT NULL AND audio1 <> ''
-                AND audio2 IS NOT NULL AND audio2 <> ''
-                """,
-                (deck.source_locale, deck.target_locale),
-            )
-            audio_complete = cursor.fetchone()[0]
-            audio_pct_raw = (
-                int((audio_complete / total_pairs) * 100) if total_pairs > 0 else 0
-            )
 
-            # Show "<1%" for partial progress
-            if audio_complete > 0 and audio_pct_raw == 0:
-                audio_pct = "<1"
-            else:
-                audio_pct = audio_pct_raw
+def print_deck_list(
+    registry: DeckRegistry,
+    db_path: Path = Path("data.db"),
+    output_format: str = "table",
+):
+    """Print a formatted list of all decks and their status.
 
+    Args:
+        registry: Deck registry
+        db_path: Path to the SQLite database
+        output_format: "table" for people or "json" for other tools
+    """
+    if not registry.all():
+        if output_format == "json":
+            print("[]")
         else:
-            # Unknown deck type
-            translation_pct = 0
-            audio_pct = 0
-
-        # Format the percentage strings
-        transl_str = (
-            f"{translation_pct}%"
-            if isinstance(translation_pct, int)
-            else f"{translation_pct}%"
+            print("No decks found in registry.")
+        return
+
+    if output_format == "json":
+        # Messages about (re)creating the database must not end up in the JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            entries = _deck_list_entries(registry, db_path)
+        print(json.dumps(entries, indent=2, ensure_ascii=False))
+        return
+
+    entries = _deck_list_entries(registry, db_path)
+
+    # Calculate column widths
+    max_id_len = max(len(e["deck_id"]) for e in entries)
+    max_version_len = max(len(e["version"]) for e in entries)
+
+    # Print header
+    print()
+    print(
+        f"{'DECK':<{max_id_len}}  {'VERSION':<{max_version_len}}  {'TRANSL':<7}  {'AUDIO':<6}  {'LAST RELEASE':<13}  ANKIWEB"
+    )
+    print("-" * (max_id_len + max_version_len + 7 + 6 + 13 + 30))
+
+    # Print each deck
+    for entry in entries:
+        last_release_str = entry["last_release"] or "-"
+        ankiweb_str = (
+            f"✓ {entry['ankiweb_id']}" if entry["ankiweb_id"] else "✗ (not uploaded)"
         )
-        audio_str = f"{audio_pct}%" if isinstance(audio_pct, int) else f"{audio_pct}%"
+        transl_str = _format_percentage(entry["translated"], entry["total"])
+        audio_str = _format_percentage(entry["audio"], entry["total"])
 
         print(
-            f"{deck.deck_id:<{max_id_len}}  {deck.version:<{max_version_len}}  {transl_str:<7}  {audio_str:<6}  {last_release_str:<13}  {ankiweb_str}"
+            f"{entry['deck_id']:<{max_id_len}}  {entry['version']:<{max_version_len}}  {transl_str:<7}  {audio_str:<6}  {last_release_str:<13}  {ankiweb_str}"
         )
 
-    conn.close()
     print()
 
 
-def generate_website_page_for_deck(
-    registry: DeckRegistry, deck_id: str, output_dir: Path
-):
-    """Generate website page for a specific deck and update the overview page."""
-    deck = registry.get(deck_id)
-    if not deck:
-        print(f"Error: Deck '{deck_id}' not found in registry")
-        return
+def _same_tree(comparison) -> bool:
+    """Check whether a filecmp.dircmp found no differences, recursively."""
+    if (
+        comparison.left_only
+        or comparison.right_only
+        or comparison.diff_files
+        or comparison.funny_files
+    ):
+        return False
+    return all(_same_tree(sub) for sub in comparison.subdirs.values())
+
+
+def _write_overview_page(registry: DeckRegistry, output_dir: Path):
+    """Write the deck overview page if its content changed."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    overview_file = output_dir / "_index.md"
+    if write_if_changed(overview_file, generate_deck_overview_page(registry).encode()):
+        print(f"✓ Generated overview page: {overview_file}")
+    else:
+        print(f"✓ Unchanged overview page: {overview_file}")
 
-    generator = ContentGenerator(deck)
-    page_content = generator.generate_website_page()
+
+def _write_website_page(registry: DeckRegistry, deck: Deck, output_dir: Path):
+    """Write the website page of a deck and its screenshots if they changed."""
+    import filecmp
+    import shutil
+
+    page_content = ContentGenerator(deck, registry=registry).generate_website_page()
 
     # Create output directory for deck
     deck_output_dir = output_dir / deck.website_slug
     deck_output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Write page content
     output_file = deck_output_dir / "_index.md"
-    output_file.write_text(page_content)
+    if write_if_changed(output_file, page_content.encode()):
+        print(f"✓ Generated {output_file}")
+    else:
+        print(f"✓ Unchanged {output_file}")
 
     # Copy screenshots if they exist
     screenshot_src = Path(deck.content_dir) / "screenshots"
     screenshot_dst = deck_output_dir / "screenshots"
 
-    if screenshot_src.exists():
-        # Remove existing screenshots directory if it exists
-        import shutil
+    if not screenshot_src.exists():
+        print(f"⚠ No screenshots found in {screenshot_src}")
+        return
 
-        if screenshot_dst.exists():
-            shutil.rmtree(screenshot_dst)
+    # Copies keep the modification time, so comparing stat signatures suffices
+    if screenshot_dst.exists():
+        if _same_tree(filecmp.dircmp(screenshot_src, screenshot_dst)):
+            return
+        shutil.rmtree(screenshot_dst)
 
-        # Copy all screenshots
-        shutil.copytree(screenshot_src, screenshot_dst)
+    shutil.copytree(screenshot_src, screenshot_dst)
+    print(f"✓ Copied screenshots to {screenshot_dst}")
 
-        print(f"✓ Generated {output_file}")
-        print(f"✓ Copied screenshots to {screenshot_dst}")
-    else:
-        print(f"✓ Generated {output_file}")
-        print(f"⚠ No screenshots found in {screenshot_src}")
 
-    # Update overview page
-    overview_content = generate_deck_overview_page(registry)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    overview_file = output_dir / "_index.md"
-    overview_file.write_text(overview_content)
-    print(f"✓ Updated overview page: {overview_file}")
+def generate_website_page_for_deck(
+    registry: DeckRegistry, deck_id: str, output_dir: Path
+):
+    """Generate website page for a specific deck and update the overview page."""
+    deck = registry.get(deck_id)
+    if not deck:
+        print(f"Error: Deck '{deck_id}' not found in registry")
+        return
+
+    _write_website_page(registry, deck, output_dir)
+    _write_overview_page(registry, output_dir)
 
 
 def generate_all_website_pages(registry: DeckRegistry, output_dir: Path):
-    """Generate website pages for all decks."""
+    """Generate website pages for all decks.
+
+    The registry, its git tags and the changelogs are loaded once for all
+    pages, and only pages whose content changed are written.
+    """
     decks = sorted(registry.all(), key=lambda d: d.deck_id)
 
     if not decks:
         print("No decks found in registry.")
         return
 
-    # Generate overview page
-    overview_content = generate_deck_overview_page(registry)
-    overview_file = output_dir / "_index.md"
-    output_dir.mkdir(parents=True, exist_ok=True)
-    overview_file.write_text(overview_content)
-    print(f"✓ Generated overview page: {overview_file}")
+    _write_overview_page(registry, output_dir)
 
     # Generate individual deck pages
     for deck in decks:
-        generate_website_page_for_deck(registry, deck.deck_id, output_dir)
+        _write_website_page(registry, deck, output_dir)
 
     print(f"\n✓ Generated {len(decks)} deck pages + overview page")
 
@@ -813,6 +1054,7 @@ def run_release(
         # Step 7: Create git tag
         print("[7/7] Creating git tag...\n")
         create_git_tag(deck, target_version)
+        registry.invalidate_tags()
         print()
 
         print("=" * 70)
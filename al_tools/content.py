@@ -4,11 +4,12 @@ Handles parsing of changelog files and generation of website pages and AnkiWeb d
 """
 
 import re
+import time
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from al_tools.registry import Deck, DeckRegistry
 from al_tools.i18n import (
@@ -40,15 +41,34 @@ class ChangelogParser:
         r"^##\s+(\d+\.\d+\.\d+(?:-[a-zA-Z0-9.]+)?)(?:\s+-\s+(\d{4}-\d{2}-\d{2}))?$"
     )
 
+    # Parsed changelogs by path, with the (size, mtime) they were parsed at
+    _cache: Dict[Path, Tuple[Tuple[int, int], List[ChangelogEntry]]] = {}
+
+    # Changelogs modified this recently aren't cached: a second write within
+    # the timestamp granularity of the filesystem would go unnoticed.
+    _RACY_MTIME_NS = 2_000_000_000
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget all parsed changelogs."""
+        cls._cache.clear()
+
     @classmethod
     def parse(cls, changelog_path: Path) -> List[ChangelogEntry]:
         """Parse a changelog file and extract all version entries.
 
         Returns entries in order of appearance (newest first, typically).
+        Files are only parsed again when they changed.
         """
         if not changelog_path.exists():
             raise FileNotFoundError(f"Changelog not found: {changelog_path}")
 
+        st = changelog_path.stat()
+        stat_key = (st.st_size, st.st_mtime_ns)
+        cached = cls._cache.get(changelog_path.resolve())
+        if cached is not None and cached[0] == stat_key:
+            return list(cached[1])
+
         with open(changelog_path, "r") as f:
             content = f.read()
 
@@ -94,7 +114,9 @@ class ChangelogParser:
             current_entry.raw_text = "\n".join(current_raw_lines).strip()
             entries.append(current_entry)
 
-        return entries
+        if time.time_ns() - st.st_mtime_ns >= cls._RACY_MTIME_NS:
+            cls._cache[changelog_path.resolve()] = (stat_key, entries)
+        return list(entries)
 
     @classmethod
     def get_version_entry(
@@ -213,16 +235,29 @@ def generate_deck_overview_page(registry: DeckRegistry) -> str:
 class ContentGenerator:
     """Generates website pages and AnkiWeb descriptions from source content."""
 
-    def __init__(self, deck: Deck, github_repo: str = "ankilangs/ankilangs"):
+    def __init__(
+        self,
+        deck: Deck,
+        github_repo: str = "ankilangs/ankilangs",
+        registry: Optional[DeckRegistry] = None,
+    ):
         """Initialize content generator for a deck.
 
         Args:
             deck: Deck to generate content for
             github_repo: GitHub org/repo for raw URLs (e.g., "ankilangs/ankilangs")
+            registry: Registry to look up releases in, decks.yaml is loaded if not given
         """
         self.deck = deck
         self.github_repo = github_repo
         self.content_dir = Path(deck.content_dir)
+        self.registry = registry
+
+    def _get_registry(self) -> DeckRegistry:
+        """Get the registry, loading decks.yaml on first use if none was given."""
+        if self.registry is None:
+            self.registry = DeckRegistry()
+        return self.registry
 
     def generate_website_page(self) -> str:
         """Generate complete website page markdown from source content.
@@ -267,10 +302,9 @@ class ContentGenerator:
         if not self.deck.is_dev_version:
             latest_version = self.deck.version
         else:
-            from al_tools.registry import DeckRegistry
-
-            registry = DeckRegistry()
-            latest_version = registry.get_latest_release_version(self.deck.deck_id)
+            latest_version = self._get_registry().get_latest_release_version(
+                self.deck.deck_id
+            )
 
         if latest_version:
             # Try to get the date from the changelog
@@ -600,10 +634,9 @@ class ContentGenerator:
         # Determine download URL based on whether this is a dev version
         if self.deck.is_dev_version:
             # For dev versions, use latest release version
-            from al_tools.registry import DeckRegistry
-
-            registry = DeckRegistry()
-            latest_version = registry.get_latest_release_version(self.deck.deck_id)
+            latest_version = self._get_registry().get_latest_release_version(
+                self.deck.deck_id
+            )
             if latest_version:
                 version_for_url = latest_version
             else:
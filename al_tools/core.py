@@ -1,6 +1,8 @@
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 import hashlib
+import io
 import json
 import random
 import time
@@ -10,52 +12,108 @@ import csv
 import sqlite3
 from datetime import datetime, timezone
 import sys
-
-import pandas as pd
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 import re
 
-from google.cloud import texttospeech as tts
-import xlsxwriter
+from al_tools import db
+from al_tools.tts_cache import TtsCache, cache_key
 
 
-def _ensure_db_exists(db_path: Path, data_dir: Path = Path("src/data")):
+def ensure_db_exists(db_path: Path, data_dir: Path = Path("src/data")):
     """Check if database exists, create automatically from CSV if not."""
-    if not db_path.exists():
+    if not db.is_in_memory(db_path) and not db_path.exists():
         print(f"Database '{db_path}' not found.")
         print(f"Creating database from CSV files in '{data_dir}'...")
         csv2sqlite(data_dir, db_path, force=True)
         print(f"Database created successfully at '{db_path}'.")
 
 
-def _compute_csv_hashes(data_dir: Path) -> Dict[str, str]:
-    """Compute MD5 hashes for all CSV files in data_dir and subdirectories."""
-    hashes = {}
-    for csv_file in sorted(data_dir.glob("*.csv")):
-        with open(csv_file, "rb") as f:
-            hashes[csv_file.name] = hashlib.md5(f.read()).hexdigest()
+# Files modified this recently don't get their stat tuple cached: a second
+# write within the timestamp granularity of the filesystem would go unnoticed.
+_RACY_MTIME_NS = 2_000_000_000
+
+
+def _file_fingerprint(path: Path, cached: list | None = None) -> list:
+    """Get [size, mtime_ns, inode, md5] of a file.
+
+    The file is only read if its stat tuple differs from the cached fingerprint.
+    """
+    st = path.stat()
+    stat_tuple = [st.st_size, st.st_mtime_ns, st.st_ino]
+    if cached is not None and cached[:3] == stat_tuple:
+        return cached
+    with open(path, "rb") as f:
+        md5 = hashlib.md5(f.read()).hexdigest()
+    if time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+        stat_tuple = [None, None, None]
+    return stat_tuple + [md5]
+
+
+def _compute_csv_fingerprints(
+    data_dir: Path, cached: Dict[str, list] | None = None
+) -> Dict[str, list]:
+    """Compute fingerprints for all CSV files in data_dir and subdirectories.
+
+    Args:
+        data_dir: Directory containing the CSV files
+        cached: Previously stored fingerprints, keyed like the result
+
+    Returns:
+        Dict mapping filename (i18n files prefixed with "i18n/") to
+        [size, mtime_ns, inode, md5]
+    """
+    cached = cached or {}
+    csv_files = [(f.name, f) for f in sorted(data_dir.glob("*.csv"))]
     # Include i18n subdirectory
     i18n_dir = data_dir / "i18n"
     if i18n_dir.exists():
-        for csv_file in sorted(i18n_dir.glob("*.csv")):
-            with open(csv_file, "rb") as f:
-                hashes[f"i18n/{csv_file.name}"] = hashlib.md5(f.read()).hexdigest()
-    return hashes
+        csv_files += [(f"i18n/{f.name}", f) for f in sorted(i18n_dir.glob("*.csv"))]
+    return {
+        name: _file_fingerprint(csv_file, cached.get(name))
+        for name, csv_file in csv_files
+    }
 
 
 def _get_sync_metadata(db_path: Path) -> Dict[str, str]:
     """Get sync metadata from database."""
-    conn = sqlite3.connect(db_path)
+    conn = db.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("SELECT key, value FROM _meta")
     metadata = {row[0]: row[1] for row in cursor.fetchall()}
-    conn.close()
+    db.close(conn)
     return metadata
 
 
-def _get_changed_csv_files(data_dir: Path, stored_hashes: Dict[str, str]) -> List[str]:
-    """Get list of CSV files that have changed since last sync."""
-    current_hashes = _compute_csv_hashes(data_dir)
+def _get_stored_fingerprints(db_path: Path) -> Dict[str, list]:
+    """Get the CSV fingerprints stored at the last sync, if there is a database."""
+    if not db_path.exists():
+        return {}
+    try:
+        metadata = _get_sync_metadata(db_path)
+    except sqlite3.OperationalError:
+        return {}
+    return json.loads(metadata.get("csv_fingerprints", "{}"))
+
+
+def _get_changed_csv_files(
+    db_path: Path, data_dir: Path, metadata: Dict[str, str]
+) -> List[str]:
+    """Get list of CSV files that have changed since last sync.
+
+    Files are only re-hashed if their stat tuple changed. When nothing changed,
+    refreshed stat tuples (e.g. after a checkout that touched the files) are
+    stored so the next check doesn't have to read those files again.
+    """
+    stored_hashes = json.loads(metadata.get("csv_hashes", "{}"))
+    stored_fingerprints_json = metadata.get("csv_fingerprints", "{}")
+    fingerprints = _compute_csv_fingerprints(
+        data_dir, json.loads(stored_fingerprints_json)
+    )
+    current_hashes = {name: fp[3] for name, fp in fingerprints.items()}
     changed = []
     # Check for modified or new files
     for filename, current_hash in current_hashes.items():
@@ -65,20 +123,28 @@ def _get_changed_csv_files(data_dir: Path, stored_hashes: Dict[str, str]) -> Lis
     for filename in stored_hashes:
         if filename not in current_hashes:
             changed.append(f"{filename} (deleted)")
+
+    if not changed and json.dumps(fingerprints) != stored_fingerprints_json:
+        conn = db.connect(db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO _meta (key, value) VALUES ('csv_fingerprints', ?)",
+            (json.dumps(fingerprints),),
+        )
+        conn.commit()
+        db.close(conn)
     return sorted(changed)
 
 
-def _check_db_freshness(db_path: Path, data_dir: Path, force: bool = False):
+def check_db_freshness(db_path: Path, data_dir: Path, force: bool = False):
     """Check if database is up to date with CSV files. Used before reading from DB."""
-    if force:
+    # An in-memory database is imported at the start of the command
+    if force or db.is_in_memory(db_path):
         return
 
     metadata = _get_sync_metadata(db_path)
-    stored_hashes_json = metadata.get("csv_hashes", "{}")
-    stored_hashes = json.loads(stored_hashes_json)
     synced_at = metadata.get("synced_at", "unknown")
 
-    changed_files = _get_changed_csv_files(data_dir, stored_hashes)
+    changed_files = _get_changed_csv_files(db_path, data_dir, metadata)
     if not changed_files:
         return
 
@@ -143,59 +209,6 @@ def create_mp3_filename(text: str, prefix: str = "") -> str:
     return f"{prefix}{clean_name}.mp3"
 
 
-def _get_text_col(df: pd.DataFrame) -> str:
-    """
-    Get the text column from the DataFrame.
-    """
-    text_columns = []
-    for column in df.columns:
-        if column == "text":
-            text_columns.append(column)
-        elif column.startswith("text:"):
-            text_columns.append(column)
-
-    if len(text_columns) != 1:
-        raise ValueError(f"Expected one text column, found {text_columns}")
-
-    return text_columns[0]
-
-
-def _get_audio_col(df: pd.DataFrame) -> str:
-    """
-    Get the audio column from the DataFrame.
-    """
-    audio_columns = []
-    for column in df.columns:
-        if column == "audio":
-            audio_columns.append(column)
-        elif column.startswith("audio:"):
-            audio_columns.append(column)
-
-    if len(audio_columns) != 1:
-        raise ValueError(f"Expected one audio column, found {audio_columns}")
-
-    return audio_columns[0]
-
-
-def _get_audio_source_col(df: pd.DataFrame) -> str:
-    """
-    Get the audio source column from the DataFrame.
-    """
-    audio_source_columns = []
-    for column in df.columns:
-        if column == "audio source":
-            audio_source_columns.append(column)
-        elif column.startswith("audio source:"):
-            audio_source_columns.append(column)
-
-    if len(audio_source_columns) != 1:
-        raise ValueError(
-            f"Expected one audio source column, found {audio_source_columns}"
-        )
-
-    return audio_source_columns[0]
-
-
 # See: https://docs.cloud.google.com/text-to-speech/docs/list-voices-and-types
 _VOICE_MAP = {
     "ar_xa": [
@@ -278,969 +291,2651 @@ _VOICE_MAP = {
 }
 
 
-def generate_audio(
-    db_path: Path,
-    locale: str,
-    audio_folder_path: Path,
-    audio_exists_action: AudioExistsAction,
-    data_dir: Path = Path("src/data"),
-    seed: int | str = 42,
-    limit: int = None,
-    delay: float = 1.0,
-    tts_client=None,
-):
-    """
-    Generate audio via the Google Cloud TTS API.
-    Reads from SQLite database and updates it with generated audio.
-    If the directory does not exist it will be created.
+class _TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute, holding up to capacity.
 
-    Args:
-        seed: Random seed for voice selection. Use integer for reproducible results,
-            or "random" for fully random selection.
-        limit: Maximum number of audio files to generate. None means no limit.
-        delay: Delay in seconds between TTS requests to avoid rate limiting.
+    A request larger than the capacity is let through once the bucket is full
+    and leaves it in debt, so the long-term rate is still respected.
     """
-    _ensure_db_exists(db_path, data_dir)
-    _check_db_freshness(db_path, data_dir)
 
-    if seed != "random":
-        random.seed(seed)
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate_per_second,
+        )
+        self.updated_at = now
 
-    lang_short = locale.split("_")[0]
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens can be taken (0 if available now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate_per_second)
 
-    # Read from SQLite
-    conn = sqlite3.connect(db_path)
-    query = """
-        SELECT
-            bl.key,
-            bl.text,
-            bl.audio,
-            bl.audio_source,
-            COALESCE(tts.tts_text, bl.text) as tts_text,
-            COALESCE(tts.is_ssml, 0) as is_ssml
-        FROM base_language bl
-        LEFT JOIN tts_overrides tts ON bl.key = tts.key AND bl.locale = tts.locale
-        WHERE bl.locale = ?
-        ORDER BY bl.key COLLATE NOCASE
-    """
-    df = pd.read_sql_query(query, conn, params=(locale,))
+    def take(self, amount: float):
+        self.tokens -= amount
 
-    # Rename columns to match expected format
-    df = df.rename(
-        columns={
-            "text": f"text:{lang_short}",
-            "audio": f"audio:{lang_short}",
-            "audio_source": f"audio source:{lang_short}",
-        }
-    )
 
-    os.makedirs(audio_folder_path, exist_ok=True)
+class _RateLimiter:
+    """Thread-safe limiter for TTS requests per minute and characters per minute."""
 
-    text_col = _get_text_col(df)
-    audio_col = _get_audio_col(df)
-    audio_source_col = _get_audio_source_col(df)
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        characters_per_minute: float | None = None,
+    ):
+        # Allow bursts of up to one second worth of requests/characters
+        self._buckets: List[Tuple[_TokenBucket, bool]] = []
+        if requests_per_minute:
+            self._buckets.append(
+                (
+                    _TokenBucket(requests_per_minute, max(1, requests_per_minute / 60)),
+                    False,
+                )
+            )
+        if characters_per_minute:
+            self._buckets.append(
+                (_TokenBucket(characters_per_minute, characters_per_minute / 60), True)
+            )
+        self._lock = threading.Lock()
 
-    client = tts_client if tts_client is not None else tts.TextToSpeechClient()
-    audio_config = tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3)
+    def acquire(self, characters: int):
+        """Block until a request with the given number of characters may be sent."""
+        while True:
+            with self._lock:
+                wait = max(
+                    (
+                        bucket.wait_time(characters if per_char else 1)
+                        for bucket, per_char in self._buckets
+                    ),
+                    default=0.0,
+                )
+                if wait == 0:
+                    for bucket, per_char in self._buckets:
+                        bucket.take(characters if per_char else 1)
+                    return
+            time.sleep(wait)
 
-    cursor = conn.cursor()
-    generated_count = 0
-    try:
-        for rowindex, row in df.iterrows():
-            # Check if we've reached the limit
-            if limit is not None and generated_count >= limit:
-                print(f"\nReached limit of {limit} audio files. Stopping.")
-                break
 
-            # Skip rows with empty text
-            if pd.isna(row[text_col]) or not row[text_col]:
-                print(f"Skipping row with key '{row['key']}' - empty text")
-                continue
+@dataclass
+class _AudioJob:
+    """A single TTS request and where its result goes."""
 
-            if pd.notna(row[audio_col]) and row[audio_col]:
-                match = re.search(r"\[sound:(.+)\]", row[audio_col])
-                if match:
-                    audio_file = audio_folder_path / match.group(1)
-                else:
-                    audio_file = audio_folder_path / create_mp3_filename(
-                        row["key"], prefix=f"al_{locale}_"
-                    )
-            else:
-                audio_file = audio_folder_path / create_mp3_filename(
-                    row["key"], prefix=f"al_{locale}_"
-                )
-            if audio_file.exists():
-                if audio_exists_action == AudioExistsAction.SKIP:
-                    print(f"Skipping existing audio file '{audio_file}'")
-                    if pd.isna(row[audio_col]):
-                        df.at[rowindex, audio_col] = f"[sound:{audio_file.name}]"
-                        # find the source of that audio
-                        audio_source = df[
-                            df[audio_col] == f"[sound:{audio_file.name}]"
-                        ][audio_source_col].values[0]
-                        df.at[rowindex, audio_source_col] = audio_source
-                        print(
-                            f"  ** Setting audio of '{row[text_col]}' to '{audio_file.name}'"
-                        )
-                    continue
-                elif audio_exists_action == AudioExistsAction.OVERWRITE:
-                    print(f"Overwriting existing audio file '{audio_file}'")
-                    os.remove(audio_file)
-                else:
-                    raise FileExistsError(f"Audio file {audio_file} already exists")
-
-            voice_name = random.choice(_VOICE_MAP[locale])
-            if locale in ("sq_al", "fa_ir"):
-                voice = tts.VoiceSelectionParams(
-                    language_code=f"{locale.split('_')[0]}-{locale.split('_')[1].upper()}",
-                    name=voice_name,
-                    model_name="gemini-2.5-pro-tts",
-                )
-            else:
-                voice = tts.VoiceSelectionParams(
-                    language_code=f"{locale.split('_')[0]}-{locale.split('_')[1].upper()}",
-                    name=voice_name,
-                )
+    key: str
+    locale: str
+    text: str
+    tts_text: str
+    is_ssml: bool
+    audio_file: Path
+    voice_name: str
 
-            # Use TTS override if available, otherwise use regular text
-            tts_text = row["tts_text"]
-            is_ssml = row["is_ssml"]
 
-            if is_ssml:
-                synthesis_input = tts.SynthesisInput(ssml=tts_text)
-            else:
-                synthesis_input = tts.SynthesisInput(text=tts_text)
+def _voice_family(voice_name: str) -> str:
+    """Get the voice family of a voice name, e.g. 'Studio' for 'de-DE-Studio-B'.
 
-            # Avoid rate limit
-            time.sleep(delay)
+    Gemini TTS voices have plain names like 'Aoede' and form the 'Gemini' family.
+    """
+    parts = voice_name.split("-")
+    return parts[2] if len(parts) >= 3 else "Gemini"
+
+
+# List prices in USD per million characters, used for the cost estimate of
+# generate_audio_all_locales. Gemini voices are billed per token and not
+# estimated.
+_TTS_PRICE_PER_MILLION_CHARACTERS = {
+    "Standard": 4.0,
+    "Wavenet": 4.0,
+    "Neural2": 16.0,
+    "Journey": 30.0,
+    "Chirp3": 30.0,
+    "Studio": 160.0,
+}
 
-            try:
-                response = client.synthesize_speech(
-                    input=synthesis_input,
-                    voice=voice,
-                    audio_config=audio_config,
-                )
-            except Exception as e:
-                raise Exception(
-                    f"Error for '{row[text_col]}' (TTS text: '{tts_text}'): {e}"
-                ) from e
-            audio_file.write_bytes(response.audio_content)
-            df.at[rowindex, audio_col] = f"[sound:{audio_file.name}]"
-            df.at[rowindex, audio_source_col] = (
-                f"Google Cloud TTS<br>Voice: {voice_name}"
-            )
-            print(f"Audio content written to file '{audio_file}'")
 
-            # Update SQLite immediately after successful generation
-            cursor.execute(
-                """
-                UPDATE base_language
-                SET audio = ?, audio_source = ?
-                WHERE key = ? AND locale = ?
-                """,
-                (
-                    df.at[rowindex, audio_col] or "",
-                    df.at[rowindex, audio_source_col] or "",
-                    row["key"],
-                    locale,
-                ),
-            )
-            conn.commit()
-            generated_count += 1
+class _AudioThrottle:
+    """Rate limits TTS requests by a global quota and per voice family quotas."""
 
-        print(f"\nGenerated {generated_count} audio file(s).")
-    finally:
-        conn.close()
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        characters_per_minute: float | None = None,
+        family_requests_per_minute: Dict[str, float] | None = None,
+    ):
+        self.global_limiter = _RateLimiter(requests_per_minute, characters_per_minute)
+        self.family_limiters = {
+            family.lower(): _RateLimiter(rate)
+            for family, rate in (family_requests_per_minute or {}).items()
+        }
 
+    def acquire(self, job: _AudioJob):
+        """Block until the job's request may be sent."""
+        # Take the family token first, so a throttled family doesn't hold
+        # global tokens while it waits
+        family_limiter = self.family_limiters.get(_voice_family(job.voice_name).lower())
+        if family_limiter is not None:
+            family_limiter.acquire(len(job.tts_text))
+        self.global_limiter.acquire(len(job.tts_text))
 
-def _format_source(picture_source, audio_source):
-    picture_part = (
-        f"Picture:<br>{picture_source}"
-        if pd.notna(picture_source) and picture_source != ""
-        else ""
-    )
-    audio_part = (
-        f"Audio:<br>{audio_source}"
-        if pd.notna(audio_source) and audio_source != ""
-        else ""
-    )
-    separator = "<br><br>" if picture_part and audio_part else ""
-    return f"{picture_part}{separator}{audio_part}"
 
+def _audio_journal_path(db_path: Path) -> Path:
+    return db_path.with_name(f"{db_path.name}-audio-journal.jsonl")
 
-def fix_625_words_files(folder_path: Path):
-    """
-    Verify all files contain the same keys and add missing words.
+
+class _AudioJournal:
+    """Append-only journal of the audio jobs of a run, next to the database.
+
+    Every job is recorded as planned (with its voice) before any request is
+    sent, as started when it is handed to a worker and as done right before
+    its MP3 is written. If a run is interrupted, the next run applies the
+    references of done jobs whose MP3 reached the disk and resumes the
+    remaining jobs with the voices chosen originally.
     """
-    # Verify the "key" column is the same in all files. If the only difference is that some files have
-    # more keys than others, add the missing keys to the files that are missing them.
-    # Maintain the order of the keys in all files. If the order is different, raise an error.
-    keys: pd.DataSeries = None
-    file_most_keys = None
 
-    # First figure out which files has the most keys
-    for csv_path in folder_path.glob("625_words-base-*.csv"):
-        df = pd.read_csv(csv_path, sep=",")
-        # If keys are non-unique, raise an error
-        if df["key"].duplicated().any():
-            raise ValueError(
-                f"Duplicate keys found in '{csv_path.name}': {df[df['key'].duplicated()]}"
-            )
-        if keys is None:
-            keys = df["key"]
-            file_most_keys = csv_path
-        elif len(keys) < len(df["key"]):
-            keys = df["key"]
-            file_most_keys = csv_path
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
 
-    for csv_path in folder_path.glob("625_words-base-*.csv"):
-        df = pd.read_csv(csv_path, sep=",")
-        if not keys.equals(df["key"]):
-            # Check if the keys are the same but in a different order
-            if (
-                keys.sort_values()
-                .reset_index(drop=True)
-                .equals(df["key"].sort_values().reset_index(drop=True))
-            ):
-                raise ValueError(
-                    f"Keys in '{csv_path}' are in a different order than in '{file_most_keys}'"
-                )
-            # Add missing keys in the same order as the original keys
-            missing_keys = keys[~keys.isin(df["key"])]
-            df = pd.concat([df, pd.DataFrame({"key": missing_keys})], ignore_index=True)
+    def recover(self, conn: sqlite3.Connection) -> Tuple[int, List[_AudioJob]]:
+        """Apply the references of an interrupted run and get its unfinished jobs.
 
-        # Ensure that "tags:*" is set, for example tags:fr should be set to AnkiLangs::FR
-        for column in df.columns:
-            if column.startswith("tags:"):
-                df[column] = "AnkiLangs::" + column.split(":")[1].upper()
-        df.to_csv(csv_path, index=False)
+        Returns:
+            Number of recovered references and the unfinished jobs in plan order
+        """
+        if not self.path.exists():
+            return 0, []
+
+        planned: Dict[Tuple[str, str], _AudioJob] = {}
+        done = set()
+        updates = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line of a crashed run may be incomplete
+                    continue
+                job_id = (entry["key"], entry["locale"])
+                # Journals of older versions only contain done entries
+                event = entry.get("event", "done")
+                if event == "planned":
+                    planned[job_id] = _AudioJob(
+                        key=entry["key"],
+                        locale=entry["locale"],
+                        text=entry["text"],
+                        tts_text=entry["tts_text"],
+                        is_ssml=entry["is_ssml"],
+                        audio_file=Path(entry["audio_file"]),
+                        voice_name=entry["voice_name"],
+                    )
+                elif event == "done" and Path(entry["audio_file"]).exists():
+                    done.add(job_id)
+                    updates.append(
+                        (
+                            entry["audio"],
+                            entry["audio_source"],
+                            entry["key"],
+                            entry["locale"],
+                            entry["audio"],
+                            entry["audio_source"],
+                        )
+                    )
 
-    # Add all keys to the from-to files
-    for csv_path in folder_path.glob("625_words-from-*-to-*.csv"):
-        df = pd.read_csv(csv_path, sep=",")
-        if not keys.equals(df["key"]):
-            # Check if the keys are the same but in a different order
-            if (
-                keys.sort_values()
-                .reset_index(drop=True)
-                .equals(df["key"].sort_values().reset_index(drop=True))
-            ):
-                raise ValueError(
-                    f"Keys in '{csv_path}' are in a different order than in '{file_most_keys}'"
-                )
-            missing_keys = keys[~keys.isin(df["key"])]
-            df = pd.concat([df, pd.DataFrame({"key": missing_keys})], ignore_index=True)
-        df.to_csv(csv_path, index=False)
+        # References committed before the interruption are not counted
+        cursor = conn.executemany(
+            """
+            UPDATE base_language
+            SET audio = ?, audio_source = ?
+            WHERE key = ? AND locale = ?
+              AND (audio IS NOT ? OR audio_source IS NOT ?)
+            """,
+            updates,
+        )
+        conn.commit()
+        unfinished = [job for job_id, job in planned.items() if job_id not in done]
+        return cursor.rowcount, unfinished
+
+    def start(self, jobs: List[_AudioJob]):
+        """Start a new journal, recording the given jobs as planned."""
+        self._file = open(self.path, "w", encoding="utf-8")
+        for job in jobs:
+            self._append(
+                {
+                    "event": "planned",
+                    "key": job.key,
+                    "locale": job.locale,
+                    "text": job.text,
+                    "tts_text": job.tts_text,
+                    "is_ssml": job.is_ssml,
+                    "audio_file": str(job.audio_file.absolute()),
+                    "voice_name": job.voice_name,
+                }
+            )
 
+    def started(self, job: _AudioJob):
+        self._append({"event": "started", "key": job.key, "locale": job.locale})
+
+    def done(self, job: _AudioJob, audio: str, audio_source: str):
+        self._append(
+            {
+                "event": "done",
+                "key": job.key,
+                "locale": job.locale,
+                "audio": audio,
+                "audio_source": audio_source,
+                "audio_file": str(job.audio_file.absolute()),
+            }
+        )
 
-def ensure_base_language_entries_exist(
-    db_path: Path, data_dir: Path = Path("src/data")
-):
-    """
-    Ensure all vocabulary keys have entries in all base_language locales.
+    def _append(self, entry: dict):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
 
-    This is needed when a new deck is created with minimal entries - we want
-    to ensure all 625 keys exist in every language's base file, even if the
-    translations are empty.
+    def close(self):
+        """Close the journal, keeping it on disk for the next run."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
-    Updates both the database AND CSV files.
-    """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    def finish(self, remaining: List[_AudioJob]):
+        """Close the journal after a complete run.
 
-    # Get all vocabulary keys
-    cursor.execute("SELECT key FROM vocabulary ORDER BY key COLLATE NOCASE")
-    all_keys = [row[0] for row in cursor.fetchall()]
+        Args:
+            remaining: Planned jobs that were not part of this run, e.g.
+                because of a limit. They are kept for the next run.
+        """
+        self.close()
+        if remaining:
+            self.start(remaining)
+            self.close()
+        else:
+            self.path.unlink()
 
-    if not all_keys:
-        print("No vocabulary keys found")
-        conn.close()
-        return
 
-    # Find all base language files
-    base_locales = set()
-    for csv_file in sorted(data_dir.glob("625_words-base-*.csv")):
-        locale = csv_file.stem.split("-")[-1]
-        base_locales.add(locale)
+_TTS_RETRIES = 5
+_TTS_BACKOFF_SECONDS = 1.0
+_TTS_BACKOFF_MAX_SECONDS = 32.0
 
-    if not base_locales:
-        print("No base language files found")
-        conn.close()
-        return
 
-    total_created = 0
-    for locale in sorted(base_locales):
-        lang_short = locale.split("_")[0]
+def _synthesize(
+    client,
+    job: _AudioJob,
+    audio_config,
+    throttle: _AudioThrottle,
+    tts_cache: TtsCache | None = None,
+) -> Tuple[bytes, bool]:
+    """Synthesize a job, using the cache if possible.
 
-        # Find missing keys for this locale
-        cursor.execute(
-            """
-            SELECT v.key
-            FROM vocabulary v
-            WHERE NOT EXISTS (
-                SELECT 1 FROM base_language bl
-                WHERE bl.key = v.key AND bl.locale = ?
-            )
-            ORDER BY v.key COLLATE NOCASE
-        """,
-            (locale,),
+    Returns:
+        The audio content and whether it came from the cache
+    """
+    from google.api_core import exceptions as api_exceptions
+    from google.cloud import texttospeech as tts
+
+    # Errors of the TTS API that are worth retrying
+    transient_errors = (
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.TooManyRequests,
+        api_exceptions.ResourceExhausted,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError,
+    )
+
+    language, country = job.locale.split("_")
+    if job.locale in ("sq_al", "fa_ir"):
+        voice = tts.VoiceSelectionParams(
+            language_code=f"{language}-{country.upper()}",
+            name=job.voice_name,
+            model_name="gemini-2.5-pro-tts",
+        )
+    else:
+        voice = tts.VoiceSelectionParams(
+            language_code=f"{language}-{country.upper()}",
+            name=job.voice_name,
         )
 
-        missing_keys = [row[0] for row in cursor.fetchall()]
+    # Use TTS override if available, otherwise use regular text
+    if job.is_ssml:
+        synthesis_input = tts.SynthesisInput(ssml=job.tts_text)
+    else:
+        synthesis_input = tts.SynthesisInput(text=job.tts_text)
+
+    if tts_cache is not None:
+        key = cache_key(voice, synthesis_input, audio_config)
+        cached = tts_cache.get(key)
+        if cached is not None:
+            return cached, True
+
+    for attempt in range(_TTS_RETRIES + 1):
+        throttle.acquire(job)
+        try:
+            response = client.synthesize_speech(
+                input=synthesis_input,
+                voice=voice,
+                audio_config=audio_config,
+            )
+            break
+        except transient_errors as e:
+            if attempt == _TTS_RETRIES:
+                raise Exception(
+                    f"Error for '{job.text}' (TTS text: '{job.tts_text}'): {e}"
+                ) from e
+            # Exponential backoff with full jitter, so concurrent workers
+            # don't retry in lockstep
+            backoff = random.uniform(
+                0, min(_TTS_BACKOFF_MAX_SECONDS, _TTS_BACKOFF_SECONDS * 2**attempt)
+            )
+            print(f"Transient error for '{job.text}', retrying in {backoff:.1f}s: {e}")
+            time.sleep(backoff)
+        except Exception as e:
+            raise Exception(
+                f"Error for '{job.text}' (TTS text: '{job.tts_text}'): {e}"
+            ) from e
+    if tts_cache is not None:
+        tts_cache.put(key, response.audio_content)
+    return response.audio_content, False
+
+
+def _synthesize_all(
+    client,
+    jobs: List[_AudioJob],
+    audio_config,
+    throttle: _AudioThrottle,
+    workers: int,
+    tts_cache: TtsCache | None = None,
+    journal: _AudioJournal | None = None,
+):
+    """Synthesize jobs on a thread pool, keeping up to `workers` requests in flight.
 
-        if missing_keys:
-            # Insert missing entries in database
-            for key in missing_keys:
-                cursor.execute(
-                    """
-                    INSERT INTO base_language
-                    (key, locale, text, ipa, audio, audio_source)
-                    VALUES (?, ?, '', '', '', '')
-                """,
-                    (key, locale),
-                )
+    Yields (job, audio_content, from_cache) in job order, so the caller can
+    write the results from a single thread.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for job in jobs:
+            if journal is not None:
+                journal.started(job)
+            future = executor.submit(
+                _synthesize, client, job, audio_config, throttle, tts_cache
+            )
+            pending.append((job, future))
+            if len(pending) >= workers:
+                done_job, future = pending.popleft()
+                yield done_job, *future.result()
+        while pending:
+            done_job, future = pending.popleft()
+            yield done_job, *future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-            conn.commit()
 
-            # Update CSV file
-            csv_file = data_dir / f"625_words-base-{locale}.csv"
-
-            # Read existing CSV data
-            existing_rows = []
-            with open(csv_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                existing_rows = list(reader)
-
-            # Add missing keys
-            for key in missing_keys:
-                existing_rows.append(
-                    {
-                        "key": key,
-                        f"text:{lang_short}": "",
-                        f"ipa:{lang_short}": "",
-                        f"audio:{lang_short}": "",
-                        f"audio source:{lang_short}": "",
-                        f"tags:{lang_short}": f"AnkiLangs::{lang_short.upper()}",
-                    }
-                )
+# Group commit thresholds for audio references written by generate_audio
+_AUDIO_COMMIT_ROWS = 50
+_AUDIO_COMMIT_SECONDS = 5.0
 
-            # Sort by key (case-insensitive)
-            existing_rows.sort(key=lambda row: (row["key"].lower(), row["key"]))
 
-            # Write back to CSV
-            with open(csv_file, "w", encoding="utf-8", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-                writer.writeheader()
-                writer.writerows(existing_rows)
+# The umask can only be read by setting it, which isn't thread-safe, so it is
+# read once on import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
-            total_created += len(missing_keys)
-            print(
-                f"Created {len(missing_keys)} missing base language entries for {locale}"
-            )
 
-    conn.close()
+def _write_file_atomic(path: Path, content: bytes):
+    """Write a file via a temporary file and rename, so it is never half-written.
+
+    The file keeps the mode of the file it replaces. New files get the
+    default mode (0o666 minus the umask) instead of mkstemp's 0o600.
+    """
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _render_csv(header: List[str], rows: List[tuple]) -> bytes:
+    """Render rows as CSV with Unix line endings."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def write_if_changed(path: Path, content: bytes) -> bool:
+    """Write a file unless it already has the given content.
+
+    Unchanged files keep their modification time, so mtime-based build tools
+    don't consider them out of date.
+
+    Returns:
+        Whether the file was written
+    """
+    try:
+        if hashlib.md5(path.read_bytes()).digest() == hashlib.md5(content).digest():
+            return False
+    except FileNotFoundError:
+        pass
+    _write_file_atomic(path, content)
+    return True
+
+
+class _AudioDbWriter:
+    """Writes generated MP3s and group-commits their base_language updates.
+
+    Each job is recorded as done in the journal before its MP3 is written. If
+    the process dies before the next commit, the following run recovers the
+    references of all files that reached the disk from the journal.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        journal: _AudioJournal,
+        batch_size: int = _AUDIO_COMMIT_ROWS,
+        interval: float = _AUDIO_COMMIT_SECONDS,
+    ):
+        self.conn = conn
+        self.journal = journal
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending: List[Tuple[str, str, str, str]] = []
+        self.flushed_at = time.monotonic()
+
+    def write(self, job: _AudioJob, audio_content: bytes):
+        audio = f"[sound:{job.audio_file.name}]"
+        audio_source = f"Google Cloud TTS<br>Voice: {job.voice_name}"
+        self.journal.done(job, audio, audio_source)
+        _write_file_atomic(job.audio_file, audio_content)
+
+        self.pending.append((audio, audio_source, job.key, job.locale))
+        if (
+            len(self.pending) >= self.batch_size
+            or time.monotonic() - self.flushed_at >= self.interval
+        ):
+            self.flush()
+
+    def flush(self):
+        self.conn.executemany(
+            """
+            UPDATE base_language
+            SET audio = ?, audio_source = ?
+            WHERE key = ? AND locale = ?
+            """,
+            self.pending,
+        )
+        self.conn.commit()
+        self.pending = []
+        self.flushed_at = time.monotonic()
+
+
+def _plan_audio_jobs(
+    conn: sqlite3.Connection,
+    locale: str,
+    audio_folder_path: Path,
+    audio_exists_action: AudioExistsAction,
+    rng: random.Random,
+) -> Tuple[List[_AudioJob], List[Tuple[str, str, str, str]]]:
+    """Plan the TTS requests of a locale.
+
+    Voices are chosen up front so they don't depend on timing.
+
+    Returns:
+        The jobs, and (audio, audio_source, key, locale) references for existing
+        files that aren't referenced in the database yet
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = cursor.execute(
+        """
+        SELECT
+            bl.key,
+            bl.text,
+            bl.audio,
+            bl.audio_source,
+            COALESCE(tts.tts_text, bl.text) as tts_text,
+            COALESCE(tts.is_ssml, 0) as is_ssml
+        FROM base_language bl
+        LEFT JOIN tts_overrides tts ON bl.key = tts.key AND bl.locale = tts.locale
+        WHERE bl.locale = ?
+        ORDER BY bl.key COLLATE NOCASE
+        """,
+        (locale,),
+    ).fetchall()
+
+    os.makedirs(audio_folder_path, exist_ok=True)
+
+    # Source of each referenced audio file, for rows whose file exists on disk
+    # but which have no reference themselves
+    audio_sources: Dict[str, str] = {}
+    for row in rows:
+        if row["audio"]:
+            audio_sources.setdefault(row["audio"], row["audio_source"] or "")
+
+    jobs = []
+    references = []
+    for row in rows:
+        # Skip rows with empty text
+        if not row["text"]:
+            print(f"Skipping row with key '{row['key']}' - empty text")
+            continue
+
+        match = re.search(r"\[sound:(.+)\]", row["audio"] or "")
+        if match:
+            audio_file = audio_folder_path / match.group(1)
+        else:
+            audio_file = audio_folder_path / create_mp3_filename(
+                row["key"], prefix=f"al_{locale}_"
+            )
+        if audio_file.exists():
+            if audio_exists_action == AudioExistsAction.SKIP:
+                print(f"Skipping existing audio file '{audio_file}'")
+                if not row["audio"]:
+                    audio = f"[sound:{audio_file.name}]"
+                    references.append(
+                        (audio, audio_sources.get(audio, ""), row["key"], locale)
+                    )
+                    print(
+                        f"  ** Setting audio of '{row['text']}' to '{audio_file.name}'"
+                    )
+                continue
+            elif audio_exists_action == AudioExistsAction.OVERWRITE:
+                print(f"Overwriting existing audio file '{audio_file}'")
+            else:
+                raise FileExistsError(f"Audio file {audio_file} already exists")
+
+        jobs.append(
+            _AudioJob(
+                key=row["key"],
+                locale=locale,
+                text=row["text"],
+                tts_text=row["tts_text"],
+                is_ssml=bool(row["is_ssml"]),
+                audio_file=audio_file,
+                voice_name=rng.choice(_VOICE_MAP[locale]),
+            )
+        )
+    return jobs, references
+
+
+def _interleave_jobs(jobs_by_locale: Dict[str, List[_AudioJob]]) -> List[_AudioJob]:
+    """Order jobs round-robin over locales.
+
+    Locales use different voice families, so a throttled family only delays
+    its share of the requests instead of a whole block of them.
+    """
+    queues = [deque(jobs) for _, jobs in sorted(jobs_by_locale.items()) if jobs]
+    interleaved = []
+    while queues:
+        for queue in queues:
+            interleaved.append(queue.popleft())
+        queues = [queue for queue in queues if queue]
+    return interleaved
+
+
+@dataclass
+class _AudioUsage:
+    """Files and TTS usage of one locale or voice family."""
+
+    files: int = 0
+    cached: int = 0
+    characters: int = 0
+
+
+def _print_audio_report(jobs: List[_AudioJob], results: List[bool]):
+    """Print files per locale and characters and estimated cost per voice family.
+
+    Args:
+        jobs: Completed jobs
+        results: Whether each job was served from the cache
+    """
+    by_locale: Dict[str, _AudioUsage] = {}
+    by_family: Dict[str, _AudioUsage] = {}
+    for job, from_cache in zip(jobs, results):
+        for usage in (
+            by_locale.setdefault(job.locale, _AudioUsage()),
+            by_family.setdefault(_voice_family(job.voice_name), _AudioUsage()),
+        ):
+            usage.files += 1
+            if from_cache:
+                usage.cached += 1
+            else:
+                usage.characters += len(job.tts_text)
+
+    print()
+    print("━" * 70)
+    print("AUDIO GENERATION REPORT")
+    print("━" * 70)
+    print(f"{'Locale':<10}  {'Files':>6}  {'Cached':>6}  {'Characters':>10}")
+    for locale, usage in sorted(by_locale.items()):
+        print(
+            f"{locale:<10}  {usage.files:>6}  {usage.cached:>6}  {usage.characters:>10}"
+        )
+    print()
+    print(
+        f"{'Voice family':<12}  {'Requests':>8}  {'Characters':>10}  {'Est. cost':>9}"
+    )
+    total_cost = 0.0
+    unpriced = False
+    for family, usage in sorted(by_family.items()):
+        price = _TTS_PRICE_PER_MILLION_CHARACTERS.get(family)
+        if price is None:
+            cost = "n/a"
+            unpriced = unpriced or usage.characters > 0
+        else:
+            total_cost += usage.characters * price / 1_000_000
+            cost = f"${usage.characters * price / 1_000_000:.2f}"
+        print(
+            f"{family:<12}  {usage.files - usage.cached:>8}  {usage.characters:>10}  {cost:>9}"
+        )
+    print()
+    print(
+        f"Estimated cost: ${total_cost:.2f} at list prices, ignoring the free tier"
+        + (" (Gemini voices not included)" if unpriced else "")
+    )
+
+
+def _run_audio_jobs(
+    conn: sqlite3.Connection,
+    journal: _AudioJournal,
+    jobs: List[_AudioJob],
+    tts_client,
+    throttle: _AudioThrottle,
+    workers: int,
+    tts_cache: TtsCache | None,
+) -> List[bool]:
+    """Synthesize jobs and write their files and database references.
+
+    Returns:
+        Whether each completed job was served from the cache
+    """
+    from google.cloud import texttospeech as tts
+
+    client = tts_client if tts_client is not None else tts.TextToSpeechClient()
+    audio_config = tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3)
+
+    writer = _AudioDbWriter(conn, journal)
+    results = []
+    try:
+        for job, audio_content, from_cache in _synthesize_all(
+            client, jobs, audio_config, throttle, workers, tts_cache, journal
+        ):
+            writer.write(job, audio_content)
+            results.append(from_cache)
+            progress = f"[{len(results)}/{len(jobs)}]"
+            if from_cache:
+                print(
+                    f"{progress} Cached audio content written to file '{job.audio_file}'"
+                )
+            else:
+                print(f"{progress} Audio content written to file '{job.audio_file}'")
+
+        print(f"\nGenerated {len(results)} audio file(s) ({sum(results)} from cache).")
+    finally:
+        writer.flush()
+    return results
+
+
+def _generate_audio(
+    db_path: Path,
+    targets: List[Tuple[str, Path]],
+    audio_exists_action: AudioExistsAction,
+    data_dir: Path,
+    seed: int | str,
+    limit: int | None,
+    delay: float,
+    tts_client,
+    workers: int,
+    requests_per_minute: float | None,
+    characters_per_minute: float | None,
+    family_requests_per_minute: Dict[str, float] | None,
+    tts_cache: TtsCache | None,
+) -> List[Tuple[_AudioJob, bool]]:
+    """Generate audio for (locale, audio folder) targets under shared rate limits.
+
+    Returns:
+        Completed jobs and whether each was served from the cache
+    """
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir)
+
+    if requests_per_minute is None and delay > 0:
+        requests_per_minute = 60 / delay
+
+    conn = db.connect(db_path)
+    try:
+        journal = _AudioJournal(_audio_journal_path(db_path))
+        recovered, unfinished = journal.recover(conn)
+        if recovered:
+            print(f"Recovered {recovered} audio reference(s) from an interrupted run.")
+        resumable: Dict[str, List[_AudioJob]] = {}
+        for job in unfinished:
+            resumable.setdefault(job.locale, []).append(job)
+
+        jobs_by_locale = {}
+        references = []
+        for locale, audio_folder_path in targets:
+            if locale in resumable:
+                # Continue the plan of the interrupted run, with its voices
+                jobs_by_locale[locale] = resumable.pop(locale)
+                print(
+                    f"Resuming {len(jobs_by_locale[locale])} audio job(s) of "
+                    f"'{locale}' from an interrupted run"
+                )
+                continue
+            # Seeded per locale, so voices match a run for that locale alone
+            rng = random.Random() if seed == "random" else random.Random(seed)
+            jobs_by_locale[locale], locale_references = _plan_audio_jobs(
+                conn, locale, audio_folder_path, audio_exists_action, rng
+            )
+            references.extend(locale_references)
+
+        conn.executemany(
+            "UPDATE base_language SET audio = ?, audio_source = ? WHERE key = ? AND locale = ?",
+            references,
+        )
+        conn.commit()
+
+        # Unfinished jobs of other locales stay in the journal for a later run
+        remaining = [job for jobs in resumable.values() for job in jobs]
+        jobs = _interleave_jobs(jobs_by_locale)
+        if limit is not None and len(jobs) > limit:
+            print(f"\nReached limit of {limit} audio files. Stopping.")
+            remaining = jobs[limit:] + remaining
+            jobs = jobs[:limit]
+
+        throttle = _AudioThrottle(
+            requests_per_minute, characters_per_minute, family_requests_per_minute
+        )
+        journal.start(jobs + remaining)
+        try:
+            results = _run_audio_jobs(
+                conn, journal, jobs, tts_client, throttle, workers, tts_cache
+            )
+        finally:
+            journal.close()
+        journal.finish(remaining)
+        return list(zip(jobs, results))
+    finally:
+        db.close(conn)
+
+
+def generate_audio(
+    db_path: Path,
+    locale: str,
+    audio_folder_path: Path,
+    audio_exists_action: AudioExistsAction,
+    data_dir: Path = Path("src/data"),
+    seed: int | str = 42,
+    limit: int = None,
+    delay: float = 1.0,
+    tts_client=None,
+    workers: int = 1,
+    requests_per_minute: float | None = None,
+    characters_per_minute: float | None = None,
+    tts_cache: TtsCache | None = None,
+):
+    """
+    Generate audio via the Google Cloud TTS API.
+    Reads from SQLite database and updates it with generated audio.
+    If the directory does not exist it will be created.
+
+    Requests run on a thread pool, throttled by a token bucket. Files and
+    database rows are written by the calling thread in key order.
+
+    Args:
+        seed: Random seed for voice selection. Use integer for reproducible results,
+            or "random" for fully random selection.
+        limit: Maximum number of audio files to generate. None means no limit.
+        delay: Delay in seconds between TTS requests to avoid rate limiting.
+            Only used if requests_per_minute is not given.
+        workers: Number of TTS requests kept in flight.
+        requests_per_minute: Maximum TTS requests per minute.
+        characters_per_minute: Maximum characters sent to TTS per minute.
+        tts_cache: Cache checked before calling the TTS API. Cache hits don't
+            count against the rate limits.
+    """
+    _generate_audio(
+        db_path,
+        [(locale, audio_folder_path)],
+        audio_exists_action,
+        data_dir,
+        seed,
+        limit,
+        delay,
+        tts_client,
+        workers,
+        requests_per_minute,
+        characters_per_minute,
+        None,
+        tts_cache,
+    )
+
+
+def generate_audio_all_locales(
+    db_path: Path,
+    audio_root: Path,
+    audio_exists_action: AudioExistsAction,
+    data_dir: Path = Path("src/data"),
+    seed: int | str = 42,
+    limit: int = None,
+    delay: float = 1.0,
+    tts_client=None,
+    workers: int = 1,
+    requests_per_minute: float | None = None,
+    characters_per_minute: float | None = None,
+    family_requests_per_minute: Dict[str, float] | None = None,
+    tts_cache: TtsCache | None = None,
+):
+    """
+    Generate missing audio of all locales with TTS voices in a single run.
+
+    Plans the jobs of every locale in the database that has voices in
+    _VOICE_MAP, then sends them round-robin over locales under shared rate
+    limits. Audio of each locale goes to audio_root/<ll_CC>. Ends with a report
+    of files per locale and characters and estimated cost per voice family.
+
+    Args:
+        audio_root: Folder containing one audio folder per locale.
+        limit: Maximum number of audio files to generate over all locales.
+        family_requests_per_minute: Maximum TTS requests per minute per voice
+            family (e.g. {"Studio": 30}), on top of the global limits. Family
+            names are case insensitive; Gemini voices are the "Gemini" family.
+
+    The other arguments are the same as for generate_audio.
+    """
+    ensure_db_exists(db_path, data_dir)
+    conn = db.connect(db_path)
+    db_locales = {
+        row[0] for row in conn.execute("SELECT DISTINCT locale FROM base_language")
+    }
+    db.close(conn)
+
+    for locale in sorted(db_locales - set(_VOICE_MAP)):
+        print(f"No TTS voices configured for locale '{locale}', skipping")
+    targets = [
+        (locale, audio_root / locale_to_directory(locale))
+        for locale in sorted(db_locales & set(_VOICE_MAP))
+    ]
+
+    completed = _generate_audio(
+        db_path,
+        targets,
+        audio_exists_action,
+        data_dir,
+        seed,
+        limit,
+        delay,
+        tts_client,
+        workers,
+        requests_per_minute,
+        characters_per_minute,
+        family_requests_per_minute,
+        tts_cache,
+    )
+    _print_audio_report(
+        [job for job, _ in completed], [from_cache for _, from_cache in completed]
+    )
+
+
+def _format_source(picture_source, audio_source):
+    import pandas as pd
+
+    picture_part = (
+        f"Picture:<br>{picture_source}"
+        if pd.notna(picture_source) and picture_source != ""
+        else ""
+    )
+    audio_part = (
+        f"Audio:<br>{audio_source}"
+        if pd.notna(audio_source) and audio_source != ""
+        else ""
+    )
+    separator = "<br><br>" if picture_part and audio_part else ""
+    return f"{picture_part}{separator}{audio_part}"
+
+
+def fix_625_words_files(folder_path: Path):
+    """
+    Verify all files contain the same keys and add missing words.
+    """
+    import pandas as pd
+
+    # Verify the "key" column is the same in all files. If the only difference is that some files have
+    # more keys than others, add the missing keys to the files that are missing them.
+    # Maintain the order of the keys in all files. If the order is different, raise an error.
+    keys: pd.DataSeries = None
+    file_most_keys = None
+
+    # First figure out which files has the most keys
+    for csv_path in folder_path.glob("625_words-base-*.csv"):
+        df = pd.read_csv(csv_path, sep=",")
+        # If keys are non-unique, raise an error
+        if df["key"].duplicated().any():
+            raise ValueError(
+                f"Duplicate keys found in '{csv_path.name}': {df[df['key'].duplicated()]}"
+            )
+        if keys is None:
+            keys = df["key"]
+            file_most_keys = csv_path
+        elif len(keys) < len(df["key"]):
+            keys = df["key"]
+            file_most_keys = csv_path
+
+    for csv_path in folder_path.glob("625_words-base-*.csv"):
+        df = pd.read_csv(csv_path, sep=",")
+        if not keys.equals(df["key"]):
+            # Check if the keys are the same but in a different order
+            if (
+                keys.sort_values()
+                .reset_index(drop=True)
+                .equals(df["key"].sort_values().reset_index(drop=True))
+            ):
+                raise ValueError(
+                    f"Keys in '{csv_path}' are in a different order than in '{file_most_keys}'"
+                )
+            # Add missing keys in the same order as the original keys
+            missing_keys = keys[~keys.isin(df["key"])]
+            df = pd.concat([df, pd.DataFrame({"key": missing_keys})], ignore_index=True)
+
+        # Ensure that "tags:*" is set, for example tags:fr should be set to AnkiLangs::FR
+        for column in df.columns:
+            if column.startswith("tags:"):
+                df[column] = "AnkiLangs::" + column.split(":")[1].upper()
+        df.to_csv(csv_path, index=False)
+
+    # Add all keys to the from-to files
+    for csv_path in folder_path.glob("625_words-from-*-to-*.csv"):
+        df = pd.read_csv(csv_path, sep=",")
+        if not keys.equals(df["key"]):
+            # Check if the keys are the same but in a different order
+            if (
+                keys.sort_values()
+                .reset_index(drop=True)
+                .equals(df["key"].sort_values().reset_index(drop=True))
+            ):
+                raise ValueError(
+                    f"Keys in '{csv_path}' are in a different order than in '{file_most_keys}'"
+                )
+            missing_keys = keys[~keys.isin(df["key"])]
+            df = pd.concat([df, pd.DataFrame({"key": missing_keys})], ignore_index=True)
+        df.to_csv(csv_path, index=False)
+
+
+def _render_base_language_csv(cursor: sqlite3.Cursor, locale: str) -> Tuple[bytes, int]:
+    """Render the base language CSV file of a locale from the database.
+
+    Returns:
+        File content and number of rows
+    """
+    lang_short = locale.split("_")[0]
+    cursor.execute(
+        """
+        SELECT key, text, ipa, audio, audio_source
+        FROM base_language
+        WHERE locale = ?
+        ORDER BY key COLLATE NOCASE
+    """,
+        (locale,),
+    )
+    rows = [
+        (
+            key,
+            text or "",
+            ipa or "",
+            audio or "",
+            audio_source or "",
+            f"AnkiLangs::{lang_short.upper()}",
+        )
+        for key, text, ipa, audio, audio_source in cursor.fetchall()
+    ]
+    fieldnames = [
+        "key",
+        f"text:{lang_short}",
+        f"ipa:{lang_short}",
+        f"audio:{lang_short}",
+        f"audio source:{lang_short}",
+        f"tags:{lang_short}",
+    ]
+    return _render_csv(fieldnames, rows), len(rows)
+
+
+def _render_translation_pair_csv(
+    cursor: sqlite3.Cursor, source_locale: str, target_locale: str
+) -> Tuple[bytes, int]:
+    """Render the translation pair CSV file of a locale pair from the database.
+
+    Returns:
+        File content and number of rows
+    """
+    cursor.execute(
+        """
+        SELECT key, guid, pronunciation_hint, spelling_hint, reading_hint,
+               listening_hint, notes
+        FROM translation_pair
+        WHERE source_locale = ? AND target_locale = ?
+        ORDER BY key COLLATE NOCASE
+    """,
+        (source_locale, target_locale),
+    )
+    rows = [
+        (row[0], *(value or "" for value in tuple(row)[1:]))
+        for row in cursor.fetchall()
+    ]
+    fieldnames = [
+        "key",
+        "guid",
+        "pronunciation hint",
+        "spelling hint",
+        "reading hint",
+        "listening hint",
+        "notes",
+    ]
+    return _render_csv(fieldnames, rows), len(rows)
+
+
+def _entries_signature(cursor: sqlite3.Cursor, scope: list) -> str | None:
+    """Get a signature of the database state the ensure_* functions work on.
+
+    Imports, exports and edits change the sync timestamps in _meta, but only
+    at second resolution, so the row counts are included as well.
+
+    Args:
+        scope: Locales or locale pairs the function covers
+
+    Returns:
+        Hex digest, or None if the database has no sync metadata
+    """
+    try:
+        cursor.execute(
+            "SELECT key, value FROM _meta WHERE key IN ('synced_at', 'db_data_modified_at')"
+        )
+    except sqlite3.OperationalError:
+        return None
+    timestamps = dict(cursor.fetchall())
+    if len(timestamps) < 2:
+        return None
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM vocabulary),
+            (SELECT COUNT(*) FROM base_language),
+            (SELECT COUNT(*) FROM translation_pair)
+    """)
+    counts = list(cursor.fetchone())
+    payload = [
+        timestamps["synced_at"],
+        timestamps["db_data_modified_at"],
+        counts,
+        scope,
+    ]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def _entries_unchanged(
+    cursor: sqlite3.Cursor, name: str, signature: str | None
+) -> bool:
+    """Check whether the signature stored under name in _meta matches."""
+    if signature is None:
+        return False
+    cursor.execute("SELECT value FROM _meta WHERE key = ?", (name,))
+    row = cursor.fetchone()
+    return row is not None and row[0] == signature
+
+
+def _save_entries_signature(conn: sqlite3.Connection, name: str, scope: list):
+    cursor = conn.cursor()
+    signature = _entries_signature(cursor, scope)
+    if signature is not None:
+        cursor.execute(
+            "INSERT OR REPLACE INTO _meta (key, value) VALUES (?, ?)",
+            (name, signature),
+        )
+        conn.commit()
+
+
+def ensure_base_language_entries_exist(
+    db_path: Path, data_dir: Path = Path("src/data")
+):
+    """
+    Ensure all vocabulary keys have entries in all base_language locales.
+
+    This is needed when a new deck is created with minimal entries - we want
+    to ensure all 625 keys exist in every language's base file, even if the
+    translations are empty.
+
+    Updates both the database AND CSV files. Does nothing if neither the
+    database nor the set of base language files changed since the last run.
+    """
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+
+    # Find all base language files
+    base_locales = sorted(
+        csv_file.stem.split("-")[-1]
+        for csv_file in data_dir.glob("625_words-base-*.csv")
+    )
+    if _entries_unchanged(
+        cursor,
+        "ensure_base_language_signature",
+        _entries_signature(cursor, base_locales),
+    ):
+        db.close(conn)
+        return
+
+    cursor.execute("SELECT COUNT(*) FROM vocabulary")
+    if not cursor.fetchone()[0]:
+        print("No vocabulary keys found")
+        db.close(conn)
+        return
+
+    if not base_locales:
+        print("No base language files found")
+        db.close(conn)
+        return
+
+    total_created = 0
+    for locale in base_locales:
+        # Insert missing entries in database
+        cursor.execute(
+            """
+            INSERT INTO base_language (key, locale, text, ipa, audio, audio_source)
+            SELECT v.key, ?, '', '', '', ''
+            FROM vocabulary v
+            WHERE NOT EXISTS (
+                SELECT 1 FROM base_language bl
+                WHERE bl.key = v.key AND bl.locale = ?
+            )
+        """,
+            (locale, locale),
+        )
+        created = cursor.rowcount
+        conn.commit()
+
+        if created:
+            # Update CSV file from the database
+            content, _ = _render_base_language_csv(cursor, locale)
+            _write_file_atomic(data_dir / f"625_words-base-{locale}.csv", content)
+
+            total_created += created
+            print(f"Created {created} missing base language entries for {locale}")
+
+    _save_entries_signature(conn, "ensure_base_language_signature", base_locales)
+    db.close(conn)
 
     if total_created > 0:
         print(f"Total: Created {total_created} base language entries\n")
 
 
-def ensure_translation_pairs_exist(db_path: Path, data_dir: Path = Path("src/data")):
-    """
-    Ensure all translation pair entries exist for vocabulary keys that are
-    present in both source and target base_language tables.
+def ensure_translation_pairs_exist(db_path: Path, data_dir: Path = Path("src/data")):
+    """
+    Ensure all translation pair entries exist for vocabulary keys that are
+    present in both source and target base_language tables.
+
+    This is needed when a new deck is created with minimal entries - we want
+    to automatically create empty translation pair entries for all vocabulary
+    that exists in both languages.
+
+    Updates both the database AND CSV files. Does nothing if neither the
+    database nor the set of translation pair files changed since the last run.
+    """
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+
+    # Find all translation pair files to determine which language pairs should exist
+    translation_pairs = sorted(
+        _PAIR_FILE_RE.fullmatch(csv_file.name).groups()
+        for csv_file in data_dir.glob("625_words-from-*-to-*.csv")
+        if _PAIR_FILE_RE.fullmatch(csv_file.name)
+    )
+
+    if not translation_pairs:
+        print("No translation pair files found, skipping translation pair generation")
+        db.close(conn)
+        return
+
+    scope = [list(pair) for pair in translation_pairs]
+    if _entries_unchanged(
+        cursor,
+        "ensure_translation_pairs_signature",
+        _entries_signature(cursor, scope),
+    ):
+        db.close(conn)
+        return
+
+    total_created = 0
+    for source_locale, target_locale in translation_pairs:
+        # Insert empty pairs for all vocabulary keys that exist in both the
+        # source and target language
+        cursor.execute(
+            """
+            INSERT INTO translation_pair
+            (key, source_locale, target_locale, guid, pronunciation_hint,
+             spelling_hint, reading_hint, listening_hint, notes)
+            SELECT v.key, ?, ?, '', '', '', '', '', ''
+            FROM vocabulary v
+            WHERE EXISTS (
+                SELECT 1 FROM base_language bl1
+                WHERE bl1.key = v.key AND bl1.locale = ?
+            )
+            AND EXISTS (
+                SELECT 1 FROM base_language bl2
+                WHERE bl2.key = v.key AND bl2.locale = ?
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM translation_pair tp
+                WHERE tp.key = v.key
+                  AND tp.source_locale = ?
+                  AND tp.target_locale = ?
+            )
+        """,
+            (
+                source_locale,
+                target_locale,
+                source_locale,
+                target_locale,
+                source_locale,
+                target_locale,
+            ),
+        )
+        created = cursor.rowcount
+        conn.commit()
+
+        if created:
+            # Also update the CSV file from the database
+            content, _ = _render_translation_pair_csv(
+                cursor, source_locale, target_locale
+            )
+            _write_file_atomic(
+                data_dir / f"625_words-from-{source_locale}-to-{target_locale}.csv",
+                content,
+            )
+
+            total_created += created
+            print(
+                f"Created {created} missing translation pair entries for {source_locale} → {target_locale}"
+            )
+
+    _save_entries_signature(conn, "ensure_translation_pairs_signature", scope)
+    db.close(conn)
+
+    if total_created > 0:
+        print(f"\nTotal: Created {total_created} translation pair entries")
+
+
+# The "Source & License" field of a note: the sources of the picture (p, from
+# pictures) and of the audio (bl, from base_language of the target locale)
+SOURCE_FIELD_SQL = """
+    CASE
+        WHEN p.picture_source IS NOT NULL AND p.picture_source != ''
+             AND bl.audio_source IS NOT NULL AND bl.audio_source != ''
+        THEN 'Picture:<br>' || p.picture_source || '<br><br>Audio:<br>' || bl.audio_source
+        WHEN p.picture_source IS NOT NULL AND p.picture_source != ''
+        THEN 'Picture:<br>' || p.picture_source
+        WHEN bl.audio_source IS NOT NULL AND bl.audio_source != ''
+        THEN 'Audio:<br>' || bl.audio_source
+        ELSE ''
+    END
+"""
+
+
+def generate_joined_source_fields(
+    db_path: Path, output_dir: Path, data_dir: Path = Path("src/data")
+):
+    """
+    Generate CSV files that contain the joint source and license information
+    from the SQLite database.
+
+    Also ensures all vocabulary keys exist in all base language files and
+    all translation pair files before generating.
+
+    Only the files of target locales with changes logged in the changelog
+    since the last run for output_dir are regenerated.
+    """
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir)
+
+    # First ensure all base language entries exist
+    ensure_base_language_entries_exist(db_path, data_dir)
+
+    # Then ensure all translation pairs exist
+    ensure_translation_pairs_exist(db_path, data_dir)
+
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+
+    # Source locales of the translation pairs, by target locale
+    cursor.execute(
+        "SELECT DISTINCT target_locale, source_locale FROM translation_pair ORDER BY target_locale, source_locale"
+    )
+    source_locales: Dict[str, List[str]] = {}
+    for target_locale, source_locale in cursor.fetchall():
+        source_locales.setdefault(target_locale, []).append(source_locale)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    consumer = f"generate:{output_dir.resolve()}"
+    changes, last_id = _read_changelog(cursor, consumer)
+    changed_locales = None
+    if changes is not None:
+        changed_locales = set()
+        for table, key in changes:
+            if table == "base_language":
+                changed_locales.add(key[1])
+            elif table == "translation_pair":
+                changed_locales.add(key[2])
+            elif table == "pictures":
+                # Pictures are shared by all locales
+                changed_locales = None
+                break
+
+    for locale, locale_sources in source_locales.items():
+        output_files = [
+            output_dir / f"625_words-from-{source_locale}-to-{locale}.csv"
+            for source_locale in locale_sources
+        ]
+        if (
+            changed_locales is not None
+            and locale not in changed_locales
+            and all(output_file.exists() for output_file in output_files)
+        ):
+            for output_file in output_files:
+                print(f"CSV file '{output_file}' unchanged")
+            continue
+
+        # The source field only depends on the target locale, so it is
+        # rendered once and shared by the files of all its pairs
+        cursor.execute(
+            f"""
+            SELECT bl.key, {SOURCE_FIELD_SQL} as source
+            FROM base_language bl
+            LEFT JOIN pictures p ON bl.key = p.key
+            WHERE bl.locale = ?
+            ORDER BY bl.key COLLATE NOCASE
+            """,
+            (locale,),
+        )
+        # Only keep rows with source
+        rows = [row for row in cursor.fetchall() if row[1] != ""]
+        content = _render_csv(["key", "source"], rows)
+
+        for output_file in output_files:
+            if write_if_changed(output_file, content):
+                print(f"CSV file '{output_file}' written")
+            else:
+                print(f"CSV file '{output_file}' unchanged")
+
+    _advance_changelog(cursor, consumer, last_id)
+    conn.commit()
+    db.close(conn)
+
+
+class _AmbiguousWords:
+    def __init__(self, filename: str):
+        self.filename = filename
+        # key is the word, value is a tuple of keys and empty columns
+        self.ambiguous_words: Dict[str, Tuple[Tuple, Tuple]] = dict()
+
+    def add(self, word: str, keys: Tuple, empty_columns: Tuple):
+        self.ambiguous_words[word] = (keys, empty_columns)
+
+    def __repr__(self):
+        return f"{self.filename}: {self.ambiguous_words}"
+
+
+def locale_to_directory(locale: str) -> str:
+    """Convert database locale (e.g., 'en_us') to directory format (e.g., 'en_US')."""
+    lang, country = locale.split("_")
+    return f"{lang}_{country.upper()}"
+
+
+def _parse_audio_filename(audio_ref: str) -> str | None:
+    """Parse audio filename from Anki [sound:...] format.
+
+    Args:
+        audio_ref: Audio reference in format '[sound:filename.mp3]'
+
+    Returns:
+        Filename (e.g., 'al_en_us_alive.mp3') or None if invalid format
+    """
+    if (
+        not audio_ref
+        or not audio_ref.startswith("[sound:")
+        or not audio_ref.endswith("]")
+    ):
+        return None
+    return audio_ref[7:-1]  # Strip '[sound:' and ']'
+
+
+def _list_dir(path: str) -> Set[str]:
+    with os.scandir(path) as entries:
+        return {entry.name for entry in entries}
+
+
+def _scan_audio_dirs(media_dir: Path) -> Dict[str, Set[str]]:
+    """List the names in every locale directory of media_dir.
+
+    Each directory is read with a single scandir and no per-file stat, and
+    the directories are read in parallel, which matters on network and
+    overlay filesystems.
+
+    Returns:
+        Names of the entries of each locale directory, by directory name
+    """
+    if not media_dir.exists():
+        return {}
+    with os.scandir(media_dir) as entries:
+        locale_dirs = sorted(entry.name for entry in entries if entry.is_dir())
+    with ThreadPoolExecutor(max_workers=min(8, len(locale_dirs) or 1)) as executor:
+        listings = executor.map(
+            _list_dir, [os.path.join(media_dir, name) for name in locale_dirs]
+        )
+        return dict(zip(locale_dirs, listings))
+
+
+def _check_audio_files(
+    db_path: Path,
+    media_dir: Path | None = Path("src/media/audio"),
+    auto_fix: bool = False,
+) -> str:
+    """Check for audio file mismatches between database and disk.
+
+    Checks:
+    1. Audio files referenced in DB but not on disk
+    2. Audio files on disk but not referenced in DB
+
+    Args:
+        db_path: Path to SQLite database
+        media_dir: Path to audio media directory (None to skip audio checks)
+        auto_fix: If True, automatically fix issues (remove DB refs for missing files, delete orphaned files)
+
+    Returns:
+        Error message string if issues found, empty string otherwise
+    """
+    # Skip audio checks if media_dir is None (e.g., in tests)
+    if media_dir is None:
+        return ""
+
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+
+    # Get all audio references from base_language table
+    cursor.execute("""
+        SELECT locale, audio, key
+        FROM base_language
+        WHERE audio IS NOT NULL AND audio <> ''
+        ORDER BY locale, key
+    """)
+    db_audio_refs = list(cursor.fetchall())
+
+    # Get all audio references from minimal_pairs table
+    cursor.execute("""
+        SELECT target_locale, audio1, guid || ' (audio1)'
+        FROM minimal_pairs
+        WHERE audio1 IS NOT NULL AND audio1 <> ''
+        UNION ALL
+        SELECT target_locale, audio2, guid || ' (audio2)'
+        FROM minimal_pairs
+        WHERE audio2 IS NOT NULL AND audio2 <> ''
+    """)
+    db_audio_refs.extend(cursor.fetchall())
+
+    disk_files_by_locale = _scan_audio_dirs(media_dir)
+
+    # Build set of audio files referenced in DB, grouped by locale
+    db_files_by_locale: Dict[str, Set[str]] = {}
+    missing_on_disk = []
+
+    for locale, audio_ref, key in db_audio_refs:
+        filename = _parse_audio_filename(audio_ref)
+        if not filename:
+            continue
 
-    This is needed when a new deck is created with minimal entries - we want
-    to automatically create empty translation pair entries for all vocabulary
-    that exists in both languages.
+        locale_dir = locale_to_directory(locale)
+        if locale_dir not in db_files_by_locale:
+            db_files_by_locale[locale_dir] = set()
+        db_files_by_locale[locale_dir].add(filename)
 
-    Updates both the database AND CSV files.
-    """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+        # Check if file exists on disk
+        if filename not in disk_files_by_locale.get(locale_dir, ()):
+            missing_on_disk.append((locale, key, filename))
 
-    # Find all translation pair files to determine which language pairs should exist
-    translation_pairs = set()
-    for csv_file in sorted(data_dir.glob("625_words-from-*-to-*.csv")):
-        match = re.match(r"625_words-from-(.+)-to-(.+)\.csv", csv_file.name)
-        if match:
-            source_locale, target_locale = match.groups()
-            translation_pairs.add((source_locale, target_locale))
+    # Find files on disk but not in DB
+    unreferenced_files = []
+    for locale_dir, disk_files in disk_files_by_locale.items():
+        db_files = db_files_by_locale.get(locale_dir, set())
+        mp3_files = {name for name in disk_files if name.endswith(".mp3")}
+        orphaned = mp3_files - db_files
+        for filename in sorted(orphaned):
+            unreferenced_files.append((locale_dir, filename))
 
-    if not translation_pairs:
-        print("No translation pair files found, skipping translation pair generation")
-        conn.close()
-        return
+    # Build output and auto-fix if requested
+    output = ""
 
-    total_created = 0
-    for source_locale, target_locale in sorted(translation_pairs):
-        # Find all vocabulary keys that exist in both source and target languages
-        cursor.execute(
-            """
-            SELECT DISTINCT v.key
-            FROM vocabulary v
-            WHERE EXISTS (
-                SELECT 1 FROM base_language bl1
-                WHERE bl1.key = v.key AND bl1.locale = ?
-            )
-            AND EXISTS (
-                SELECT 1 FROM base_language bl2
-                WHERE bl2.key = v.key AND bl2.locale = ?
-            )
-            AND NOT EXISTS (
-                SELECT 1 FROM translation_pair tp
-                WHERE tp.key = v.key
-                  AND tp.source_locale = ?
-                  AND tp.target_locale = ?
+    if missing_on_disk:
+        if auto_fix:
+            output += (
+                "FIXING: Removing audio references from database for missing files:\n"
             )
-            ORDER BY v.key COLLATE NOCASE
-        """,
-            (source_locale, target_locale, source_locale, target_locale),
-        )
+            for locale, key, filename in missing_on_disk:
+                locale_dir = locale_to_directory(locale)
 
-        missing_keys = [row[0] for row in cursor.fetchall()]
+                # Check if this is a minimal pairs entry
+                if " (audio" in key:
+                    # It's a minimal pairs entry
+                    guid, audio_field = key.rsplit(" (", 1)
+                    audio_field = audio_field.rstrip(")")  # Remove trailing ')'
 
-        if missing_keys:
-            # Insert missing translation pairs in database with empty hints
-            for key in missing_keys:
-                cursor.execute(
-                    """
-                    INSERT INTO translation_pair
-                    (key, source_locale, target_locale, guid, pronunciation_hint,
-                     spelling_hint, reading_hint, listening_hint, notes)
-                    VALUES (?, ?, ?, '', '', '', '', '', '')
-                """,
-                    (key, source_locale, target_locale),
-                )
+                    cursor.execute(
+                        f"UPDATE minimal_pairs SET {audio_field} = '' WHERE guid = ? AND target_locale = ?",
+                        (guid, locale),
+                    )
+                    output += f"  ✓ Cleared {audio_field} for minimal pair '{guid}' in {locale_dir}\n"
+                else:
+                    # It's a base_language entry
+                    cursor.execute(
+                        """
+                        UPDATE base_language
+                        SET audio = '', audio_source = ''
+                        WHERE key = ? AND locale = ?
+                        """,
+                        (key, locale),
+                    )
+                    output += f"  ✓ Cleared audio for '{key}' in {locale_dir}\n"
 
             conn.commit()
+            output += "\n"
+        else:
+            output += "AUDIO FILES IN DATABASE BUT NOT ON DISK:\n"
+            for locale, key, filename in missing_on_disk:
+                locale_dir = locale_to_directory(locale)
+                output += f"  - {locale_dir}/{filename} (key: '{key}')\n"
+            output += "\n"
 
-            # Also update the CSV file immediately
-            csv_file = (
-                data_dir / f"625_words-from-{source_locale}-to-{target_locale}.csv"
-            )
+    if unreferenced_files:
+        if auto_fix:
+            output += "FIXING: Deleting unreferenced audio files from disk:\n"
+            for locale_dir, filename in unreferenced_files:
+                file_path = media_dir / locale_dir / filename
+                file_path.unlink()
+                output += f"  ✓ Deleted {locale_dir}/{filename}\n"
+            output += "\n"
+        else:
+            output += "AUDIO FILES ON DISK BUT NOT IN DATABASE:\n"
+            for locale_dir, filename in unreferenced_files:
+                output += f"  - {locale_dir}/{filename}\n"
+            output += "\n"
 
-            # Read existing CSV data
-            existing_rows = []
-            with open(csv_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                existing_rows = list(reader)
-
-            # Add missing keys
-            for key in missing_keys:
-                existing_rows.append(
-                    {
-                        "key": key,
-                        "guid": "",
-                        "pronunciation hint": "",
-                        "spelling hint": "",
-                        "reading hint": "",
-                        "listening hint": "",
-                        "notes": "",
-                    }
-                )
+    db.close(conn)
+    return output
 
-            # Sort by key (case-insensitive)
-            existing_rows.sort(key=lambda row: (row["key"].lower(), row["key"]))
 
-            # Write back to CSV
-            with open(csv_file, "w", encoding="utf-8", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-                writer.writeheader()
-                writer.writerows(existing_rows)
+def _duplicate_values(csv_file: Path, columns: Tuple[str, ...]) -> List[tuple] | None:
+    """Get the values of the given columns that occur in more than one row.
 
-            total_created += len(missing_keys)
-            print(
-                f"Created {len(missing_keys)} missing translation pair entries for {source_locale} → {target_locale}"
-            )
+    Only the needed columns are kept while streaming through the file.
 
-    conn.close()
+    Returns:
+        Sorted duplicate values, or None if the file lacks one of the columns
+    """
+    seen = set()
+    duplicates = set()
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if not set(columns) <= set(header):
+            return None
+        indices = [header.index(column) for column in columns]
+        for row in reader:
+            if not row:
+                continue
+            value = tuple(row[i] if i < len(row) else "" for i in indices)
+            if value in seen:
+                duplicates.add(value)
+            else:
+                seen.add(value)
+    return sorted(duplicates)
 
-    if total_created > 0:
-        print(f"\nTotal: Created {total_created} translation pair entries")
 
+def _check_duplicate_keys(data_dir: Path) -> List[str]:
+    """Check the CSV files for duplicate keys, (key, locale) pairs and GUIDs.
 
-def generate_joined_source_fields(
-    db_path: Path, output_dir: Path, data_dir: Path = Path("src/data")
-):
+    Files are read in parallel, one file per worker.
+
+    Returns:
+        One error message per file with duplicates
     """
-    Generate CSV files that contain the joint source and license information
-    from the SQLite database.
+    checks = [
+        (csv_file, ("key",), "keys")
+        for csv_file in sorted(data_dir.glob("625_words-base-*.csv"))
+        + sorted(data_dir.glob("625_words-from-*-to-*.csv"))
+        + [data_dir / "625_words-pictures.csv"]
+    ]
+    checks.append((data_dir / "tts_overrides.csv", ("key", "locale"), "pairs"))
+    checks.extend(
+        (csv_file, ("guid",), "GUIDs")
+        for csv_file in sorted(data_dir.glob("minimal_pairs-*.csv"))
+    )
+    checks = [check for check in checks if check[0].exists()]
 
-    Also ensures all vocabulary keys exist in all base language files and
-    all translation pair files before generating.
+    with ThreadPoolExecutor(max_workers=min(8, len(checks) or 1)) as executor:
+        results = executor.map(
+            lambda check: _duplicate_values(check[0], check[1]), checks
+        )
+
+        errors = []
+        for (csv_file, _, kind), duplicates in zip(checks, results):
+            if not duplicates:
+                continue
+            if kind == "pairs":
+                errors.append(
+                    f"Duplicate (key, locale) pairs in '{csv_file.name}':\n"
+                    + "\n".join(
+                        f"  - ('{key}', '{locale}')" for key, locale in duplicates
+                    )
+                )
+            else:
+                errors.append(
+                    f"Duplicate {kind} in '{csv_file.name}':\n"
+                    + "\n".join(f"  - '{value}'" for (value,) in duplicates)
+                )
+    return errors
+
+
+_ASCII_LOWERCASE = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+)
+
+
+def _nocase_sort_key(text: str) -> Tuple[str, str]:
+    """Sort key matching ORDER BY ... COLLATE NOCASE (which only folds ASCII)."""
+    return text.translate(_ASCII_LOWERCASE), text
+
+
+def _find_ambiguous_words(
+    cursor: sqlite3.Cursor, pairs: List[Tuple[str, str]] | None = None
+) -> Dict[Tuple[str, str], List[Tuple[str, Tuple, Tuple]]]:
+    """Find ambiguous words missing hints in translation pairs.
+
+    Args:
+        cursor: Database cursor
+        pairs: (source locale, target locale) pairs to check, None for all
+
+    Returns:
+        (word, keys, missing hint columns) by pair, in report order
     """
-    _ensure_db_exists(db_path, data_dir)
-    _check_db_freshness(db_path, data_dir)
+    pair_filter = ""
+    params: List[str] = []
+    if pairs is not None:
+        if not pairs:
+            return {}
+        pair_filter = "AND (tp.source_locale, tp.target_locale) IN (VALUES {})".format(
+            ", ".join("(?, ?)" for _ in pairs)
+        )
+        params = [locale for pair in pairs for locale in pair] * 2
 
-    # First ensure all base language entries exist
-    ensure_base_language_entries_exist(db_path, data_dir)
+    # Duplicate source and target texts of all translation pairs in one pass.
+    # A hint column is reported if it is empty in every row of the group.
+    # Spelling hints are rarely needed (only for target language homophones
+    # with ambiguous source meanings), so they are not checked.
+    cursor.execute(
+        f"""
+        SELECT
+            tp.source_locale,
+            tp.target_locale,
+            'source' AS side,
+            bl.text AS word,
+            GROUP_CONCAT(tp.key, char(31)) AS keys,
+            SUM(CASE WHEN tp.pronunciation_hint IS NULL OR tp.pronunciation_hint = '' THEN 1 ELSE 0 END) = COUNT(*),
+            0,
+            0
+        FROM translation_pair tp
+        JOIN base_language bl ON tp.key = bl.key AND bl.locale = tp.source_locale
+        WHERE bl.text IS NOT NULL AND bl.text != '' {pair_filter}
+        GROUP BY tp.source_locale, tp.target_locale, bl.text
+        HAVING COUNT(*) > 1
+        UNION ALL
+        SELECT
+            tp.source_locale,
+            tp.target_locale,
+            'target' AS side,
+            bl.text AS word,
+            GROUP_CONCAT(tp.key, char(31)) AS keys,
+            0,
+            SUM(CASE WHEN tp.reading_hint IS NULL OR tp.reading_hint = '' THEN 1 ELSE 0 END) = COUNT(*),
+            SUM(CASE WHEN tp.listening_hint IS NULL OR tp.listening_hint = '' THEN 1 ELSE 0 END) = COUNT(*)
+        FROM translation_pair tp
+        JOIN base_language bl ON tp.key = bl.key AND bl.locale = tp.target_locale
+        WHERE bl.text IS NOT NULL AND bl.text != '' {pair_filter}
+        GROUP BY tp.source_locale, tp.target_locale, bl.text
+        HAVING COUNT(*) > 1
+        ORDER BY 1, 2, side, word
+    """,
+        params,
+    )
 
-    # Then ensure all translation pairs exist
-    ensure_translation_pairs_exist(db_path, data_dir)
+    aw_by_pair: Dict[Tuple[str, str], _AmbiguousWords] = {}
+    for row in cursor.fetchall():
+        (
+            source_locale,
+            target_locale,
+            _,
+            word,
+            keys_str,
+            missing_pronunciation,
+            missing_reading,
+            missing_listening,
+        ) = row
+        columns = []
+        if missing_pronunciation:
+            columns.append("pronunciation hint")
+        if missing_reading:
+            columns.append("reading hint")
+        if missing_listening:
+            columns.append("listening hint")
+        if not columns:
+            continue
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+        pair = (source_locale, target_locale)
+        if pair not in aw_by_pair:
+            aw_by_pair[pair] = _AmbiguousWords(
+                f"625_words-from-{source_locale}-to-{target_locale}.csv"
+            )
+        # Keys are joined with the unit separator, as they may contain commas.
+        # GROUP_CONCAT doesn't define their order, so they are sorted like
+        # the rows of the CSV file.
+        keys = sorted(keys_str.split("\x1f"), key=_nocase_sort_key)
+        aw_by_pair[pair].add(word, tuple(keys), tuple(columns))
+
+    return {
+        pair: [
+            (word, keys, empty_columns)
+            for word, (keys, empty_columns) in aw.ambiguous_words.items()
+        ]
+        for pair, aw in aw_by_pair.items()
+    }
 
-    # Get all locales
-    cursor.execute("SELECT DISTINCT locale FROM base_language ORDER BY locale")
-    locales = [row[0] for row in cursor.fetchall()]
 
-    os.makedirs(output_dir, exist_ok=True)
+def _check_ambiguous_words(
+    cursor: sqlite3.Cursor,
+) -> Dict[Tuple[str, str], List[Tuple[str, Tuple, Tuple]]]:
+    """Find ambiguous words, re-checking only pairs changed since the last check.
 
-    for locale in locales:
-        # Get translation pairs that have this locale as target
+    The findings are cached in _meta. A pair is re-checked if one of its rows
+    or a base language row of its source or target locale is in the changelog.
+    """
+    changes, last_id = _read_changelog(cursor, "check")
+    cursor.execute("SELECT value FROM _meta WHERE key = 'ambiguity_findings'")
+    row = cursor.fetchone()
+
+    if changes is None or row is None:
+        findings = _find_ambiguous_words(cursor)
+    else:
+        findings = {
+            tuple(pair.split("|")): [
+                (word, tuple(keys), tuple(empty_columns))
+                for word, keys, empty_columns in pair_findings
+            ]
+            for pair, pair_findings in json.loads(row[0]).items()
+        }
+        changed_pairs = set()
+        changed_locales = set()
+        for table, key in changes:
+            if table == "translation_pair":
+                changed_pairs.add((key[1], key[2]))
+            elif table == "base_language":
+                changed_locales.add(key[1])
         cursor.execute(
-            "SELECT DISTINCT source_locale FROM translation_pair WHERE target_locale = ? ORDER BY source_locale",
-            (locale,),
+            "SELECT DISTINCT source_locale, target_locale FROM translation_pair"
         )
-        source_locales = [row[0] for row in cursor.fetchall()]
-
-        for source_locale in source_locales:
-            # Query with joins to get key and source field
-            query = """
-                SELECT
-                    bl.key,
-                    CASE
-                        WHEN p.picture_source IS NOT NULL AND p.picture_source != ''
-                             AND bl.audio_source IS NOT NULL AND bl.audio_source != ''
-                        THEN 'Picture:<br>' || p.picture_source || '<br><br>Audio:<br>' || bl.audio_source
-                        WHEN p.picture_source IS NOT NULL AND p.picture_source != ''
-                        THEN 'Picture:<br>' || p.picture_source
-                        WHEN bl.audio_source IS NOT NULL AND bl.audio_source != ''
-                        THEN 'Audio:<br>' || bl.audio_source
-                        ELSE ''
-                    END as source
-                FROM base_language bl
-                LEFT JOIN pictures p ON bl.key = p.key
-                WHERE bl.locale = ?
-                ORDER BY bl.key COLLATE NOCASE
-            """
+        changed_pairs |= {
+            pair
+            for pair in cursor.fetchall()
+            if pair[0] in changed_locales or pair[1] in changed_locales
+        }
+        for pair in changed_pairs:
+            findings.pop(pair, None)
+        findings.update(_find_ambiguous_words(cursor, sorted(changed_pairs)))
+        findings = dict(sorted(findings.items()))
 
-            df = pd.read_sql_query(query, conn, params=(locale,))
-            df = df[df["source"] != ""]  # Only keep rows with source
+    cursor.execute(
+        "INSERT OR REPLACE INTO _meta (key, value) VALUES ('ambiguity_findings', ?)",
+        (json.dumps({"|".join(pair): value for pair, value in findings.items()}),),
+    )
+    _advance_changelog(cursor, "check", last_id)
+    return findings
 
-            output_file = output_dir / f"625_words-from-{source_locale}-to-{locale}.csv"
-            df.to_csv(output_file, index=False, lineterminator="\n")
-            print(f"CSV file '{output_file}' written")
 
-    conn.close()
+def ambiguity_detection(
+    db_path: Path,
+    data_dir: Path = Path("src/data"),
+    media_dir: Path | None = Path("src/media/audio"),
+    auto_fix: bool = False,
+) -> str:
+    """
+    Detect ambiguous words and duplicate keys in the database.
 
+    Args:
+        db_path: Path to SQLite database
+        data_dir: Path to CSV data directory
+        media_dir: Path to audio media directory (None to skip audio checks)
+        auto_fix: If True, automatically fix audio file issues
 
-class _AmbiguousWords:
-    def __init__(self, filename: str):
-        self.filename = filename
-        # key is the word, value is a tuple of keys and empty columns
-        self.ambiguous_words: Dict[str, Tuple[Tuple, Tuple]] = dict()
+    Returns:
+        Output string with any errors found or fixes applied
+    """
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir)
 
-    def add(self, word: str, keys: Tuple, empty_columns: Tuple):
-        self.ambiguous_words[word] = (keys, empty_columns)
+    output = ""
 
-    def __repr__(self):
-        return f"{self.filename}: {self.ambiguous_words}"
+    # Check for duplicate keys in CSV files
+    duplicate_errors = _check_duplicate_keys(data_dir)
 
+    if duplicate_errors:
+        output += "DUPLICATE KEY ERRORS FOUND:\n"
+        output += "\n\n".join(duplicate_errors)
+        output += "\n\n"
 
-def _locale_to_directory(locale: str) -> str:
-    """Convert database locale (e.g., 'en_us') to directory format (e.g., 'en_US')."""
-    lang, country = locale.split("_")
-    return f"{lang}_{country.upper()}"
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
 
+    findings = _check_ambiguous_words(cursor)
+    conn.commit()
+    db.close(conn)
 
-def _parse_audio_filename(audio_ref: str) -> str | None:
-    """Parse audio filename from Anki [sound:...] format.
+    for (source_locale, target_locale), words in findings.items():
+        filename = f"625_words-from-{source_locale}-to-{target_locale}.csv"
+        output += (
+            f"The following ambiguous words were found in the file '{filename}':\n"
+        )
+        for word, keys, empty_columns in words:
+            output += f"  - '{word}' has the key(s) {keys} and missing column(s) {empty_columns}\n"
+
+    # Check audio files
+    audio_output = _check_audio_files(db_path, media_dir, auto_fix)
+    output += audio_output
+
+    return output
+
+
+# Hot query shapes with selective filters, which should never scan a whole
+# table. Queries reading (almost) all rows, e.g. the exports of whole
+# tables, are left out.
+_HOT_QUERIES = [
+    (
+        "import-review: update a hint by GUID",
+        "UPDATE translation_pair SET notes = ? WHERE guid = ?",
+    ),
+    (
+        "sqlite2csv, export-review: rows of a translation pair",
+        """
+        SELECT key, guid FROM translation_pair
+        WHERE source_locale = ? AND target_locale = ?
+        ORDER BY key COLLATE NOCASE
+        """,
+    ),
+    (
+        "sqlite2csv, audio: rows of a locale",
+        """
+        SELECT key, text, audio FROM base_language
+        WHERE locale = ?
+        ORDER BY key COLLATE NOCASE
+        """,
+    ),
+    (
+        "sqlite2csv: minimal pairs of a locale pair",
+        """
+        SELECT guid, text1, audio1, ipa1, meaning1, text2, audio2, ipa2, meaning2, tags
+        FROM minimal_pairs
+        WHERE source_locale = ? AND target_locale = ?
+        ORDER BY guid COLLATE NOCASE
+        """,
+    ),
+    (
+        "check --auto-fix: clear missing audio",
+        "UPDATE base_language SET audio = '' WHERE key = ? AND locale = ?",
+    ),
+]
+
+
+def audit_query_plans(db_path: Path, data_dir: Path = Path("src/data")) -> int:
+    """Print the query plans of the hot queries and flag full table scans.
 
     Args:
-        audio_ref: Audio reference in format '[sound:filename.mp3]'
+        db_path: Path to SQLite database
+        data_dir: Path to CSV data directory
 
     Returns:
-        Filename (e.g., 'al_en_us_alive.mp3') or None if invalid format
+        Number of hot queries doing a full table scan
     """
-    if (
-        not audio_ref
-        or not audio_ref.startswith("[sound:")
-        or not audio_ref.endswith("]")
-    ):
-        return None
-    return audio_ref[7:-1]  # Strip '[sound:' and ']'
+    ensure_db_exists(db_path, data_dir)
 
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
 
-def _check_audio_files(
-    db_path: Path,
-    media_dir: Path | None = Path("src/media/audio"),
-    auto_fix: bool = False,
-) -> str:
-    """Check for audio file mismatches between database and disk.
+    print("━" * 70)
+    print("QUERY PLAN AUDIT")
+    print("━" * 70)
+    full_scans = 0
+    for description, sql in _HOT_QUERIES:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count("?"))
+        details = [row[3] for row in cursor.fetchall()]
+        # "SCAN table" reads every row, "SEARCH table USING INDEX" doesn't
+        scans = [detail for detail in details if detail.startswith("SCAN ")]
+        if scans:
+            full_scans += 1
+        print(f"{'✗' if scans else '✓'} {description}")
+        for detail in details:
+            print(f"    {detail}")
+
+    db.close(conn)
 
-    Checks:
-    1. Audio files referenced in DB but not on disk
-    2. Audio files on disk but not referenced in DB
+    print()
+    if full_scans:
+        print(f"{full_scans} of {len(_HOT_QUERIES)} hot queries scan a whole table.")
+        print("Re-create the database with csv2sqlite to create missing indexes.")
+    else:
+        print(f"All {len(_HOT_QUERIES)} hot queries use an index.")
+    return full_scans
 
-    Args:
-        db_path: Path to SQLite database
-        media_dir: Path to audio media directory (None to skip audio checks)
-        auto_fix: If True, automatically fix issues (remove DB refs for missing files, delete orphaned files)
 
-    Returns:
-        Error message string if issues found, empty string otherwise
-    """
-    # Skip audio checks if media_dir is None (e.g., in tests)
-    if media_dir is None:
-        return ""
+class SyncConflictError(Exception):
+    """Raised when there's a conflict between DB and CSV files."""
+
+    pass
+
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS vocabulary (
+        key TEXT PRIMARY KEY,
+        clarification TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS base_language (
+        key TEXT NOT NULL,
+        locale TEXT NOT NULL,
+        text TEXT,
+        ipa TEXT,
+        audio TEXT,
+        audio_source TEXT,
+        PRIMARY KEY (key, locale),
+        FOREIGN KEY (key) REFERENCES vocabulary(key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS translation_pair (
+        key TEXT NOT NULL,
+        source_locale TEXT NOT NULL,
+        target_locale TEXT NOT NULL,
+        guid TEXT,
+        pronunciation_hint TEXT,
+        spelling_hint TEXT,
+        reading_hint TEXT,
+        listening_hint TEXT,
+        notes TEXT,
+        PRIMARY KEY (key, source_locale, target_locale),
+        FOREIGN KEY (key) REFERENCES vocabulary(key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pictures (
+        key TEXT PRIMARY KEY,
+        picture TEXT,
+        picture_source TEXT,
+        FOREIGN KEY (key) REFERENCES vocabulary(key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS minimal_pairs (
+        guid TEXT PRIMARY KEY,
+        source_locale TEXT NOT NULL,
+        target_locale TEXT NOT NULL,
+        text1 TEXT,
+        audio1 TEXT,
+        ipa1 TEXT,
+        meaning1 TEXT,
+        text2 TEXT,
+        audio2 TEXT,
+        ipa2 TEXT,
+        meaning2 TEXT,
+        tags TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tts_overrides (
+        key TEXT NOT NULL,
+        locale TEXT NOT NULL,
+        tts_text TEXT NOT NULL,
+        is_ssml BOOLEAN DEFAULT 0,
+        notes TEXT,
+        PRIMARY KEY (key, locale),
+        FOREIGN KEY (key) REFERENCES vocabulary(key)
+    )
+    """,
+    # I18n tables
+    """
+    CREATE TABLE IF NOT EXISTS i18n_language_names (
+        source_locale TEXT NOT NULL,
+        target_locale TEXT NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (source_locale, target_locale)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS i18n_ui_strings (
+        locale TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (locale, key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS i18n_card_types (
+        locale TEXT NOT NULL,
+        card_type TEXT NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (locale, card_type)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS _meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """,
+    # Rows changed since the last import, filled by the modification triggers.
+    # row_key is a JSON array of the columns in _CHANGELOG_KEYS.
+    """
+    CREATE TABLE IF NOT EXISTS _changelog (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_key TEXT NOT NULL,
+        op TEXT NOT NULL,
+        changed_at TEXT NOT NULL
+    )
+    """,
+]
+
+# Data tables in the order they are cleared before a full import
+_DATA_TABLES = [
+    "base_language",
+    "translation_pair",
+    "pictures",
+    "minimal_pairs",
+    "tts_overrides",
+    "i18n_language_names",
+    "i18n_ui_strings",
+    "i18n_card_types",
+    "vocabulary",
+]
+
+# Columns identifying a changed row and the CSV file it belongs to
+_CHANGELOG_KEYS = {
+    "base_language": ["key", "locale"],
+    "translation_pair": ["key", "source_locale", "target_locale"],
+    "pictures": ["key"],
+    "minimal_pairs": ["guid", "source_locale", "target_locale"],
+    "tts_overrides": ["key", "locale"],
+    "i18n_language_names": ["source_locale", "target_locale"],
+    "i18n_ui_strings": ["locale", "key"],
+    "i18n_card_types": ["locale", "card_type"],
+    "vocabulary": ["key"],
+}
 
-    # Get all audio references from base_language table
-    cursor.execute("""
-        SELECT locale, audio, key
-        FROM base_language
-        WHERE audio IS NOT NULL AND audio <> ''
-        ORDER BY locale, key
-    """)
-    db_audio_refs = list(cursor.fetchall())
+# Secondary indexes for the hot query shapes (see _HOT_QUERIES). A full
+# import drops them for the bulk load and creates them afterwards.
+_INDEXES = {
+    "idx_base_language_locale_text": "base_language (locale, text)",
+    "idx_translation_pair_locales": "translation_pair (source_locale, target_locale)",
+    "idx_translation_pair_guid": "translation_pair (guid)",
+    "idx_minimal_pairs_locales": "minimal_pairs (source_locale, target_locale)",
+}
 
-    # Get all audio references from minimal_pairs table
-    cursor.execute("""
-        SELECT target_locale, audio1, guid || ' (audio1)'
-        FROM minimal_pairs
-        WHERE audio1 IS NOT NULL AND audio1 <> ''
-        UNION ALL
-        SELECT target_locale, audio2, guid || ' (audio2)'
-        FROM minimal_pairs
-        WHERE audio2 IS NOT NULL AND audio2 <> ''
-    """)
-    db_audio_refs.extend(cursor.fetchall())
+# The database is a disposable cache of the CSV files, so the import trades
+# crash safety for speed. A crashed import is fixed by re-running csv2sqlite.
+_BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -65536",
+    # References between the CSV files are not validated on import
+    "PRAGMA foreign_keys = OFF",
+]
 
-    # Build set of audio files referenced in DB, grouped by locale
-    db_files_by_locale: Dict[str, Set[str]] = {}
-    missing_on_disk = []
 
-    for locale, audio_ref, key in db_audio_refs:
-        filename = _parse_audio_filename(audio_ref)
-        if not filename:
-            continue
+@dataclass
+class _ImportBatch:
+    """Rows parsed from one CSV file, ready for executemany."""
 
-        locale_dir = _locale_to_directory(locale)
-        if locale_dir not in db_files_by_locale:
-            db_files_by_locale[locale_dir] = set()
-        db_files_by_locale[locale_dir].add(filename)
+    filename: str
+    table: str
+    insert_sql: str
+    rows: List[tuple]
+    # Vocabulary keys referenced by the file (inserted with INSERT OR IGNORE)
+    keys: List[str]
 
-        # Check if file exists on disk
-        audio_path = media_dir / locale_dir / filename
-        if not audio_path.exists():
-            missing_on_disk.append((locale, key, filename))
 
-    # Build set of audio files on disk, grouped by locale
-    disk_files_by_locale: Dict[str, Set[str]] = {}
-    if media_dir.exists():
-        for locale_dir in media_dir.iterdir():
-            if not locale_dir.is_dir():
-                continue
+def _create_schema(cursor: sqlite3.Cursor):
+    """Create all tables if they don't exist yet."""
+    for statement in _SCHEMA:
+        cursor.execute(statement)
 
-            locale_name = locale_dir.name
-            disk_files_by_locale[locale_name] = set()
 
-            for audio_file in locale_dir.glob("*.mp3"):
-                disk_files_by_locale[locale_name].add(audio_file.name)
+def _drop_indexes(cursor: sqlite3.Cursor):
+    """Drop the secondary indexes."""
+    for name in _INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
 
-    # Find files on disk but not in DB
-    unreferenced_files = []
-    for locale_dir, disk_files in disk_files_by_locale.items():
-        db_files = db_files_by_locale.get(locale_dir, set())
-        orphaned = disk_files - db_files
-        for filename in sorted(orphaned):
-            unreferenced_files.append((locale_dir, filename))
 
-    # Build output and auto-fix if requested
-    output = ""
+def _create_indexes(cursor: sqlite3.Cursor):
+    """Create the secondary indexes if they don't exist yet."""
+    for name, columns in _INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
 
-    if missing_on_disk:
-        if auto_fix:
-            output += (
-                "FIXING: Removing audio references from database for missing files:\n"
-            )
-            for locale, key, filename in missing_on_disk:
-                locale_dir = _locale_to_directory(locale)
 
-                # Check if this is a minimal pairs entry
-                if " (audio" in key:
-                    # It's a minimal pairs entry
-                    guid, audio_field = key.rsplit(" (", 1)
-                    audio_field = audio_field.rstrip(")")  # Remove trailing ')'
+def _drop_modification_triggers(cursor: sqlite3.Cursor):
+    """Drop the triggers that track data modifications."""
+    for table in _DATA_TABLES:
+        for op in ["insert", "update", "delete"]:
+            cursor.execute(f"DROP TRIGGER IF EXISTS track_mod_{table}_{op}")
 
-                    cursor.execute(
-                        f"UPDATE minimal_pairs SET {audio_field} = '' WHERE guid = ? AND target_locale = ?",
-                        (guid, locale),
-                    )
-                    output += f"  ✓ Cleared {audio_field} for minimal pair '{guid}' in {locale_dir}\n"
-                else:
-                    # It's a base_language entry
-                    cursor.execute(
-                        """
-                        UPDATE base_language
-                        SET audio = '', audio_source = ''
-                        WHERE key = ? AND locale = ?
-                        """,
-                        (key, locale),
-                    )
-                    output += f"  ✓ Cleared audio for '{key}' in {locale_dir}\n"
 
-            conn.commit()
-            output += "\n"
-        else:
-            output += "AUDIO FILES IN DATABASE BUT NOT ON DISK:\n"
-            for locale, key, filename in missing_on_disk:
-                locale_dir = _locale_to_directory(locale)
-                output += f"  - {locale_dir}/{filename} (key: '{key}')\n"
-            output += "\n"
+def _create_modification_triggers(cursor: sqlite3.Cursor):
+    """Create triggers to track data modifications (only on data tables, not _meta).
 
-    if unreferenced_files:
-        if auto_fix:
-            output += "FIXING: Deleting unreferenced audio files from disk:\n"
-            for locale_dir, filename in unreferenced_files:
-                file_path = media_dir / locale_dir / filename
-                file_path.unlink()
-                output += f"  ✓ Deleted {locale_dir}/{filename}\n"
-            output += "\n"
-        else:
-            output += "AUDIO FILES ON DISK BUT NOT IN DATABASE:\n"
-            for locale_dir, filename in unreferenced_files:
-                output += f"  - {locale_dir}/{filename}\n"
-            output += "\n"
+    Every modification bumps db_data_modified_at and is logged in _changelog.
+    An update that changes the key columns is also logged as a deletion of
+    the old key.
+    """
+    for table in _DATA_TABLES:
+        columns = _CHANGELOG_KEYS[table]
+        new_key = f"json_array({', '.join(f'NEW.{c}' for c in columns)})"
+        old_key = f"json_array({', '.join(f'OLD.{c}' for c in columns)})"
+        for op in ["INSERT", "UPDATE", "DELETE"]:
+            trigger_name = f"track_mod_{table}_{op.lower()}"
+            log = f"""
+                    INSERT INTO _changelog (table_name, row_key, op, changed_at)
+                    VALUES ('{table}', {old_key if op == "DELETE" else new_key},
+                            '{op}', strftime('%Y-%m-%dT%H:%M:%SZ', 'now'));"""
+            if op == "UPDATE":
+                log += f"""
+                    INSERT INTO _changelog (table_name, row_key, op, changed_at)
+                    SELECT '{table}', {old_key}, 'DELETE',
+                           strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+                    WHERE {old_key} IS NOT {new_key};"""
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            cursor.execute(f"""
+                CREATE TRIGGER {trigger_name} AFTER {op} ON {table}
+                BEGIN
+                    UPDATE _meta SET value = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+                    WHERE key = 'db_data_modified_at';{log}
+                END
+            """)
 
-    conn.close()
-    return output
 
+def _reset_changelog(cursor: sqlite3.Cursor):
+    """Clear the changelog after an import, which isn't logged.
 
-def ambiguity_detection(
-    db_path: Path,
-    data_dir: Path = Path("src/data"),
-    media_dir: Path | None = Path("src/media/audio"),
-    auto_fix: bool = False,
-) -> str:
+    The cursors of all consumers are removed, so they process everything on
+    their next run. Only sqlite2csv starts from the current position, as the
+    CSV files match the database after an import.
     """
-    Detect ambiguous words and duplicate keys in the database.
+    cursor.execute(
+        "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = '_changelog'"
+    )
+    (last_id,) = cursor.fetchone()
+    cursor.execute("DELETE FROM _changelog")
+    cursor.execute("DELETE FROM _meta WHERE key LIKE 'changelog_cursor:%'")
+    cursor.execute(
+        "INSERT INTO _meta (key, value) VALUES ('changelog_cursor:sqlite2csv', ?)",
+        (str(last_id),),
+    )
+
+
+def _read_changelog(
+    cursor: sqlite3.Cursor, consumer: str
+) -> Tuple[List[Tuple[str, list]] | None, int]:
+    """Get the rows changed since a consumer last ran.
 
     Args:
-        db_path: Path to SQLite database
-        data_dir: Path to CSV data directory
-        media_dir: Path to audio media directory (None to skip audio checks)
-        auto_fix: If True, automatically fix audio file issues
+        cursor: Database cursor
+        consumer: Name of the consumer, e.g. "check"
 
     Returns:
-        Output string with any errors found or fixes applied
+        (table, key values) of the changed rows, or None if the consumer has
+        to process everything, and the id to pass to _advance_changelog
     """
-    _ensure_db_exists(db_path, data_dir)
-    _check_db_freshness(db_path, data_dir)
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM _changelog")
+    except sqlite3.OperationalError:
+        # Database created before the changelog existed
+        return None, 0
+    (last_id,) = cursor.fetchone()
+    cursor.execute(
+        "SELECT value FROM _meta WHERE key = ?", (f"changelog_cursor:{consumer}",)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None, last_id
+    cursor.execute(
+        "SELECT DISTINCT table_name, row_key FROM _changelog WHERE id > ? AND id <= ?",
+        (int(row[0]), last_id),
+    )
+    return [
+        (table, json.loads(row_key)) for table, row_key in cursor.fetchall()
+    ], last_id
 
-    output = ""
 
-    # Check for duplicate keys in CSV files
-    duplicate_errors = []
+def _advance_changelog(cursor: sqlite3.Cursor, consumer: str, last_id: int):
+    """Mark the changelog as processed by a consumer up to last_id.
 
-    # Check base language files
-    for csv_file in sorted(data_dir.glob("625_words-base-*.csv")):
-        df = pd.read_csv(csv_file, sep=",")
-        if df["key"].duplicated().any():
-            duplicates = df[df["key"].duplicated(keep=False)].sort_values("key")
-            duplicate_errors.append(
-                f"Duplicate keys in '{csv_file.name}':\n"
-                + "\n".join(f"  - '{key}'" for key in duplicates["key"].unique())
+    Entries processed by all consumers are removed.
+    """
+    try:
+        cursor.execute(
+            "INSERT OR REPLACE INTO _meta (key, value) VALUES (?, ?)",
+            (f"changelog_cursor:{consumer}", str(last_id)),
+        )
+        cursor.execute("""
+            DELETE FROM _changelog WHERE id <= (
+                SELECT MIN(CAST(value AS INTEGER)) FROM _meta
+                WHERE key LIKE 'changelog_cursor:%'
             )
+        """)
+    except sqlite3.OperationalError:
+        # Database created before the changelog existed
+        pass
 
-    # Check translation pair files
-    for csv_file in sorted(data_dir.glob("625_words-from-*-to-*.csv")):
-        df = pd.read_csv(csv_file, sep=",")
-        if df["key"].duplicated().any():
-            duplicates = df[df["key"].duplicated(keep=False)].sort_values("key")
-            duplicate_errors.append(
-                f"Duplicate keys in '{csv_file.name}':\n"
-                + "\n".join(f"  - '{key}'" for key in duplicates["key"].unique())
-            )
 
-    # Check pictures file
-    pictures_file = data_dir / "625_words-pictures.csv"
-    if pictures_file.exists():
-        df = pd.read_csv(pictures_file, sep=",")
-        if df["key"].duplicated().any():
-            duplicates = df[df["key"].duplicated(keep=False)].sort_values("key")
-            duplicate_errors.append(
-                f"Duplicate keys in '{pictures_file.name}':\n"
-                + "\n".join(f"  - '{key}'" for key in duplicates["key"].unique())
-            )
+def _read_csv_rows(csv_file: Path) -> List[dict]:
+    with open(csv_file, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
 
-    # Check tts_overrides file for duplicate (key, locale) pairs
-    tts_file = data_dir / "tts_overrides.csv"
-    if tts_file.exists():
-        df = pd.read_csv(tts_file, sep=",")
-        if df[["key", "locale"]].duplicated().any():
-            duplicates = df[df[["key", "locale"]].duplicated(keep=False)].sort_values(
-                ["key", "locale"]
-            )
-            duplicate_errors.append(
-                f"Duplicate (key, locale) pairs in '{tts_file.name}':\n"
-                + "\n".join(
-                    f"  - ('{row['key']}', '{row['locale']}')"
-                    for _, row in duplicates[["key", "locale"]]
-                    .drop_duplicates()
-                    .iterrows()
-                )
-            )
 
-    # Check minimal pairs files for duplicate guids
-    for csv_file in sorted(data_dir.glob("minimal_pairs-*.csv")):
-        df = pd.read_csv(csv_file, sep=",")
-        if "guid" in df.columns and df["guid"].duplicated().any():
-            duplicates = df[df["guid"].duplicated(keep=False)].sort_values("guid")
-            duplicate_errors.append(
-                f"Duplicate GUIDs in '{csv_file.name}':\n"
-                + "\n".join(f"  - '{guid}'" for guid in duplicates["guid"].unique())
-            )
+_BASE_FILE_RE = re.compile(r"625_words-base-(.+)\.csv")
+_PAIR_FILE_RE = re.compile(r"625_words-from-(.+)-to-(.+)\.csv")
+_MINIMAL_PAIRS_FILE_RE = re.compile(r"minimal_pairs-from-(.+)_to_(.+)\.csv")
 
-    if duplicate_errors:
-        output += "DUPLICATE KEY ERRORS FOUND:\n"
-        output += "\n\n".join(duplicate_errors)
-        output += "\n\n"
+_I18N_FILES = {
+    "i18n/language_names.csv": (
+        "i18n_language_names",
+        ["source_locale", "target_locale", "name"],
+    ),
+    "i18n/ui_strings.csv": ("i18n_ui_strings", ["locale", "key", "value"]),
+    "i18n/card_types.csv": ("i18n_card_types", ["locale", "card_type", "name"]),
+}
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    # Get all translation pairs
-    cursor.execute("""
-        SELECT DISTINCT source_locale, target_locale
-        FROM translation_pair
-        ORDER BY source_locale, target_locale
-    """)
-    pairs = cursor.fetchall()
+def _list_import_files(data_dir: Path) -> List[str]:
+    """List the CSV files to import, relative to data_dir, in import order."""
+    names = []
+    if (data_dir / "625_words-vocabulary.csv").exists():
+        names.append("625_words-vocabulary.csv")
+    names.extend(f.name for f in sorted(data_dir.glob("625_words-base-*.csv")))
+    names.extend(
+        f.name
+        for f in sorted(data_dir.glob("625_words-from-*-to-*.csv"))
+        if _PAIR_FILE_RE.fullmatch(f.name)
+    )
+    for name in ["625_words-pictures.csv", "tts_overrides.csv"]:
+        if (data_dir / name).exists():
+            names.append(name)
+    names.extend(
+        f.name
+        for f in sorted(data_dir.glob("minimal_pairs-*.csv"))
+        if _MINIMAL_PAIRS_FILE_RE.fullmatch(f.name)
+    )
+    names.extend(name for name in _I18N_FILES if (data_dir / name).exists())
+    return names
 
-    aw_list: List[_AmbiguousWords] = []
 
-    for source_locale, target_locale in pairs:
-        filename = f"625_words-from-{source_locale}-to-{target_locale}.csv"
-        aw_obj = _AmbiguousWords(filename)
+def _owned_rows(filename: str) -> Tuple[str, str, tuple] | None:
+    """Get (table, WHERE clause, params) selecting the rows imported from a CSV file.
 
-        # Find duplicate source texts
-        cursor.execute(
-            """
-            SELECT
-                bl_from.text as word,
-                GROUP_CONCAT(tp.key) as keys,
-                MAX(CASE WHEN tp.pronunciation_hint IS NULL OR tp.pronunciation_hint = '' THEN 1 ELSE 0 END) as missing_pronunciation
-            FROM translation_pair tp
-            JOIN base_language bl_from ON tp.key = bl_from.key AND bl_from.locale = tp.source_locale
-            WHERE tp.source_locale = ? AND tp.target_locale = ?
-                AND bl_from.text IS NOT NULL AND bl_from.text != ''
-            GROUP BY bl_from.text
-            HAVING COUNT(*) > 1
-        """,
-            (source_locale, target_locale),
+    Returns None for the vocabulary file, whose keys are shared with all other
+    files, and for files that are not imported.
+    """
+    if match := _BASE_FILE_RE.fullmatch(filename):
+        return "base_language", "locale = ?", match.groups()
+    if match := _PAIR_FILE_RE.fullmatch(filename):
+        return (
+            "translation_pair",
+            "source_locale = ? AND target_locale = ?",
+            match.groups(),
+        )
+    if match := _MINIMAL_PAIRS_FILE_RE.fullmatch(filename):
+        return (
+            "minimal_pairs",
+            "source_locale = ? AND target_locale = ?",
+            match.groups(),
+        )
+    if filename == "625_words-pictures.csv":
+        return "pictures", "1", ()
+    if filename == "tts_overrides.csv":
+        return "tts_overrides", "1", ()
+    if filename in _I18N_FILES:
+        return _I18N_FILES[filename][0], "1", ()
+    return None
+
+
+def _read_import_batch(data_dir: Path, filename: str) -> _ImportBatch:
+    """Parse one CSV file (as listed by _list_import_files) into an import batch."""
+    csv_file = data_dir / filename
+
+    if filename == "625_words-vocabulary.csv":
+        return _ImportBatch(
+            filename,
+            "vocabulary",
+            "INSERT INTO vocabulary (key, clarification) VALUES (?, ?)",
+            [
+                (row["key"], row.get("clarification") or "")
+                for row in _read_csv_rows(csv_file)
+            ],
+            [],
         )
 
-        for row in cursor.fetchall():
-            word, keys_str, missing_pronunciation = row
-            keys = tuple(keys_str.split(","))
-            columns = []
+    if match := _BASE_FILE_RE.fullmatch(filename):
+        locale = match.group(1)
+        lang_short = locale.split("_")[0]
+        rows = _read_csv_rows(csv_file)
+        return _ImportBatch(
+            filename,
+            "base_language",
+            """
+            INSERT OR REPLACE INTO base_language
+            (key, locale, text, ipa, audio, audio_source)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    row["key"],
+                    locale,
+                    row.get(f"text:{lang_short}", ""),
+                    row.get(f"ipa:{lang_short}", ""),
+                    row.get(f"audio:{lang_short}", ""),
+                    row.get(f"audio source:{lang_short}", ""),
+                )
+                for row in rows
+            ],
+            [row["key"] for row in rows],
+        )
 
-            # Check if all rows are missing the hints (all must be missing)
-            if missing_pronunciation:
-                # Verify all rows have missing pronunciation hint
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) FROM translation_pair
-                    WHERE key IN ({}) AND source_locale = ? AND target_locale = ?
-                        AND (pronunciation_hint IS NULL OR pronunciation_hint = '')
-                """.format(",".join("?" * len(keys))),
-                    (*keys, source_locale, target_locale),
+    if match := _PAIR_FILE_RE.fullmatch(filename):
+        source_locale, target_locale = match.groups()
+        rows = _read_csv_rows(csv_file)
+        return _ImportBatch(
+            filename,
+            "translation_pair",
+            """
+            INSERT OR REPLACE INTO translation_pair
+            (key, source_locale, target_locale, guid, pronunciation_hint,
+             spelling_hint, reading_hint, listening_hint, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    row["key"],
+                    source_locale,
+                    target_locale,
+                    row.get("guid", ""),
+                    row.get("pronunciation hint", ""),
+                    row.get("spelling hint", ""),
+                    row.get("reading hint", ""),
+                    row.get("listening hint", ""),
+                    row.get("notes", ""),
                 )
-                if cursor.fetchone()[0] == len(keys):
-                    columns.append("pronunciation hint")
+                for row in rows
+            ],
+            [row["key"] for row in rows],
+        )
 
-            # Note: spelling hints are rarely needed (only for target language
-            # homophones with ambiguous source meanings), so we don't check for them
+    if filename == "625_words-pictures.csv":
+        rows = [row for row in _read_csv_rows(csv_file) if row["key"]]
+        return _ImportBatch(
+            filename,
+            "pictures",
+            """
+            INSERT OR REPLACE INTO pictures (key, picture, picture_source)
+            VALUES (?, ?, ?)
+            """,
+            [
+                (row["key"], row.get("picture", ""), row.get("picture source", ""))
+                for row in rows
+            ],
+            [row["key"] for row in rows],
+        )
 
-            if columns:
-                aw_obj.add(word, keys, tuple(columns))
+    if filename == "tts_overrides.csv":
+        rows = [
+            row
+            for row in _read_csv_rows(csv_file)
+            if row.get("key") and row.get("locale") and row.get("tts_text")
+        ]
+        return _ImportBatch(
+            filename,
+            "tts_overrides",
+            """
+            INSERT OR REPLACE INTO tts_overrides (key, locale, tts_text, is_ssml, notes)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    row["key"],
+                    row["locale"],
+                    row["tts_text"],
+                    1 if row.get("is_ssml", "0") == "1" else 0,
+                    row.get("notes", ""),
+                )
+                for row in rows
+            ],
+            [row["key"] for row in rows],
+        )
 
-        # Find duplicate target texts
-        cursor.execute(
+    if match := _MINIMAL_PAIRS_FILE_RE.fullmatch(filename):
+        source_locale, target_locale = match.groups()
+        return _ImportBatch(
+            filename,
+            "minimal_pairs",
             """
-            SELECT
-                bl_to.text as word,
-                GROUP_CONCAT(tp.key) as keys,
-                MAX(CASE WHEN tp.reading_hint IS NULL OR tp.reading_hint = '' THEN 1 ELSE 0 END) as missing_reading,
-                MAX(CASE WHEN tp.listening_hint IS NULL OR tp.listening_hint = '' THEN 1 ELSE 0 END) as missing_listening
-            FROM translation_pair tp
-            JOIN base_language bl_to ON tp.key = bl_to.key AND bl_to.locale = tp.target_locale
-            WHERE tp.source_locale = ? AND tp.target_locale = ?
-                AND bl_to.text IS NOT NULL AND bl_to.text != ''
-            GROUP BY bl_to.text
-            HAVING COUNT(*) > 1
+            INSERT OR REPLACE INTO minimal_pairs
+            (guid, source_locale, target_locale, text1, audio1, ipa1, meaning1,
+             text2, audio2, ipa2, meaning2, tags)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    row["guid"],
+                    source_locale,
+                    target_locale,
+                    row.get("text1", ""),
+                    row.get("audio1", ""),
+                    row.get("ipa1", ""),
+                    row.get("meaning1", ""),
+                    row.get("text2", ""),
+                    row.get("audio2", ""),
+                    row.get("ipa2", ""),
+                    row.get("meaning2", ""),
+                    row.get("tags", ""),
+                )
+                for row in _read_csv_rows(csv_file)
+                if row.get("guid")
+            ],
+            [],
+        )
+
+    table, columns = _I18N_FILES[filename]
+    return _ImportBatch(
+        filename,
+        table,
+        f"""
+        INSERT OR REPLACE INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
         """,
-            (source_locale, target_locale),
+        [tuple(row[column] for column in columns) for row in _read_csv_rows(csv_file)],
+        [],
+    )
+
+
+def _insert_batch(cursor: sqlite3.Cursor, batch: _ImportBatch):
+    if batch.keys:
+        cursor.executemany(
+            "INSERT OR IGNORE INTO vocabulary (key) VALUES (?)",
+            [(key,) for key in batch.keys],
         )
+    cursor.executemany(batch.insert_sql, batch.rows)
+    print(f"Imported {batch.filename.removeprefix('i18n/')}")
 
-        for row in cursor.fetchall():
-            word, keys_str, missing_reading, missing_listening = row
-            keys = tuple(keys_str.split(","))
-            columns = []
 
-            if missing_reading:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) FROM translation_pair
-                    WHERE key IN ({}) AND source_locale = ? AND target_locale = ?
-                        AND (reading_hint IS NULL OR reading_hint = '')
-                """.format(",".join("?" * len(keys))),
-                    (*keys, source_locale, target_locale),
-                )
-                if cursor.fetchone()[0] == len(keys):
-                    columns.append("reading hint")
+def _save_sync_metadata(cursor: sqlite3.Cursor, fingerprints: Dict[str, list]):
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    csv_hashes = {name: fp[3] for name, fp in fingerprints.items()}
+    cursor.executemany(
+        "INSERT OR REPLACE INTO _meta (key, value) VALUES (?, ?)",
+        [
+            ("csv_hashes", json.dumps(csv_hashes)),
+            ("csv_fingerprints", json.dumps(fingerprints)),
+            ("synced_at", now),
+            ("db_data_modified_at", now),  # Reset to synced_at after import
+        ],
+    )
 
-            if missing_listening:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) FROM translation_pair
-                    WHERE key IN ({}) AND source_locale = ? AND target_locale = ?
-                        AND (listening_hint IS NULL OR listening_hint = '')
-                """.format(",".join("?" * len(keys))),
-                    (*keys, source_locale, target_locale),
-                )
-                if cursor.fetchone()[0] == len(keys):
-                    columns.append("listening hint")
 
-            if columns:
-                aw_obj.add(word, keys, tuple(columns))
+def _plan_incremental_import(
+    db_path: Path, csv_hashes: Dict[str, str]
+) -> List[str] | None:
+    """Get the CSV files an incremental import has to reload.
 
-        aw_list.append(aw_obj)
+    Deleted files are included with their old name. Returns None if the
+    database has to be rebuilt from scratch instead: it is missing, has never
+    been synced, has unsaved edits, or the vocabulary file changed.
+    """
+    if not db_path.exists():
+        return None
 
-    conn.close()
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    existing_tables = {row[0] for row in cursor.fetchall()}
+    if not set(_DATA_TABLES + ["_meta"]) <= existing_tables:
+        db.close(conn)
+        return None
+    cursor.execute("SELECT key, value FROM _meta")
+    metadata = {row[0]: row[1] for row in cursor.fetchall()}
+    db.close(conn)
 
-    for aw_obj in aw_list:
-        if aw_obj.ambiguous_words:
-            output += f"The following ambiguous words were found in the file '{aw_obj.filename}':\n"
-            for word, (keys, empty_columns) in aw_obj.ambiguous_words.items():
-                output += f"  - '{word}' has the key(s) {keys} and missing column(s) {empty_columns}\n"
+    synced_at = metadata.get("synced_at")
+    db_modified_at = metadata.get("db_data_modified_at")
+    if "csv_hashes" not in metadata or not synced_at or not db_modified_at:
+        return None
+    # Edits can be anywhere in the database, so they can only be discarded
+    # by a full import
+    if db_modified_at > synced_at:
+        return None
 
-    # Check audio files
-    audio_output = _check_audio_files(db_path, media_dir, auto_fix)
-    output += audio_output
+    stored_hashes = json.loads(metadata["csv_hashes"])
+    changed = [
+        name
+        for name in sorted(set(stored_hashes) | set(csv_hashes))
+        if stored_hashes.get(name) != csv_hashes.get(name)
+    ]
+    if "625_words-vocabulary.csv" in changed:
+        return None
+    return changed
 
-    return output
 
+def _import_changed_files(
+    data_dir: Path, db_path: Path, changed: List[str], fingerprints: Dict[str, list]
+):
+    """Reload the rows owned by the changed CSV files in a single transaction."""
+    batches = [
+        _read_import_batch(data_dir, name)
+        for name in _list_import_files(data_dir)
+        if name in changed
+    ]
 
-class SyncConflictError(Exception):
-    """Raised when there's a conflict between DB and CSV files."""
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+    for pragma in _BULK_LOAD_PRAGMAS:
+        cursor.execute(pragma)
 
-    pass
+    cursor.execute("BEGIN")
+    try:
+        _create_schema(cursor)
+        _drop_modification_triggers(cursor)
+
+        for name in changed:
+            owned = _owned_rows(name)
+            if owned is None:
+                continue
+            table, where, params = owned
+            cursor.execute(f"DELETE FROM {table} WHERE {where}", params)
+            if name not in fingerprints:
+                print(f"Removed rows of deleted file {name.removeprefix('i18n/')}")
+
+        for batch in batches:
+            _insert_batch(cursor, batch)
+
+        # Drop vocabulary keys that were only referenced by removed rows.
+        # Keys from the vocabulary file always have a (possibly empty)
+        # clarification, keys added implicitly by other files have NULL.
+        cursor.execute("""
+            DELETE FROM vocabulary
+            WHERE clarification IS NULL
+              AND key NOT IN (
+                SELECT key FROM base_language
+                UNION SELECT key FROM translation_pair
+                UNION SELECT key FROM pictures
+                UNION SELECT key FROM tts_overrides
+              )
+        """)
+
+        _save_sync_metadata(cursor, fingerprints)
+        _reset_changelog(cursor)
+        _create_indexes(cursor)
+        _create_modification_triggers(cursor)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        db.configure(conn)
+        db.close(conn)
 
 
 def csv2sqlite(
-    data_dir: Path, db_path: Path, force: bool = False, fail_if_conflict: bool = False
+    data_dir: Path,
+    db_path: Path,
+    force: bool = False,
+    fail_if_conflict: bool = False,
+    incremental: bool = False,
 ):
-    """Import all CSV files from data_dir into SQLite database."""
+    """Import all CSV files from data_dir into SQLite database.
+
+    All files are parsed up front and loaded with executemany in a single
+    transaction. The modification-tracking triggers and secondary indexes are
+    dropped for the duration of the load and recreated afterwards.
+
+    With incremental=True only the rows owned by CSV files whose hash changed
+    since the last sync are replaced. It falls back to a full import when the
+    database has unsaved edits or the vocabulary file changed.
+    """
     # Check if database has unsaved edits before overwriting
     if db_path.exists() and not force:
         metadata = _get_sync_metadata(db_path)
@@ -1270,372 +2965,74 @@ def csv2sqlite(
                 print("Cancelled.")
                 sys.exit(1)
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Create schema
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS vocabulary (
-            key TEXT PRIMARY KEY,
-            clarification TEXT
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS base_language (
-            key TEXT NOT NULL,
-            locale TEXT NOT NULL,
-            text TEXT,
-            ipa TEXT,
-            audio TEXT,
-            audio_source TEXT,
-            PRIMARY KEY (key, locale),
-            FOREIGN KEY (key) REFERENCES vocabulary(key)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS translation_pair (
-            key TEXT NOT NULL,
-            source_locale TEXT NOT NULL,
-            target_locale TEXT NOT NULL,
-            guid TEXT,
-            pronunciation_hint TEXT,
-            spelling_hint TEXT,
-            reading_hint TEXT,
-            listening_hint TEXT,
-            notes TEXT,
-            PRIMARY KEY (key, source_locale, target_locale),
-            FOREIGN KEY (key) REFERENCES vocabulary(key)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pictures (
-            key TEXT PRIMARY KEY,
-            picture TEXT,
-            picture_source TEXT,
-            FOREIGN KEY (key) REFERENCES vocabulary(key)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS minimal_pairs (
-            guid TEXT PRIMARY KEY,
-            source_locale TEXT NOT NULL,
-            target_locale TEXT NOT NULL,
-            text1 TEXT,
-            audio1 TEXT,
-            ipa1 TEXT,
-            meaning1 TEXT,
-            text2 TEXT,
-            audio2 TEXT,
-            ipa2 TEXT,
-            meaning2 TEXT,
-            tags TEXT
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tts_overrides (
-            key TEXT NOT NULL,
-            locale TEXT NOT NULL,
-            tts_text TEXT NOT NULL,
-            is_ssml BOOLEAN DEFAULT 0,
-            notes TEXT,
-            PRIMARY KEY (key, locale),
-            FOREIGN KEY (key) REFERENCES vocabulary(key)
-        )
-    """)
-
-    # I18n tables
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS i18n_language_names (
-            source_locale TEXT NOT NULL,
-            target_locale TEXT NOT NULL,
-            name TEXT NOT NULL,
-            PRIMARY KEY (source_locale, target_locale)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS i18n_ui_strings (
-            locale TEXT NOT NULL,
-            key TEXT NOT NULL,
-            value TEXT NOT NULL,
-            PRIMARY KEY (locale, key)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS i18n_card_types (
-            locale TEXT NOT NULL,
-            card_type TEXT NOT NULL,
-            name TEXT NOT NULL,
-            PRIMARY KEY (locale, card_type)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS _meta (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    """)
-
-    # Create triggers to track data modifications (only on data tables, not _meta)
-    cursor.execute("""
-        SELECT name FROM sqlite_master
-        WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != '_meta'
-    """)
-    data_tables = [row[0] for row in cursor.fetchall()]
-    for table in data_tables:
-        for op in ["INSERT", "UPDATE", "DELETE"]:
-            trigger_name = f"track_mod_{table}_{op.lower()}"
-            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
-            cursor.execute(f"""
-                CREATE TRIGGER {trigger_name} AFTER {op} ON {table}
-                BEGIN
-                    UPDATE _meta SET value = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
-                    WHERE key = 'db_data_modified_at';
-                END
-            """)
-
-    # Clear existing data for idempotency
-    cursor.execute("DELETE FROM base_language")
-    cursor.execute("DELETE FROM translation_pair")
-    cursor.execute("DELETE FROM pictures")
-    cursor.execute("DELETE FROM minimal_pairs")
-    cursor.execute("DELETE FROM tts_overrides")
-    cursor.execute("DELETE FROM i18n_language_names")
-    cursor.execute("DELETE FROM i18n_ui_strings")
-    cursor.execute("DELETE FROM i18n_card_types")
-    cursor.execute("DELETE FROM vocabulary")
-    cursor.execute("DELETE FROM _meta")
-
-    # Import vocabulary file (if exists)
-    vocab_file = data_dir / "625_words-vocabulary.csv"
-    if vocab_file.exists():
-        with open(vocab_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cursor.execute(
-                    "INSERT INTO vocabulary (key, clarification) VALUES (?, ?)",
-                    (row["key"], row.get("clarification", "")),
-                )
-        print(f"Imported {vocab_file.name}")
-
-    # Import base language files
-    for csv_file in sorted(data_dir.glob("625_words-base-*.csv")):
-        locale = csv_file.stem.split("-")[-1]
-        lang_short = locale.split("_")[0]
-
-        with open(csv_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = row["key"]
-                cursor.execute(
-                    "INSERT OR IGNORE INTO vocabulary (key) VALUES (?)", (key,)
-                )
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO base_language
-                    (key, locale, text, ipa, audio, audio_source)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        key,
-                        locale,
-                        row.get(f"text:{lang_short}", ""),
-                        row.get(f"ipa:{lang_short}", ""),
-                        row.get(f"audio:{lang_short}", ""),
-                        row.get(f"audio source:{lang_short}", ""),
-                    ),
-                )
-        print(f"Imported {csv_file.name}")
+    fingerprints = _compute_csv_fingerprints(
+        data_dir, _get_stored_fingerprints(db_path)
+    )
 
-    # Import translation pair files
-    for csv_file in sorted(data_dir.glob("625_words-from-*-to-*.csv")):
-        match = re.match(r"625_words-from-(.+)-to-(.+)\.csv", csv_file.name)
-        if match:
-            source_locale, target_locale = match.groups()
+    if incremental:
+        csv_hashes = {name: fp[3] for name, fp in fingerprints.items()}
+        changed = _plan_incremental_import(db_path, csv_hashes)
+        if changed == []:
+            print(f"Database {db_path} is up to date with '{data_dir}'.")
+            return
+        if changed is not None:
+            _import_changed_files(data_dir, db_path, changed, fingerprints)
+            print(f"\nDatabase saved to {db_path}")
+            return
+        print("Incremental import not possible, importing all CSV files.")
 
-            with open(csv_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    key = row["key"]
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO vocabulary (key) VALUES (?)", (key,)
-                    )
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO translation_pair
-                        (key, source_locale, target_locale, guid, pronunciation_hint,
-                         spelling_hint, reading_hint, listening_hint, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            key,
-                            source_locale,
-                            target_locale,
-                            row.get("guid", ""),
-                            row.get("pronunciation hint", ""),
-                            row.get("spelling hint", ""),
-                            row.get("reading hint", ""),
-                            row.get("listening hint", ""),
-                            row.get("notes", ""),
-                        ),
-                    )
-            print(f"Imported {csv_file.name}")
+    # Parse everything before touching the database
+    batches = [
+        _read_import_batch(data_dir, name) for name in _list_import_files(data_dir)
+    ]
 
-    # Import pictures
-    pictures_file = data_dir / "625_words-pictures.csv"
-    if pictures_file.exists():
-        with open(pictures_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = row["key"]
-                if key:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO vocabulary (key) VALUES (?)", (key,)
-                    )
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO pictures (key, picture, picture_source)
-                        VALUES (?, ?, ?)
-                    """,
-                        (key, row.get("picture", ""), row.get("picture source", "")),
-                    )
-        print(f"Imported {pictures_file.name}")
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+    for pragma in _BULK_LOAD_PRAGMAS:
+        cursor.execute(pragma)
 
-    # Import TTS overrides
-    tts_overrides_file = data_dir / "tts_overrides.csv"
-    if tts_overrides_file.exists():
-        with open(tts_overrides_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = row.get("key", "")
-                locale = row.get("locale", "")
-                tts_text = row.get("tts_text", "")
-                if key and locale and tts_text:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO vocabulary (key) VALUES (?)", (key,)
-                    )
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO tts_overrides (key, locale, tts_text, is_ssml, notes)
-                        VALUES (?, ?, ?, ?, ?)
-                    """,
-                        (
-                            key,
-                            locale,
-                            tts_text,
-                            1 if row.get("is_ssml", "0") == "1" else 0,
-                            row.get("notes", ""),
-                        ),
-                    )
-        print(f"Imported {tts_overrides_file.name}")
+    cursor.execute("BEGIN")
+    try:
+        _create_schema(cursor)
+        _drop_modification_triggers(cursor)
+        _drop_indexes(cursor)
+
+        # Clear existing data for idempotency
+        for table in _DATA_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        cursor.execute("DELETE FROM _meta")
+
+        for batch in batches:
+            _insert_batch(cursor, batch)
+
+        _save_sync_metadata(cursor, fingerprints)
+        _reset_changelog(cursor)
+
+        _create_indexes(cursor)
+        _create_modification_triggers(cursor)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        db.configure(conn)
+        db.close(conn)
 
-    # Import minimal pairs
-    for csv_file in sorted(data_dir.glob("minimal_pairs-*.csv")):
-        match = re.match(r"minimal_pairs-from-(.+)_to_(.+)\.csv", csv_file.name)
-        if match:
-            source_locale, target_locale = match.groups()
-
-            with open(csv_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get("guid"):
-                        cursor.execute(
-                            """
-                            INSERT OR REPLACE INTO minimal_pairs
-                            (guid, source_locale, target_locale, text1, audio1, ipa1, meaning1,
-                             text2, audio2, ipa2, meaning2, tags)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                            (
-                                row["guid"],
-                                source_locale,
-                                target_locale,
-                                row.get("text1", ""),
-                                row.get("audio1", ""),
-                                row.get("ipa1", ""),
-                                row.get("meaning1", ""),
-                                row.get("text2", ""),
-                                row.get("audio2", ""),
-                                row.get("ipa2", ""),
-                                row.get("meaning2", ""),
-                                row.get("tags", ""),
-                            ),
-                        )
-            print(f"Imported {csv_file.name}")
+    if db.is_in_memory(db_path):
+        print("\nDatabase loaded into memory")
+    else:
+        print(f"\nDatabase saved to {db_path}")
 
-    # Import i18n files
-    i18n_dir = data_dir / "i18n"
-    if i18n_dir.exists():
-        # Import language names
-        lang_names_file = i18n_dir / "language_names.csv"
-        if lang_names_file.exists():
-            with open(lang_names_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO i18n_language_names
-                        (source_locale, target_locale, name)
-                        VALUES (?, ?, ?)
-                    """,
-                        (row["source_locale"], row["target_locale"], row["name"]),
-                    )
-            print(f"Imported {lang_names_file.name}")
-
-        # Import UI strings
-        ui_strings_file = i18n_dir / "ui_strings.csv"
-        if ui_strings_file.exists():
-            with open(ui_strings_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO i18n_ui_strings
-                        (locale, key, value)
-                        VALUES (?, ?, ?)
-                    """,
-                        (row["locale"], row["key"], row["value"]),
-                    )
-            print(f"Imported {ui_strings_file.name}")
-
-        # Import card types
-        card_types_file = i18n_dir / "card_types.csv"
-        if card_types_file.exists():
-            with open(card_types_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO i18n_card_types
-                        (locale, card_type, name)
-                        VALUES (?, ?, ?)
-                    """,
-                        (row["locale"], row["card_type"], row["name"]),
-                    )
-            print(f"Imported {card_types_file.name}")
 
-    # Save sync metadata
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    csv_hashes = _compute_csv_hashes(data_dir)
-    cursor.executemany(
-        "INSERT OR REPLACE INTO _meta (key, value) VALUES (?, ?)",
-        [
-            ("csv_hashes", json.dumps(csv_hashes)),
-            ("synced_at", now),
-            ("db_data_modified_at", now),  # Reset to synced_at after import
-        ],
-    )
+def load_in_memory(data_dir: Path, db_path: Path):
+    """Import the CSV files into an in-memory database standing in for db_path.
 
-    conn.commit()
-    conn.close()
-    print(f"\nDatabase saved to {db_path}")
+    Must be called inside a db.session(). Until the session ends, all
+    functions reading db_path use the in-memory database. It is imported
+    right away, so they don't check it for freshness.
+    """
+    db.use_in_memory(db_path)
+    csv2sqlite(data_dir, db_path, force=True)
 
 
 def _check_csv_freshness(
@@ -1646,11 +3043,9 @@ def _check_csv_freshness(
         return
 
     metadata = _get_sync_metadata(db_path)
-    stored_hashes_json = metadata.get("csv_hashes", "{}")
-    stored_hashes = json.loads(stored_hashes_json)
     synced_at = metadata.get("synced_at", "unknown")
 
-    changed_files = _get_changed_csv_files(data_dir, stored_hashes)
+    changed_files = _get_changed_csv_files(db_path, data_dir, metadata)
     if not changed_files:
         return
 
@@ -1687,195 +3082,97 @@ def _check_csv_freshness(
     raise SystemExit(1)
 
 
-def sqlite2csv(
-    db_path: Path, data_dir: Path, force: bool = False, fail_if_conflict: bool = False
-):
-    """Export SQLite database back to CSV files with deterministic formatting."""
-    _ensure_db_exists(db_path, data_dir)
-
-    _check_csv_freshness(db_path, data_dir, force, fail_if_conflict)
+_MINIMAL_PAIRS_COLUMNS = [
+    "guid",
+    "text1",
+    "audio1",
+    "ipa1",
+    "meaning1",
+    "text2",
+    "audio2",
+    "ipa2",
+    "meaning2",
+    "tags",
+]
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
 
-    # Get all locales
-    cursor = conn.cursor()
+def _export_file_names(cursor: sqlite3.Cursor) -> List[str]:
+    """List the CSV files exported from the database, relative to the data dir."""
     cursor.execute("SELECT DISTINCT locale FROM base_language ORDER BY locale")
-    locales = [row["locale"] for row in cursor.fetchall()]
-
-    # Export base language files
-    for locale in locales:
-        lang_short = locale.split("_")[0]
-        cursor.execute(
-            """
-            SELECT key, text, ipa, audio, audio_source
-            FROM base_language
-            WHERE locale = ?
-            ORDER BY key COLLATE NOCASE
-        """,
-            (locale,),
-        )
-
-        rows = cursor.fetchall()
-        fieldnames = [
-            "key",
-            f"text:{lang_short}",
-            f"ipa:{lang_short}",
-            f"audio:{lang_short}",
-            f"audio source:{lang_short}",
-            f"tags:{lang_short}",
-        ]
-
-        csv_file = data_dir / f"625_words-base-{locale}.csv"
-        with open(csv_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "key": row["key"],
-                        f"text:{lang_short}": row["text"] or "",
-                        f"ipa:{lang_short}": row["ipa"] or "",
-                        f"audio:{lang_short}": row["audio"] or "",
-                        f"audio source:{lang_short}": row["audio_source"] or "",
-                        f"tags:{lang_short}": f"AnkiLangs::{lang_short.upper()}",
-                    }
-                )
-        print(f"Exported {csv_file.name} ({len(rows)} rows)")
-
-    # Export translation pair files
+    names = [f"625_words-base-{locale}.csv" for (locale,) in cursor.fetchall()]
     cursor.execute("""
         SELECT DISTINCT source_locale, target_locale
         FROM translation_pair
         ORDER BY source_locale, target_locale
     """)
-    pairs = cursor.fetchall()
-
-    for pair in pairs:
-        source_locale = pair["source_locale"]
-        target_locale = pair["target_locale"]
+    names += [
+        f"625_words-from-{source_locale}-to-{target_locale}.csv"
+        for source_locale, target_locale in cursor.fetchall()
+    ]
+    names += [
+        "625_words-pictures.csv",
+        "tts_overrides.csv",
+        "625_words-vocabulary.csv",
+    ]
+    cursor.execute("""
+        SELECT DISTINCT source_locale, target_locale
+        FROM minimal_pairs
+        ORDER BY source_locale, target_locale
+    """)
+    names += [
+        f"minimal_pairs-from-{source_locale}_to_{target_locale}.csv"
+        for source_locale, target_locale in cursor.fetchall()
+    ]
+    names += list(_I18N_FILES)
+    return names
 
-        cursor.execute(
-            """
-            SELECT key, guid, pronunciation_hint, spelling_hint, reading_hint,
-                   listening_hint, notes
-            FROM translation_pair
-            WHERE source_locale = ? AND target_locale = ?
-            ORDER BY key COLLATE NOCASE
-        """,
-            (source_locale, target_locale),
-        )
 
-        rows = cursor.fetchall()
-        fieldnames = [
-            "key",
-            "guid",
-            "pronunciation hint",
-            "spelling hint",
-            "reading hint",
-            "listening hint",
-            "notes",
-        ]
+def _render_export_file(cursor: sqlite3.Cursor, name: str) -> Tuple[bytes, int] | None:
+    """Render a CSV file (as listed by _export_file_names) from the database.
 
-        csv_file = data_dir / f"625_words-from-{source_locale}-to-{target_locale}.csv"
-        with open(csv_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "key": row["key"],
-                        "guid": row["guid"] or "",
-                        "pronunciation hint": row["pronunciation_hint"] or "",
-                        "spelling hint": row["spelling_hint"] or "",
-                        "reading hint": row["reading_hint"] or "",
-                        "listening hint": row["listening_hint"] or "",
-                        "notes": row["notes"] or "",
-                    }
-                )
-        print(f"Exported {csv_file.name} ({len(rows)} rows)")
+    Returns:
+        File content and number of rows, or None if the file is not exported
+        because the database has no rows for it
+    """
+    if match := _BASE_FILE_RE.fullmatch(name):
+        content, row_count = _render_base_language_csv(cursor, match.group(1))
+        return (content, row_count) if row_count else None
 
-    # Export pictures
-    cursor.execute(
-        "SELECT key, picture, picture_source FROM pictures ORDER BY key COLLATE NOCASE"
-    )
-    rows = cursor.fetchall()
+    if match := _PAIR_FILE_RE.fullmatch(name):
+        content, row_count = _render_translation_pair_csv(cursor, *match.groups())
+        return (content, row_count) if row_count else None
 
-    csv_file = data_dir / "625_words-pictures.csv"
-    with open(csv_file, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["key", "picture", "picture source"], lineterminator="\n"
+    if name == "625_words-pictures.csv":
+        cursor.execute(
+            "SELECT key, picture, picture_source FROM pictures ORDER BY key COLLATE NOCASE"
         )
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(
-                {
-                    "key": row["key"],
-                    "picture": row["picture"] or "",
-                    "picture source": row["picture_source"] or "",
-                }
-            )
-    print(f"Exported {csv_file.name} ({len(rows)} rows)")
-
-    # Export TTS overrides
-    cursor.execute(
-        "SELECT key, locale, tts_text, is_ssml, notes FROM tts_overrides ORDER BY key COLLATE NOCASE, locale"
-    )
-    rows = cursor.fetchall()
+        rows = [
+            (key, picture or "", picture_source or "")
+            for key, picture, picture_source in cursor.fetchall()
+        ]
+        return _render_csv(["key", "picture", "picture source"], rows), len(rows)
 
-    csv_file = data_dir / "tts_overrides.csv"
-    with open(csv_file, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["key", "locale", "tts_text", "is_ssml", "notes"],
-            lineterminator="\n",
+    if name == "tts_overrides.csv":
+        cursor.execute(
+            "SELECT key, locale, tts_text, is_ssml, notes FROM tts_overrides ORDER BY key COLLATE NOCASE, locale"
         )
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(
-                {
-                    "key": row["key"],
-                    "locale": row["locale"],
-                    "tts_text": row["tts_text"] or "",
-                    "is_ssml": "1" if row["is_ssml"] else "0",
-                    "notes": row["notes"] or "",
-                }
-            )
-    print(f"Exported {csv_file.name} ({len(rows)} rows)")
-
-    # Export vocabulary
-    cursor.execute(
-        "SELECT key, clarification FROM vocabulary ORDER BY key COLLATE NOCASE"
-    )
-    rows = cursor.fetchall()
-
-    csv_file = data_dir / "625_words-vocabulary.csv"
-    with open(csv_file, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["key", "clarification"], lineterminator="\n"
+        rows = [
+            (key, locale, tts_text or "", "1" if is_ssml else "0", notes or "")
+            for key, locale, tts_text, is_ssml, notes in cursor.fetchall()
+        ]
+        return (
+            _render_csv(["key", "locale", "tts_text", "is_ssml", "notes"], rows),
+            len(rows),
         )
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(
-                {
-                    "key": row["key"],
-                    "clarification": row["clarification"] or "",
-                }
-            )
-    print(f"Exported {csv_file.name} ({len(rows)} rows)")
-
-    # Export minimal pairs
-    cursor.execute("""
-        SELECT DISTINCT source_locale, target_locale
-        FROM minimal_pairs
-        ORDER BY source_locale, target_locale
-    """)
-    mp_pairs = cursor.fetchall()
 
-    for pair in mp_pairs:
-        source_locale = pair["source_locale"]
-        target_locale = pair["target_locale"]
+    if name == "625_words-vocabulary.csv":
+        cursor.execute(
+            "SELECT key, clarification FROM vocabulary ORDER BY key COLLATE NOCASE"
+        )
+        rows = [(key, clarification or "") for key, clarification in cursor.fetchall()]
+        return _render_csv(["key", "clarification"], rows), len(rows)
 
+    if match := _MINIMAL_PAIRS_FILE_RE.fullmatch(name):
         cursor.execute(
             """
             SELECT guid, text1, audio1, ipa1, meaning1, text2, audio2, ipa2, meaning2, tags
@@ -1883,132 +3180,120 @@ def sqlite2csv(
             WHERE source_locale = ? AND target_locale = ?
             ORDER BY guid COLLATE NOCASE
         """,
-            (source_locale, target_locale),
+            match.groups(),
         )
-
-        rows = cursor.fetchall()
-        fieldnames = [
-            "guid",
-            "text1",
-            "audio1",
-            "ipa1",
-            "meaning1",
-            "text2",
-            "audio2",
-            "ipa2",
-            "meaning2",
-            "tags",
+        rows = [
+            (row[0], *(value or "" for value in row[1:])) for row in cursor.fetchall()
         ]
+        if not rows:
+            return None
+        return _render_csv(_MINIMAL_PAIRS_COLUMNS, rows), len(rows)
 
-        csv_file = (
-            data_dir / f"minimal_pairs-from-{source_locale}_to_{target_locale}.csv"
-        )
-        with open(csv_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "guid": row["guid"],
-                        "text1": row["text1"] or "",
-                        "audio1": row["audio1"] or "",
-                        "ipa1": row["ipa1"] or "",
-                        "meaning1": row["meaning1"] or "",
-                        "text2": row["text2"] or "",
-                        "audio2": row["audio2"] or "",
-                        "ipa2": row["ipa2"] or "",
-                        "meaning2": row["meaning2"] or "",
-                        "tags": row["tags"] or "",
-                    }
-                )
-        print(f"Exported {csv_file.name} ({len(rows)} rows)")
-
-    # Export i18n files
-    i18n_dir = data_dir / "i18n"
-    i18n_dir.mkdir(exist_ok=True)
-
-    # Export language names
+    table, columns = _I18N_FILES[name]
     cursor.execute(
-        "SELECT source_locale, target_locale, name FROM i18n_language_names ORDER BY source_locale, target_locale"
+        f"SELECT {', '.join(columns)} FROM {table} ORDER BY {', '.join(columns[:2])}"
     )
     rows = cursor.fetchall()
-    if rows:
-        csv_file = i18n_dir / "language_names.csv"
-        with open(csv_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["source_locale", "target_locale", "name"],
-                lineterminator="\n",
-            )
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "source_locale": row["source_locale"],
-                        "target_locale": row["target_locale"],
-                        "name": row["name"],
-                    }
-                )
-        print(f"Exported {csv_file.name} ({len(rows)} rows)")
+    if not rows:
+        return None
+    return _render_csv(columns, rows), len(rows)
+
+
+def _changed_export_files(changes: List[Tuple[str, list]]) -> Set[str]:
+    """Get the exported CSV files containing the changed rows of the changelog."""
+    i18n_files = {table: name for name, (table, _) in _I18N_FILES.items()}
+    names = set()
+    for table, key in changes:
+        if table == "base_language":
+            names.add(f"625_words-base-{key[1]}.csv")
+        elif table == "translation_pair":
+            names.add(f"625_words-from-{key[1]}-to-{key[2]}.csv")
+        elif table == "minimal_pairs":
+            names.add(f"minimal_pairs-from-{key[1]}_to_{key[2]}.csv")
+        elif table == "pictures":
+            names.add("625_words-pictures.csv")
+        elif table == "tts_overrides":
+            names.add("tts_overrides.csv")
+        elif table == "vocabulary":
+            names.add("625_words-vocabulary.csv")
+        else:
+            names.add(i18n_files[table])
+    return names
 
-    # Export UI strings
-    cursor.execute(
-        "SELECT locale, key, value FROM i18n_ui_strings ORDER BY locale, key"
-    )
-    rows = cursor.fetchall()
-    if rows:
-        csv_file = i18n_dir / "ui_strings.csv"
-        with open(csv_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(
-                f, fieldnames=["locale", "key", "value"], lineterminator="\n"
-            )
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "locale": row["locale"],
-                        "key": row["key"],
-                        "value": row["value"],
-                    }
-                )
-        print(f"Exported {csv_file.name} ({len(rows)} rows)")
 
-    # Export card types
-    cursor.execute(
-        "SELECT locale, card_type, name FROM i18n_card_types ORDER BY locale, card_type"
-    )
-    rows = cursor.fetchall()
-    if rows:
-        csv_file = i18n_dir / "card_types.csv"
-        with open(csv_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(
-                f, fieldnames=["locale", "card_type", "name"], lineterminator="\n"
-            )
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "locale": row["locale"],
-                        "card_type": row["card_type"],
-                        "name": row["name"],
-                    }
-                )
-        print(f"Exported {csv_file.name} ({len(rows)} rows)")
+def _export_csv(
+    data_dir: Path,
+    name: str,
+    content: bytes,
+    row_count: int,
+    fingerprints: Dict[str, list],
+):
+    """Write an exported CSV file unless it already has the rendered content.
+
+    The fingerprint of the file in fingerprints is updated from the rendered
+    content, so the file doesn't have to be read again.
+    """
+    csv_file = data_dir / name
+    md5 = hashlib.md5(content).hexdigest()
+    current = fingerprints.get(name)
+    if current is not None and current[3] == md5:
+        print(f"Unchanged {csv_file.name} ({row_count} rows)")
+        return
+
+    _write_file_atomic(csv_file, content)
+    st = csv_file.stat()
+    if time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+        fingerprints[name] = [None, None, None, md5]
+    else:
+        fingerprints[name] = [st.st_size, st.st_mtime_ns, st.st_ino, md5]
+    print(f"Exported {csv_file.name} ({row_count} rows)")
+
+
+def sqlite2csv(
+    db_path: Path, data_dir: Path, force: bool = False, fail_if_conflict: bool = False
+):
+    """Export SQLite database back to CSV files with deterministic formatting.
+
+    Files are rendered in memory and only written if their content changed, so
+    unchanged files keep their modification time. If the CSV files are
+    unchanged since the last sync, only missing files and the files containing
+    rows logged in the changelog are rendered.
+    """
+    ensure_db_exists(db_path, data_dir)
+
+    _check_csv_freshness(db_path, data_dir, force, fail_if_conflict)
+
+    # Only files whose stat tuple changed since the last sync are read here
+    stored_fingerprints = _get_stored_fingerprints(db_path)
+    fingerprints = _compute_csv_fingerprints(data_dir, stored_fingerprints)
+
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+
+    names = _export_file_names(cursor)
+    changes, last_id = _read_changelog(cursor, "sqlite2csv")
+    csv_unchanged = {name: fp[3] for name, fp in fingerprints.items()} == {
+        name: fp[3] for name, fp in stored_fingerprints.items()
+    }
+    if changes is not None and csv_unchanged:
+        changed_names = _changed_export_files(changes)
+        names = [
+            name for name in names if name in changed_names or name not in fingerprints
+        ]
+        print("Exporting the files changed since the last sync")
+
+    (data_dir / "i18n").mkdir(exist_ok=True)
+    for name in names:
+        rendered = _render_export_file(cursor, name)
+        if rendered is not None:
+            _export_csv(data_dir, name, *rendered, fingerprints)
 
     # Update sync metadata to reflect that DB and CSV files are now in sync
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    csv_hashes = _compute_csv_hashes(data_dir)
-    cursor.executemany(
-        "INSERT OR REPLACE INTO _meta (key, value) VALUES (?, ?)",
-        [
-            ("csv_hashes", json.dumps(csv_hashes)),
-            ("synced_at", now),
-            ("db_data_modified_at", now),  # Reset to synced_at after export
-        ],
-    )
+    _save_sync_metadata(cursor, fingerprints)
+    _advance_changelog(cursor, "sqlite2csv", last_id)
     conn.commit()
 
-    conn.close()
+    db.close(conn)
     print(f"\nAll files exported from {db_path}")
 
 
@@ -2031,6 +3316,8 @@ def _create_excel_review_file(
         rows: List of row data from database
         fieldnames: List of column names
     """
+    import xlsxwriter
+
     # Create workbook and worksheet
     workbook = xlsxwriter.Workbook(str(excel_file))
     worksheet = workbook.add_worksheet("Review")
@@ -2216,14 +3503,14 @@ def export_review(
         data_dir: Directory containing CSV files (for DB freshness check)
         keys: Optional list of keys to export (exports all if None)
     """
-    _ensure_db_exists(db_path, data_dir)
-    _check_db_freshness(db_path, data_dir, force=False)
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir, force=False)
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = db.connect(db_path)
     cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
 
     # Query translation pairs with source and target text
     query = """
@@ -2253,7 +3540,7 @@ def export_review(
     if keys is not None:
         if not keys:
             # Empty list — no keys to match, return early
-            conn.close()
+            db.close(conn)
             print(f"No translation pairs found for {source_locale} -> {target_locale}")
             return
         placeholders = ",".join("?" for _ in keys)
@@ -2264,7 +3551,7 @@ def export_review(
     cursor.execute(query, params)
 
     rows = cursor.fetchall()
-    conn.close()
+    db.close(conn)
 
     if not rows:
         print(f"No translation pairs found for {source_locale} -> {target_locale}")
@@ -2321,7 +3608,7 @@ def export_review(
     # Concatenate audio files
     # Collect audio file paths sorted alphabetically by key
     audio_files_with_keys = []
-    target_locale_dir = _locale_to_directory(target_locale)
+    target_locale_dir = locale_to_directory(target_locale)
     audio_dir = media_dir / target_locale_dir
 
     if not audio_dir.exists():
@@ -2488,8 +3775,8 @@ def import_review(
         media_dir: Directory containing audio files
         data_dir: Directory containing CSV files (for DB freshness check)
     """
-    _ensure_db_exists(db_path, data_dir)
-    _check_db_freshness(db_path, data_dir, force=False)
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir, force=False)
 
     # Read the reviewed file
     rows = _read_review_file(file_path)
@@ -2497,9 +3784,9 @@ def import_review(
         print("No data found in file")
         return
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = db.connect(db_path)
     cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
 
     # Get existing data from database keyed by guid
     cursor.execute(
@@ -2540,7 +3827,7 @@ def import_review(
     # Track entries with review comments
     entries_with_comments = []
 
-    target_locale_dir = _locale_to_directory(target_locale)
+    target_locale_dir = locale_to_directory(target_locale)
     audio_dir = media_dir / target_locale_dir
 
     for row in rows:
@@ -2633,7 +3920,7 @@ def import_review(
                 changes[field] += 1
 
     conn.commit()
-    conn.close()
+    db.close(conn)
 
     # Print summary
     total_changes = sum(changes.values())
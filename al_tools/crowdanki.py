@@ -0,0 +1,426 @@
+"""Build CrowdAnki decks directly from the SQLite database.
+
+Every deck of the registry is written to build/<tag_name>/deck.json, with
+its media files next to it, in the format Brain Brew generated. Notes are
+read from the database, so no intermediate CSV files or recipe are needed.
+Decks don't depend on each other and can be built in parallel processes.
+The note model of a deck is read from its folder in src/note_models, which
+create-deck renders from the templates in al_tools/templates/625_deck.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import random
+import shutil
+import sqlite3
+import string
+import sys
+import time
+
+import yaml
+
+from al_tools import db
+from al_tools.core import (
+    SOURCE_FIELD_SQL,
+    check_db_freshness,
+    ensure_base_language_entries_exist,
+    ensure_db_exists,
+    ensure_translation_pairs_exist,
+    locale_to_directory,
+    sqlite2csv,
+    write_if_changed,
+)
+from al_tools.registry import Deck, DeckRegistry
+
+HEADER_FILE = Path("src/headers/default.yaml")
+MEDIA_DIR = Path("src/media")
+
+# Characters of the GUIDs Anki generates for new notes
+_GUID_CHARS = string.ascii_letters + string.digits + "!#$%&()*+,-./:;<=>?@[]^_`{|}~"
+
+# Separates the front from the back in the HTML file of a card template
+_TEMPLATE_SEPARATOR = "\n\n--\n\n"
+
+
+def _new_guid() -> str:
+    """Generate a GUID for a note the way Anki does (base 91 of a random 64 bit int)."""
+    num = random.getrandbits(64)
+    guid = ""
+    while num:
+        num, mod = divmod(num, len(_GUID_CHARS))
+        guid = _GUID_CHARS[mod] + guid
+    return guid
+
+
+def _sorted_keys(value):
+    """Sort the keys of all dicts in a value, like Brain Brew's output."""
+    if isinstance(value, dict):
+        return {key: _sorted_keys(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        return [_sorted_keys(item) for item in value]
+    return value
+
+
+def load_note_model(note_model_dir: Path) -> Dict:
+    """Load a note model from its folder as a CrowdAnki note model.
+
+    Args:
+        note_model_dir: Folder with note.yaml, the CSS and the card templates
+
+    Returns:
+        Note model in the CrowdAnki JSON format
+    """
+    with open(note_model_dir / "note.yaml", encoding="utf-8") as f:
+        definition = yaml.safe_load(f)
+
+    fields = [
+        {
+            "font": field.get("font", "Liberation Sans"),
+            "media": [],
+            "name": field["name"],
+            "ord": ord_,
+            "rtl": False,
+            "size": field.get("font_size", 20),
+            "sticky": False,
+        }
+        for ord_, field in enumerate(definition["fields"])
+    ]
+
+    templates = []
+    for ord_, template in enumerate(definition["templates"]):
+        # Paths in note.yaml are relative to the project root
+        html = (note_model_dir / Path(template["html_file"]).name).read_text(
+            encoding="utf-8"
+        )
+        front, back = html.split(_TEMPLATE_SEPARATOR, 1)
+        templates.append(
+            {
+                "afmt": back,
+                "bafmt": "",
+                "bfont": "",
+                "bqfmt": "",
+                "bsize": 0,
+                "did": None,
+                "name": template["name"],
+                "ord": ord_,
+                "qfmt": front,
+                "scratchPad": 0,
+            }
+        )
+
+    return _sorted_keys(
+        {
+            "__type__": "NoteModel",
+            "crowdanki_uuid": definition["id"],
+            "css": (note_model_dir / Path(definition["css_file"]).name).read_text(
+                encoding="utf-8"
+            ),
+            "flds": fields,
+            "latexPost": "\\end{document}",
+            "latexPre": definition["latex_pre"],
+            "latexsvg": False,
+            "name": definition["name"],
+            "req": definition["required_fields_per_template"],
+            "sortf": 0,
+            "tags": [],
+            "tmpls": templates,
+            "type": 0,
+            "vers": [],
+        }
+    )
+
+
+def _assign_missing_guids(cursor: sqlite3.Cursor, deck: Deck) -> int:
+    """Give the notes of a deck that have no GUID yet a new one.
+
+    Returns:
+        Number of notes that got a GUID
+    """
+    if deck.deck_type == "625":
+        cursor.execute(
+            """
+            SELECT key FROM translation_pair
+            WHERE source_locale = ? AND target_locale = ?
+            AND (guid IS NULL OR guid = '')
+            """,
+            (deck.source_locale, deck.target_locale),
+        )
+        keys = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(
+            """
+            UPDATE translation_pair SET guid = ?
+            WHERE key = ? AND source_locale = ? AND target_locale = ?
+            """,
+            [
+                (_new_guid(), key, deck.source_locale, deck.target_locale)
+                for key in keys
+            ],
+        )
+        return len(keys)
+    # Minimal pairs are keyed by their GUID, so they always have one
+    return 0
+
+
+def _read_notes(cursor: sqlite3.Cursor, deck: Deck, note_model_uuid: str) -> List:
+    """Read the notes of a deck from the database, ordered like the CSV files.
+
+    Returns:
+        Notes in the CrowdAnki JSON format
+    """
+    if deck.deck_type == "625":
+        cursor.execute(
+            f"""
+            SELECT tp.guid, src.text, bl.text, bl.ipa, bl.audio, p.picture,
+                   tp.notes, tp.pronunciation_hint, tp.spelling_hint,
+                   tp.reading_hint, tp.listening_hint, {SOURCE_FIELD_SQL}
+            FROM translation_pair tp
+            LEFT JOIN base_language src
+                ON src.key = tp.key AND src.locale = tp.source_locale
+            LEFT JOIN base_language bl
+                ON bl.key = tp.key AND bl.locale = tp.target_locale
+            LEFT JOIN pictures p ON p.key = tp.key
+            WHERE tp.source_locale = ? AND tp.target_locale = ?
+            ORDER BY tp.key COLLATE NOCASE
+            """,
+            (deck.source_locale, deck.target_locale),
+        )
+        tags = [f"AnkiLangs::{deck.target_locale.split('_')[0].upper()}"]
+        rows = [(row[0], row[1:], tags) for row in cursor.fetchall()]
+    elif deck.deck_type == "minimal_pairs":
+        cursor.execute(
+            """
+            SELECT guid, text1, audio1, ipa1, meaning1, text2, audio2, ipa2,
+                   meaning2, tags
+            FROM minimal_pairs
+            WHERE source_locale = ? AND target_locale = ?
+            ORDER BY guid COLLATE NOCASE
+            """,
+            (deck.source_locale, deck.target_locale),
+        )
+        rows = [
+            (row[0], row[1:-1], (row[-1] or "").split()) for row in cursor.fetchall()
+        ]
+    else:
+        raise ValueError(f"Unknown deck type '{deck.deck_type}' of {deck.deck_id}")
+
+    return [
+        {
+            "__type__": "Note",
+            "data": "",
+            "fields": [value or "" for value in fields],
+            "flags": 0,
+            "guid": guid,
+            "note_model_uuid": note_model_uuid,
+            "tags": tags,
+        }
+        for guid, fields, tags in rows
+    ]
+
+
+def _media_files(deck: Deck) -> List[Path]:
+    """Get the media files of a deck: the audio of its target locale and all images."""
+    folders = [
+        MEDIA_DIR / "audio" / locale_to_directory(deck.target_locale),
+        MEDIA_DIR / "imgs",
+    ]
+    files = [
+        path
+        for folder in folders
+        if folder.exists()
+        for path in folder.iterdir()
+        if path.is_file() and not path.name.startswith(".")
+    ]
+    return sorted(files, key=lambda path: path.name)
+
+
+def _sync_media(files: List[Path], media_dir: Path) -> int:
+    """Make media_dir contain exactly the given files.
+
+    Files are only copied if their size or modification time differs.
+
+    Returns:
+        Number of files copied or removed
+    """
+    media_dir.mkdir(parents=True, exist_ok=True)
+    changes = 0
+
+    names = {path.name for path in files}
+    for existing in media_dir.iterdir():
+        if existing.name not in names:
+            existing.unlink()
+            changes += 1
+
+    for path in files:
+        target = media_dir / path.name
+        if target.exists():
+            source_stat, target_stat = path.stat(), target.stat()
+            if (
+                source_stat.st_size == target_stat.st_size
+                and source_stat.st_mtime_ns == target_stat.st_mtime_ns
+            ):
+                continue
+        shutil.copy2(path, target)
+        changes += 1
+    return changes
+
+
+def render_deck(cursor: sqlite3.Cursor, deck: Deck, header: Dict) -> str:
+    """Render the deck.json of a deck.
+
+    Args:
+        cursor: Cursor of the database
+        deck: Deck to render
+        header: Deck options shared by all decks (src/headers/default.yaml)
+
+    Returns:
+        Content of deck.json
+    """
+    if not deck.crowdanki_uuid:
+        raise ValueError(f"Deck '{deck.deck_id}' has no crowdanki_uuid in decks.yaml")
+
+    note_model = load_note_model(deck.note_model_dir)
+    deck_json = _sorted_keys(
+        {
+            **header,
+            "__type__": "Deck",
+            "children": [],
+            "crowdanki_uuid": deck.crowdanki_uuid,
+            "desc": Path(deck.description_file).read_text(encoding="utf-8"),
+        }
+    )
+    deck_json["media_files"] = [path.name for path in _media_files(deck)]
+    deck_json["name"] = deck.name
+    deck_json["note_models"] = [note_model]
+    deck_json["notes"] = _read_notes(cursor, deck, note_model["crowdanki_uuid"])
+
+    return json.dumps(deck_json, indent=4, ensure_ascii=False)
+
+
+def _build_deck(
+    cursor: sqlite3.Cursor, deck: Deck, header: Dict, build_dir: Path
+) -> str:
+    """Write the deck.json and media of a deck, if they changed.
+
+    Returns:
+        Line reporting what was written and how long it took
+    """
+    start = time.perf_counter()
+    deck_dir = build_dir / deck.tag_name
+    deck_dir.mkdir(parents=True, exist_ok=True)
+    content = render_deck(cursor, deck, header)
+
+    deck_file = deck_dir / "deck.json"
+    if write_if_changed(deck_file, content.encode("utf-8")):
+        status = "written"
+    else:
+        status = "unchanged"
+    media_changes = _sync_media(_media_files(deck), deck_dir / "media")
+    elapsed = time.perf_counter() - start
+    return (
+        f"{deck_file} {status}, {media_changes} media file(s) updated ({elapsed:.2f}s)"
+    )
+
+
+# State of a build worker process, set up by _init_worker()
+_worker: Dict = {}
+
+
+def _init_worker(registry_path: Path, db_path: Path, header: Dict, build_dir: Path):
+    _worker["registry"] = DeckRegistry(registry_path)
+    _worker["db_path"] = db_path
+    _worker["header"] = header
+    _worker["build_dir"] = build_dir
+
+
+def _build_deck_in_worker(deck_id: str) -> str:
+    deck = _worker["registry"].get(deck_id)
+    # A connection per deck, as pool workers exit without running atexit hooks
+    conn = db.connect_read_only(_worker["db_path"])
+    try:
+        return _build_deck(conn.cursor(), deck, _worker["header"], _worker["build_dir"])
+    finally:
+        conn.close()
+
+
+def build_decks(
+    registry: DeckRegistry,
+    db_path: Path,
+    data_dir: Path = Path("src/data"),
+    build_dir: Path = Path("build"),
+    deck_ids: Optional[List[str]] = None,
+    jobs: int = 1,
+):
+    """Build the CrowdAnki folders of decks from the database.
+
+    Notes without a GUID get a new one, which is saved to the CSV files
+    before the decks are built. With more than one job the decks are built
+    in worker processes, which read each deck through a read-only
+    connection of its own. Decks are reported in the order of their IDs
+    either way.
+
+    Args:
+        registry: Registry with the decks to build
+        db_path: Path to SQLite database
+        data_dir: Path to CSV data directory
+        build_dir: Folder for the deck folders, named like their tag
+        deck_ids: Decks to build (default: all decks of the registry)
+        jobs: Number of decks to build in parallel
+    """
+    start = time.perf_counter()
+    if deck_ids:
+        unknown = [deck_id for deck_id in deck_ids if not registry.get(deck_id)]
+        if unknown:
+            print(f"Error: Deck(s) not found in registry: {', '.join(unknown)}")
+            sys.exit(1)
+        decks = [registry.get(deck_id) for deck_id in sorted(set(deck_ids))]
+    else:
+        decks = sorted(registry.all(), key=lambda d: d.deck_id)
+
+    ensure_db_exists(db_path, data_dir)
+    check_db_freshness(db_path, data_dir)
+
+    # Like the generate step that used to precede Brain Brew
+    ensure_base_language_entries_exist(db_path, data_dir)
+    ensure_translation_pairs_exist(db_path, data_dir)
+
+    with open(HEADER_FILE, encoding="utf-8") as f:
+        header = yaml.safe_load(f)
+
+    conn = db.connect(db_path)
+    cursor = conn.cursor()
+
+    new_guids = 0
+    for deck in decks:
+        new_guids += _assign_missing_guids(cursor, deck)
+    if new_guids:
+        conn.commit()
+        # Random GUIDs must not change between builds, or Anki would import
+        # the notes again. Save them in the CSV files, the source of truth.
+        print(f"Assigned GUIDs to {new_guids} new notes, saving them to the CSV files")
+        sqlite2csv(db_path, data_dir)
+
+    if jobs > 1 and db.is_in_memory(db_path):
+        # Worker processes can't read the in-memory database
+        print("Building in one process, the in-memory database can't be shared")
+        jobs = 1
+
+    if jobs > 1 and decks:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(decks)),
+            initializer=_init_worker,
+            initargs=(registry.registry_path, db_path, header, build_dir),
+        ) as executor:
+            # map() yields the results in the order of the decks
+            for line in executor.map(
+                _build_deck_in_worker, [deck.deck_id for deck in decks]
+            ):
+                print(line)
+    else:
+        for deck in decks:
+            print(_build_deck(cursor, deck, header, build_dir))
+
+    db.close(conn)
+    elapsed = time.perf_counter() - start
+    print(f"\nBuilt {len(decks)} decks in {build_dir} ({elapsed:.2f}s, {jobs} job(s))")
@@ -0,0 +1,167 @@
+"""Connections to the SQLite cache (data.db).
+
+All database access goes through connect() and close(). Outside of a session
+they open and close a configured connection, like sqlite3.connect() would.
+Inside a session (the CLI runs every command in one) connect() returns the
+session's connection to the file instead, so one invocation shares one
+connection with its page and statement caches. A session can also serve a
+database file from memory instead, see use_in_memory().
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Set
+import sqlite3
+
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+]
+
+# The PRAGMAs of PRAGMAS that don't write to the database file
+READ_ONLY_PRAGMAS = [
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+]
+
+CACHED_STATEMENTS = 512
+
+
+class Session:
+    """Owns one configured connection per database file."""
+
+    def __init__(self):
+        self._connections: Dict[Path, sqlite3.Connection] = {}
+        self._in_memory: Set[Path] = set()
+
+    def connection(self, db_path: Path) -> sqlite3.Connection:
+        """Get the connection to a database file, opening it on first use."""
+        key = Path(db_path).resolve()
+        if key not in self._connections:
+            self._connections[key] = _open(db_path)
+        return self._connections[key]
+
+    def use_in_memory(self, db_path: Path):
+        """Use a new, empty in-memory database in place of a database file."""
+        key = Path(db_path).resolve()
+        if key in self._connections:
+            self._connections.pop(key).close()
+        self._connections[key] = _open(":memory:")
+        self._in_memory.add(key)
+
+    def is_in_memory(self, db_path: Path) -> bool:
+        return Path(db_path).resolve() in self._in_memory
+
+    def owns(self, conn: sqlite3.Connection) -> bool:
+        return any(conn is owned for owned in self._connections.values())
+
+    def close(self):
+        """Close all connections of the session."""
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+        self._in_memory.clear()
+
+
+_session: Session | None = None
+
+
+def configure(conn: sqlite3.Connection):
+    """Apply the PRAGMAs of the cache, e.g. after a bulk load changed them."""
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+
+def _open(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, cached_statements=CACHED_STATEMENTS)
+    configure(conn)
+    return conn
+
+
+@contextmanager
+def session() -> Iterator[Session]:
+    """Share one connection per database file until the end of the block.
+
+    Nested sessions reuse the outer one.
+    """
+    global _session
+    if _session is not None:
+        yield _session
+        return
+    _session = Session()
+    try:
+        yield _session
+    finally:
+        _session.close()
+        _session = None
+
+
+def use_in_memory(db_path: Path):
+    """Serve db_path from a new, empty in-memory database until the session ends.
+
+    Must be called inside a session. The database file isn't touched unless
+    the in-memory database is saved with save_in_memory().
+    """
+    if _session is None:
+        raise RuntimeError("An in-memory database needs a db.session()")
+    _session.use_in_memory(db_path)
+
+
+def is_in_memory(db_path: Path) -> bool:
+    """Check whether db_path is served from an in-memory database."""
+    return _session is not None and _session.is_in_memory(db_path)
+
+
+def save_in_memory(db_path: Path):
+    """Write the in-memory database standing in for db_path to the file."""
+    assert _session is not None and _session.is_in_memory(db_path)
+    target = sqlite3.connect(db_path)
+    try:
+        _session.connection(db_path).backup(target)
+    finally:
+        target.close()
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Get a configured connection to the database.
+
+    Must be released with close(), which keeps the connection of a session
+    open.
+    """
+    if _session is not None:
+        return _session.connection(db_path)
+    return _open(db_path)
+
+
+def connect_read_only(db_path: Path) -> sqlite3.Connection:
+    """Open a read-only connection to a database file, outside of any session.
+
+    Meant for worker processes, which can't share the connection of the
+    session. Must be closed by the caller.
+    """
+    conn = sqlite3.connect(
+        f"{Path(db_path).resolve().as_uri()}?mode=ro",
+        uri=True,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    for pragma in READ_ONLY_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def close(conn: sqlite3.Connection):
+    """Release a connection from connect().
+
+    Uncommitted changes are rolled back, as closing the connection would.
+    """
+    if _session is not None and _session.owns(conn):
+        if conn.in_transaction:
+            conn.rollback()
+        return
+    conn.close()
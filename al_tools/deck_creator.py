@@ -163,6 +163,7 @@ class DeckCreator:
             deck_type="625",
             source_locale=self.source_locale,
             target_locale=self.target_locale,
+            crowdanki_uuid=self.deck_uuid,
         )
 
     def create_description_file(self):
@@ -371,6 +372,7 @@ class DeckCreator:
                 "deck_type": deck.deck_type,
                 "source_locale": deck.source_locale,
                 "target_locale": deck.target_locale,
+                "crowdanki_uuid": deck.crowdanki_uuid,
             }
         }
 
@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Dict, Optional
 import sqlite3
 
+from al_tools import db
+
 # Cache for loaded translations
 _language_names: Optional[Dict[str, Dict[str, str]]] = None
 _ui_strings: Optional[Dict[str, Dict[str, str]]] = None
@@ -28,31 +30,31 @@ def _get_db_path() -> Path:
     return _DEFAULT_DB_PATH
 
 
-def _load_table(db_path: Path, table: str, columns: list[str]) -> list[tuple]:
+def _load_table(
+    conn: sqlite3.Connection, db_path: Path, table: str, columns: list[str]
+) -> list[tuple]:
     """Load rows from a table, raising if the table is missing."""
-    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     cursor.execute(
         f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'"
     )
     if not cursor.fetchone():
-        conn.close()
         raise RuntimeError(
             f"Table '{table}' not found in {db_path}. Regenerate with: just csv2sqlite"
         )
 
     cursor.execute(f"SELECT {', '.join(columns)} FROM {table}")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return cursor.fetchall()
 
 
-def _load_language_names(db_path: Path) -> Dict[str, Dict[str, str]]:
+def _load_language_names(
+    conn: sqlite3.Connection, db_path: Path
+) -> Dict[str, Dict[str, str]]:
     """Load language names from database."""
     result: Dict[str, Dict[str, str]] = {}
     for source_locale, target_locale, name in _load_table(
-        db_path, "i18n_language_names", ["source_locale", "target_locale", "name"]
+        conn, db_path, "i18n_language_names", ["source_locale", "target_locale", "name"]
     ):
         if source_locale not in result:
             result[source_locale] = {}
@@ -60,11 +62,13 @@ def _load_language_names(db_path: Path) -> Dict[str, Dict[str, str]]:
     return result
 
 
-def _load_ui_strings(db_path: Path) -> Dict[str, Dict[str, str]]:
+def _load_ui_strings(
+    conn: sqlite3.Connection, db_path: Path
+) -> Dict[str, Dict[str, str]]:
     """Load UI strings from database."""
     result: Dict[str, Dict[str, str]] = {}
     for locale, key, value in _load_table(
-        db_path, "i18n_ui_strings", ["locale", "key", "value"]
+        conn, db_path, "i18n_ui_strings", ["locale", "key", "value"]
     ):
         if locale not in result:
             result[locale] = {}
@@ -72,11 +76,13 @@ def _load_ui_strings(db_path: Path) -> Dict[str, Dict[str, str]]:
     return result
 
 
-def _load_card_types(db_path: Path) -> Dict[str, Dict[str, str]]:
+def _load_card_types(
+    conn: sqlite3.Connection, db_path: Path
+) -> Dict[str, Dict[str, str]]:
     """Load card types from database."""
     result: Dict[str, Dict[str, str]] = {}
     for locale, card_type, name in _load_table(
-        db_path, "i18n_card_types", ["locale", "card_type", "name"]
+        conn, db_path, "i18n_card_types", ["locale", "card_type", "name"]
     ):
         if locale not in result:
             result[locale] = {}
@@ -95,9 +101,13 @@ def _ensure_loaded():
                 f"Translation database not found at {db_path}. "
                 "Generate it with: just csv2sqlite"
             )
-        _language_names = _load_language_names(db_path)
-        _ui_strings = _load_ui_strings(db_path)
-        _card_types = _load_card_types(db_path)
+        conn = db.connect(db_path)
+        try:
+            _language_names = _load_language_names(conn, db_path)
+            _ui_strings = _load_ui_strings(conn, db_path)
+            _card_types = _load_card_types(conn, db_path)
+        finally:
+            db.close(conn)
 
 
 def reload_translations():
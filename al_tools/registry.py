@@ -2,9 +2,12 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import yaml
 
+if TYPE_CHECKING:
+    from al_tools.release import Version
+
 
 @dataclass
 class Deck:
@@ -20,12 +23,21 @@ class Deck:
     deck_type: str  # "625" or "minimal_pairs"
     source_locale: str
     target_locale: str
+    crowdanki_uuid: Optional[str] = None  # UUID of the deck in CrowdAnki exports
 
     @property
     def build_folder(self) -> Path:
         """Derived: build output folder."""
         return Path("build") / self.tag_name
 
+    @property
+    def note_model_dir(self) -> Path:
+        """Derived: folder of the note model (note.yaml, CSS and card templates)."""
+        source_code = self.source_locale.split("_")[0]
+        target_code = self.target_locale.split("_")[0]
+        prefix = "vocabulary" if self.deck_type == "625" else self.deck_type
+        return Path("src/note_models") / f"{prefix}_{source_code}_to_{target_code}"
+
     @property
     def website_slug(self) -> str:
         """Derived: URL slug for website."""
@@ -72,6 +84,7 @@ class DeckRegistry:
         """Load deck registry from YAML file."""
         self.registry_path = registry_path
         self.decks: Dict[str, Deck] = {}
+        self._tag_index: Optional[Dict[str, List["Version"]]] = None
         self._load()
 
     def _load(self):
@@ -97,6 +110,7 @@ class DeckRegistry:
                 deck_type=deck_data["deck_type"],
                 source_locale=deck_data["source_locale"],
                 target_locale=deck_data["target_locale"],
+                crowdanki_uuid=deck_data.get("crowdanki_uuid"),
             )
 
     def get(self, deck_id: str) -> Optional[Deck]:
@@ -115,47 +129,69 @@ class DeckRegistry:
         """Get all decks with a specific source locale."""
         return [d for d in self.decks.values() if d.source_locale == source_locale]
 
-    def get_latest_release_version(self, deck_id: str) -> Optional[str]:
-        """Get the latest released version from git tags."""
+    def _release_tags(self) -> Dict[str, List["Version"]]:
+        """Get the released versions of each tag name from the git tags.
+
+        All tags are read with one git call and cached for the lifetime of
+        the registry, see invalidate_tags().
+        """
+        if self._tag_index is not None:
+            return self._tag_index
+
         import subprocess
 
-        deck = self.get(deck_id)
-        if not deck:
-            return None
+        # Imported here as al_tools.release imports this module
+        from al_tools.release import Version
 
         try:
-            # Get all tags for this deck
             result = subprocess.run(
-                ["git", "tag", "--list", f"{deck.tag_name}/*"],
+                ["git", "for-each-ref", "--format=%(refname:strip=2)", "refs/tags"],
                 capture_output=True,
                 text=True,
                 check=True,
             )
-
             tags = result.stdout.strip().split("\n")
-            if not tags or tags == [""]:
-                return None
-
-            # Extract versions and find the latest
-            versions = []
-            for tag in tags:
-                # Tag format: TAG_NAME/VERSION
-                if "/" in tag:
-                    version = tag.split("/", 1)[1]
-                    # Skip dev versions
-                    if not version.endswith("-dev"):
-                        versions.append(version)
-
-            if not versions:
-                return None
-
-            # Sort versions (simple string sort works for semver)
-            versions.sort(reverse=True)
-            return versions[0]
-
         except subprocess.CalledProcessError:
+            tags = []
+
+        index: Dict[str, List[Version]] = {}
+        for tag in tags:
+            # Tag format: TAG_NAME/VERSION
+            if "/" not in tag:
+                continue
+            tag_name, version_str = tag.split("/", 1)
+            try:
+                version = Version.parse(version_str)
+            except ValueError:
+                continue
+            # Skip dev versions
+            if not version.is_dev:
+                index.setdefault(tag_name, []).append(version)
+
+        self._tag_index = index
+        return index
+
+    def invalidate_tags(self):
+        """Forget the cached git tags, e.g. after creating a tag."""
+        self._tag_index = None
+
+    def get_latest_release_version(self, deck_id: str) -> Optional[str]:
+        """Get the latest released version from git tags."""
+        deck = self.get(deck_id)
+        if not deck:
             return None
 
+        versions = self._release_tags().get(deck.tag_name)
+        if not versions:
+            return None
+        return str(sorted(versions)[-1])
+
+    def get_latest_release_versions(self) -> Dict[str, Optional[str]]:
+        """Get the latest released version of every deck from git tags."""
+        return {
+            deck_id: self.get_latest_release_version(deck_id) for deck_id in self.decks
+        }
+
     def __len__(self) -> int:
         return len(self.decks)
 
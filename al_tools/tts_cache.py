@@ -0,0 +1,145 @@
+"""Content-addressed cache for synthesized TTS audio.
+
+Entries are keyed by a hash of everything that determines the audio: voice,
+model, input text or SSML, and audio config. Re-generating a file with the
+same input (e.g. with --action overwrite) then doesn't call the TTS API again.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+def default_cache_dir() -> Path:
+    """Get the default cache directory ($XDG_CACHE_HOME/ankilangs/tts)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ankilangs" / "tts"
+
+
+def cache_key(voice, synthesis_input, audio_config) -> str:
+    """Compute the cache key of a TTS request.
+
+    Args:
+        voice: VoiceSelectionParams of the request
+        synthesis_input: SynthesisInput of the request
+        audio_config: AudioConfig of the request
+
+    Returns:
+        Hex digest identifying the request
+    """
+    is_ssml = bool(synthesis_input.ssml)
+    payload = {
+        "voice": [voice.language_code, voice.name, voice.model_name],
+        "input": [is_ssml, synthesis_input.ssml if is_ssml else synthesis_input.text],
+        "audio_config": [
+            int(audio_config.audio_encoding),
+            audio_config.speaking_rate,
+            audio_config.pitch,
+            audio_config.volume_gain_db,
+            audio_config.sample_rate_hertz,
+            list(audio_config.effects_profile_id),
+        ],
+    }
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Number of entries and total size of a TTS cache."""
+
+    entries: int
+    total_bytes: int
+
+
+class TtsCache:
+    """Size-bounded cache of TTS audio, evicting least recently used entries.
+
+    Reading an entry updates its modification time, which is used as the
+    last-used timestamp when pruning.
+    """
+
+    def __init__(self, cache_dir: Path | None = None, max_bytes: int = 1024**3):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        if not self.cache_dir.exists():
+            return []
+        return [(path, path.stat()) for path in self.cache_dir.glob("*/*.mp3")]
+
+    def get(self, key: str) -> bytes | None:
+        """Get cached audio, or None if the key is not cached."""
+        path = self._path(key)
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return content
+
+    def put(self, key: str, audio_content: bytes):
+        """Store audio, evicting old entries if the cache grows above max_bytes."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio_content)
+
+        with self._lock:
+            # Overwriting an entry (e.g. on a retry) replaces its size
+            try:
+                replaced_bytes = path.stat().st_size
+            except FileNotFoundError:
+                replaced_bytes = 0
+            os.replace(tmp_name, path)
+            if self._total_bytes is None:
+                self._total_bytes = self.stats().total_bytes
+            else:
+                self._total_bytes += len(audio_content) - replaced_bytes
+            if self._total_bytes > self.max_bytes:
+                self._prune_locked(self.max_bytes)
+
+    def stats(self) -> CacheStats:
+        """Count the entries and their total size."""
+        entries = self._entries()
+        return CacheStats(len(entries), sum(st.st_size for _, st in entries))
+
+    def prune(self, max_bytes: int | None = None) -> Tuple[int, int]:
+        """Remove least recently used entries until the cache fits into max_bytes.
+
+        Args:
+            max_bytes: Size limit, defaults to the limit of the cache
+
+        Returns:
+            Number of removed entries and number of freed bytes
+        """
+        with self._lock:
+            return self._prune_locked(
+                self.max_bytes if max_bytes is None else max_bytes
+            )
+
+    def _prune_locked(self, max_bytes: int) -> Tuple[int, int]:
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime_ns)
+        total_bytes = sum(st.st_size for _, st in entries)
+        removed, freed = 0, 0
+        for path, st in entries:
+            if total_bytes <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= st.st_size
+            removed += 1
+            freed += st.st_size
+        self._total_bytes = total_bytes
+        return removed, freed
@@ -1,5 +1,7 @@
 """Tests for changelog parsing."""
 
+import os
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -8,6 +10,13 @@ import pytest
 from al_tools.content import ChangelogParser
 
 
+@pytest.fixture(autouse=True)
+def clear_changelog_cache():
+    ChangelogParser.clear_cache()
+    yield
+    ChangelogParser.clear_cache()
+
+
 def test_parse_single_entry(tmp_path: Path):
     """Test parsing a changelog with a single entry."""
     changelog = tmp_path / "changelog.md"
@@ -180,3 +189,34 @@ def test_parse_nonexistent_file(tmp_path: Path):
 
     with pytest.raises(FileNotFoundError):
         ChangelogParser.parse(changelog)
+
+
+def _set_mtime(path: Path, mtime_ns: int):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_parse_again_after_change(tmp_path: Path):
+    """Test that a cached changelog is parsed again when it changes."""
+    changelog = tmp_path / "changelog.md"
+    changelog.write_text("## 0.1.0\n\n- First\n")
+    _set_mtime(changelog, time.time_ns() - 10_000_000_000)
+    assert ChangelogParser.get_latest_entry(changelog).changes == ["First"]
+
+    changelog.write_text("## 0.1.0\n\n- Second\n")
+    _set_mtime(changelog, time.time_ns() - 5_000_000_000)
+
+    assert ChangelogParser.get_latest_entry(changelog).changes == ["Second"]
+
+
+def test_recently_modified_changelog_is_not_cached(tmp_path: Path):
+    """Test that a rewrite with the same size and mtime is noticed when the
+    first version was parsed right after being written."""
+    changelog = tmp_path / "changelog.md"
+    changelog.write_text("## 0.1.0\n\n- First\n")
+    mtime_ns = changelog.stat().st_mtime_ns
+    assert ChangelogParser.get_latest_entry(changelog).changes == ["First"]
+
+    changelog.write_text("## 0.1.0\n\n- Other\n")
+    _set_mtime(changelog, mtime_ns)
+
+    assert ChangelogParser.get_latest_entry(changelog).changes == ["Other"]
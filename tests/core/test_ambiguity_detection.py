@@ -33,3 +33,18 @@ def test_basic_french_no_ambiguity(testdata_dir, tmpdir, golden_dir):
     output = ambiguity_detection(db_path, testdata_dir, media_dir=None)
 
     assert output == ""
+
+
+def test_key_with_comma(testdata_dir, tmpdir):
+    from al_tools.core import ambiguity_detection, csv2sqlite
+
+    db_path = tmpdir / "test.db"
+    csv2sqlite(testdata_dir, db_path, force=True)
+    output = ambiguity_detection(db_path, testdata_dir, media_dir=None)
+
+    assert (
+        output
+        == """The following ambiguous words were found in the file '625_words-from-en_us-to-de_de.csv':
+  - 'you' has the key(s) ("you [plural, y'all]", 'you [singular]') and missing column(s) ('pronunciation hint',)
+"""
+    )
@@ -1,11 +1,22 @@
 """Tests for audio generation with fake TTS client."""
 
 import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
 
 import pytest
+from google.api_core import exceptions as api_exceptions
 
-from al_tools.core import AudioExistsAction, csv2sqlite, generate_audio
-from tests.fakes import FakeTextToSpeechClient
+from al_tools.core import (
+    AudioExistsAction,
+    csv2sqlite,
+    generate_audio,
+    generate_audio_all_locales,
+)
+from al_tools.tts_cache import TtsCache
+from tests.fakes import FakeTextToSpeechClient, FlakyTextToSpeechClient
 
 
 def _setup_db(testdata_dir, tmp_path):
@@ -225,3 +236,308 @@ def test_ssml_override(testdata_dir, tmp_path):
 
     dog_call = fake_client.calls[1]
     assert dog_call["input"].ssml == "<speak>the dog</speak>"
+
+
+def _audio_columns(db_path, locale="en_us"):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT key, audio, audio_source FROM base_language"
+        " WHERE locale = ? ORDER BY key",
+        (locale,),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_workers_write_same_result_as_sequential(testdata_dir, tmp_path):
+    """Concurrent requests produce the same files and voices as a sequential run."""
+    results = []
+    for workers in [1, 4]:
+        run_dir = tmp_path / f"workers_{workers}"
+        run_dir.mkdir()
+        db_path, audio_dir = _setup_db(testdata_dir, run_dir)
+
+        generate_audio(
+            db_path,
+            "en_us",
+            audio_dir,
+            AudioExistsAction.SKIP,
+            data_dir=testdata_dir,
+            delay=0,
+            tts_client=FakeTextToSpeechClient(),
+            workers=workers,
+        )
+
+        files = sorted(f.name for f in audio_dir.glob("*.mp3"))
+        results.append((files, _audio_columns(db_path)))
+
+    assert len(results[0][0]) == 16
+    assert results[0] == results[1]
+
+
+def test_characters_per_minute_throttles_requests(testdata_dir, tmp_path):
+    """Requests wait once the character budget is used up."""
+    db_path, audio_dir = _setup_db(testdata_dir, tmp_path)
+    fake_client = FakeTextToSpeechClient()
+
+    start = time.monotonic()
+    generate_audio(
+        db_path,
+        "en_us",
+        audio_dir,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        tts_client=fake_client,
+        workers=2,
+        requests_per_minute=6000,
+        # 10 characters per second: "the cat" fits, "the dog" has to wait
+        characters_per_minute=600,
+    )
+
+    assert len(fake_client.calls) == 2
+    assert time.monotonic() - start >= 0.3
+
+
+def test_cache_avoids_repeated_requests(testdata_dir, tmp_path):
+    """Regenerating identical audio is served from the TTS cache."""
+    db_path, audio_dir = _setup_db(testdata_dir, tmp_path)
+    cache = TtsCache(tmp_path / "cache")
+    fake_client = FakeTextToSpeechClient()
+
+    for _ in range(2):
+        generate_audio(
+            db_path,
+            "en_us",
+            audio_dir,
+            AudioExistsAction.OVERWRITE,
+            data_dir=testdata_dir,
+            delay=0,
+            tts_client=fake_client,
+            tts_cache=cache,
+        )
+
+    assert len(fake_client.calls) == 2
+    assert cache.stats().entries == 2
+    assert (audio_dir / "al_en_us_the_cat.mp3").read_bytes() == fake_client.audio_bytes
+
+
+_CRASHING_RUN = """
+import os, signal, sys
+from pathlib import Path
+from al_tools.core import AudioExistsAction, generate_audio
+from tests.fakes import FakeTextToSpeechClient, FlakyTextToSpeechClient
+
+class CrashingClient(FakeTextToSpeechClient):
+    def synthesize_speech(self, **kwargs):
+        if self.calls:
+            os.kill(os.getpid(), signal.SIGKILL)
+        return super().synthesize_speech(**kwargs)
+
+db_path, audio_dir, data_dir = map(Path, sys.argv[1:])
+generate_audio(db_path, "en_us", audio_dir, AudioExistsAction.SKIP,
+               data_dir=data_dir, delay=0, tts_client=CrashingClient())
+"""
+
+
+def test_recovers_references_after_crash(testdata_dir, tmp_path):
+    """Files written before a crash get their DB reference on the next run."""
+    db_path, audio_dir = _setup_db(testdata_dir, tmp_path)
+
+    result = subprocess.run(
+        [sys.executable, "-c", _CRASHING_RUN, db_path, audio_dir, testdata_dir],
+        cwd=Path(__file__).parents[2],
+    )
+    assert result.returncode != 0
+    assert (audio_dir / "al_en_us_the_cat.mp3").exists()
+
+    fake_client = FakeTextToSpeechClient()
+    generate_audio(
+        db_path,
+        "en_us",
+        audio_dir,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        delay=0,
+        tts_client=fake_client,
+    )
+
+    # Only the dog was missing, the cat's reference was recovered
+    assert len(fake_client.calls) == 1
+    assert _audio_columns(db_path)[0][:2] == (
+        "the cat",
+        "[sound:al_en_us_the_cat.mp3]",
+    )
+
+
+def test_skip_links_existing_file_without_reference(testdata_dir, tmp_path):
+    """SKIP stores the reference of an existing file the DB doesn't know about."""
+    db_path, audio_dir = _setup_db(testdata_dir, tmp_path)
+    audio_dir.mkdir(parents=True)
+    (audio_dir / "al_en_us_the_cat.mp3").write_bytes(b"original-content")
+
+    generate_audio(
+        db_path,
+        "en_us",
+        audio_dir,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        delay=0,
+        tts_client=FakeTextToSpeechClient(),
+    )
+
+    assert _audio_columns(db_path)[0] == (
+        "the cat",
+        "[sound:al_en_us_the_cat.mp3]",
+        "",
+    )
+
+
+def test_retries_transient_errors(testdata_dir, tmp_path):
+    """A temporarily unavailable API is retried instead of aborting the run."""
+    db_path, audio_dir = _setup_db(testdata_dir, tmp_path)
+    flaky_client = FlakyTextToSpeechClient(
+        [api_exceptions.ServiceUnavailable("try again")]
+    )
+
+    generate_audio(
+        db_path,
+        "en_us",
+        audio_dir,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        delay=0,
+        tts_client=flaky_client,
+    )
+
+    assert len(flaky_client.calls) == 3
+    assert len(list(audio_dir.glob("*.mp3"))) == 2
+
+
+def test_resume_reuses_voices_of_interrupted_run(testdata_dir, tmp_path):
+    """A rerun continues the planned jobs with their voices instead of replanning."""
+    db_path, audio_dir = _setup_db(testdata_dir, tmp_path)
+    failing_client = FlakyTextToSpeechClient(
+        [None, api_exceptions.PermissionDenied("quota")]
+    )
+
+    # Seed 7 picks en-US-Studio-O for the dog, seed 8 would pick Studio-Q
+    with pytest.raises(Exception, match="quota"):
+        generate_audio(
+            db_path,
+            "en_us",
+            audio_dir,
+            AudioExistsAction.SKIP,
+            data_dir=testdata_dir,
+            seed=7,
+            delay=0,
+            tts_client=failing_client,
+        )
+    # Permanent errors are not retried
+    assert len(failing_client.calls) == 2
+
+    fake_client = FakeTextToSpeechClient()
+    generate_audio(
+        db_path,
+        "en_us",
+        audio_dir,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        seed=8,
+        delay=0,
+        tts_client=fake_client,
+    )
+
+    assert len(fake_client.calls) == 1
+    assert _audio_columns(db_path)[1] == (
+        "the dog",
+        "[sound:al_en_us_the_dog.mp3]",
+        "Google Cloud TTS<br>Voice: en-US-Studio-O",
+    )
+    assert not (tmp_path / "test.db-audio-journal.jsonl").exists()
+
+
+def test_all_locales_writes_each_locale_to_own_folder(testdata_dir, tmp_path, capsys):
+    """All locales with voices are generated, with the same voices as single runs."""
+    db_path, _ = _setup_db(testdata_dir, tmp_path)
+    audio_root = tmp_path / "audio"
+
+    generate_audio_all_locales(
+        db_path,
+        audio_root,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        delay=0,
+        tts_client=FakeTextToSpeechClient(),
+    )
+
+    assert sorted(f.name for f in (audio_root / "en_US").glob("*.mp3")) == [
+        "al_en_us_the_cat.mp3",
+        "al_en_us_the_dog.mp3",
+    ]
+    assert sorted(f.name for f in (audio_root / "sq_AL").glob("*.mp3")) == [
+        "al_sq_al_the_cat.mp3",
+        "al_sq_al_the_dog.mp3",
+    ]
+    assert not (audio_root / "xx_YY").exists()
+
+    output = capsys.readouterr().out
+    assert "No TTS voices configured for locale 'xx_yy'" in output
+    assert "AUDIO GENERATION REPORT" in output
+    assert "Studio" in output and "Gemini" in output
+
+    single_dir = tmp_path / "single"
+    single_dir.mkdir()
+    single_db, single_audio = _setup_db(testdata_dir, single_dir)
+    generate_audio(
+        single_db,
+        "en_us",
+        single_audio,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        delay=0,
+        tts_client=FakeTextToSpeechClient(),
+    )
+    assert _audio_columns(db_path) == _audio_columns(single_db)
+
+
+def test_all_locales_limit_is_spread_over_locales(testdata_dir, tmp_path):
+    """Requests alternate between locales, so a limit covers all of them."""
+    db_path, _ = _setup_db(testdata_dir, tmp_path)
+    audio_root = tmp_path / "audio"
+
+    generate_audio_all_locales(
+        db_path,
+        audio_root,
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        delay=0,
+        tts_client=FakeTextToSpeechClient(),
+        limit=2,
+    )
+
+    assert sorted(f.name for f in audio_root.glob("*/*.mp3")) == [
+        "al_en_us_the_cat.mp3",
+        "al_sq_al_the_cat.mp3",
+    ]
+
+
+def test_family_limit_throttles_only_that_family(testdata_dir, tmp_path):
+    """A voice family limit applies on top of the global limit."""
+    db_path, _ = _setup_db(testdata_dir, tmp_path)
+    fake_client = FakeTextToSpeechClient()
+
+    start = time.monotonic()
+    generate_audio_all_locales(
+        db_path,
+        tmp_path / "audio",
+        AudioExistsAction.SKIP,
+        data_dir=testdata_dir,
+        tts_client=fake_client,
+        workers=2,
+        requests_per_minute=6000,
+        # One Gemini request per second: the second sq_al request has to wait
+        family_requests_per_minute={"gemini": 60},
+    )
+
+    assert len(fake_client.calls) == 4
+    assert time.monotonic() - start >= 0.9
@@ -0,0 +1,145 @@
+"""Tests for the row-level changelog used by sqlite2csv, generate and check."""
+
+import sqlite3
+
+from al_tools.core import (
+    ambiguity_detection,
+    csv2sqlite,
+    generate_joined_source_fields,
+    sqlite2csv,
+)
+
+
+def _create_data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "625_words-vocabulary.csv").write_text(
+        "key,clarification\nthe cat,\nthe dog,\n"
+    )
+    (data_dir / "625_words-base-en_us.csv").write_text(
+        "key,text:en,ipa:en,audio:en,audio source:en,tags:en\n"
+        "the cat,the cat,,,,AnkiLangs::EN\n"
+        "the dog,the dog,,,,AnkiLangs::EN\n"
+    )
+    for locale, cat, dog in [
+        ("de_de", "die Katze", "der Hund"),
+        ("es_es", "el gato", "el perro"),
+    ]:
+        lang = locale[:2]
+        (data_dir / f"625_words-base-{locale}.csv").write_text(
+            f"key,text:{lang},ipa:{lang},audio:{lang},audio source:{lang},tags:{lang}\n"
+            f"the cat,{cat},,,,AnkiLangs::{lang.upper()}\n"
+            f"the dog,{dog},,,,AnkiLangs::{lang.upper()}\n"
+        )
+        (data_dir / f"625_words-from-en_us-to-{locale}.csv").write_text(
+            "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+            f"the cat,{locale}-1,,,,,\n"
+            f"the dog,{locale}-2,,,,,\n"
+        )
+    return data_dir
+
+
+def _execute(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(sql).fetchall()
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def test_edits_are_logged_until_next_import(tmp_path):
+    """Inserts, updates and deletes are logged with the key of the row."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    _execute(
+        db_path,
+        "UPDATE base_language SET locale = 'fr_fr' WHERE locale = 'es_es' AND key = 'the cat'",
+    )
+    _execute(db_path, "DELETE FROM pictures")
+    _execute(
+        db_path, "INSERT INTO pictures (key, picture) VALUES ('the cat', 'cat.jpg')"
+    )
+
+    assert _execute(
+        db_path, "SELECT table_name, row_key, op FROM _changelog ORDER BY id"
+    ) == [
+        ("base_language", '["the cat","fr_fr"]', "UPDATE"),
+        ("base_language", '["the cat","es_es"]', "DELETE"),
+        ("pictures", '["the cat"]', "INSERT"),
+    ]
+
+    csv2sqlite(data_dir, db_path, force=True)
+
+    assert _execute(db_path, "SELECT * FROM _changelog") == []
+
+
+def test_sqlite2csv_renders_changed_files_only(tmp_path, capsys):
+    """Only files with logged changes are exported after an import."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+    sqlite2csv(db_path, data_dir, force=True)
+
+    _execute(
+        db_path, "UPDATE translation_pair SET notes = 'a note' WHERE guid = 'de_de-1'"
+    )
+    capsys.readouterr()
+    sqlite2csv(db_path, data_dir, fail_if_conflict=True)
+
+    output = capsys.readouterr().out
+    assert "Exporting the files changed since the last sync" in output
+    assert "Exported 625_words-from-en_us-to-de_de.csv (2 rows)" in output
+    assert "es_es" not in output
+    assert "a note" in (data_dir / "625_words-from-en_us-to-de_de.csv").read_text()
+
+
+def test_generate_rebuilds_changed_locales_only(tmp_path):
+    """Generated files of locales without changes are not re-rendered."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    output_dir = tmp_path / "generated"
+    csv2sqlite(data_dir, db_path, force=True)
+    generate_joined_source_fields(db_path, output_dir, data_dir)
+
+    # Generated files are only rendered again if their locale changed
+    es_file = output_dir / "625_words-from-en_us-to-es_es.csv"
+    es_file.write_text("stale\n")
+    _execute(
+        db_path, "UPDATE base_language SET audio_source = 'Me' WHERE locale = 'de_de'"
+    )
+
+    generate_joined_source_fields(db_path, output_dir, data_dir)
+
+    assert (
+        "Audio:<br>Me" in (output_dir / "625_words-from-en_us-to-de_de.csv").read_text()
+    )
+    assert es_file.read_text() == "stale\n"
+
+
+def test_check_rechecks_changed_pairs(tmp_path):
+    """Ambiguities are found and resolved in pairs changed since the last check."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+    assert ambiguity_detection(db_path, data_dir, media_dir=None) == ""
+
+    _execute(
+        db_path, "UPDATE base_language SET text = 'el animal' WHERE locale = 'es_es'"
+    )
+    output = ambiguity_detection(db_path, data_dir, media_dir=None)
+    assert output == (
+        "The following ambiguous words were found in the file "
+        "'625_words-from-en_us-to-es_es.csv':\n"
+        "  - 'el animal' has the key(s) ('the cat', 'the dog') and missing "
+        "column(s) ('reading hint', 'listening hint')\n"
+    )
+    # Unchanged pairs keep their findings
+    assert ambiguity_detection(db_path, data_dir, media_dir=None) == output
+
+    _execute(
+        db_path,
+        "UPDATE translation_pair SET reading_hint = 'animal', listening_hint = 'animal' WHERE guid = 'es_es-1'",
+    )
+    assert ambiguity_detection(db_path, data_dir, media_dir=None) == ""
@@ -120,3 +120,20 @@ def test_no_issues_when_consistent(tmp_path):
     output = ambiguity_detection(db_path, data_dir, media_dir=media_dir)
 
     assert "AUDIO FILES" not in output
+
+
+def test_missing_locale_directory_and_other_locales(tmp_path):
+    """References to a missing locale directory are reported, other dirs are scanned."""
+    db_path, data_dir, media_dir = _setup(tmp_path)
+
+    other_dir = media_dir / "de_DE"
+    other_dir.mkdir(parents=True)
+    (other_dir / "al_de_de_orphan.mp3").write_bytes(b"fake")
+    (other_dir / "notes.txt").write_text("not audio")
+
+    output = ambiguity_detection(db_path, data_dir, media_dir=media_dir)
+
+    assert "en_US/al_en_us_the_cat.mp3 (key: 'the cat')" in output
+    assert "en_US/al_en_us_the_dog.mp3 (key: 'the dog')" in output
+    assert "de_DE/al_de_de_orphan.mp3" in output
+    assert "notes.txt" not in output
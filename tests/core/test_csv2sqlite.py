@@ -0,0 +1,169 @@
+"""Tests for importing CSV files into SQLite with csv2sqlite."""
+
+import sqlite3
+
+import pytest
+
+from al_tools.core import audit_query_plans, csv2sqlite
+
+
+def _create_data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "625_words-vocabulary.csv").write_text(
+        "key,clarification\nthe cat,\nthe dog,a pet\n"
+    )
+    (data_dir / "625_words-base-en_us.csv").write_text(
+        "key,text:en,ipa:en,audio:en,audio source:en,tags:en\n"
+        "the cat,the cat,/ðə kæt/,,,AnkiLangs::EN\n"
+        "the dog,the dog,/ðə dɒɡ/,,,AnkiLangs::EN\n"
+    )
+    return data_dir
+
+
+def _query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(sql).fetchall()
+    conn.close()
+    return rows
+
+
+def test_failed_import_leaves_database_unchanged(tmp_path):
+    """A CSV error during import rolls back the whole import."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    (data_dir / "625_words-base-en_us.csv").write_text(
+        "key,text:en,ipa:en,audio:en,audio source:en,tags:en\n"
+        "the cat,changed,,,,AnkiLangs::EN\n"
+    )
+    # Duplicate vocabulary keys violate the primary key
+    (data_dir / "625_words-vocabulary.csv").write_text(
+        "key,clarification\nthe cat,\nthe cat,\n"
+    )
+
+    with pytest.raises(sqlite3.IntegrityError):
+        csv2sqlite(data_dir, db_path, force=True)
+
+    assert _query(db_path, "SELECT key, text FROM base_language ORDER BY key") == [
+        ("the cat", "the cat"),
+        ("the dog", "the dog"),
+    ]
+
+
+def test_modification_tracking_active_after_import(tmp_path):
+    """Edits after the import are tracked, the import itself is not."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    meta = dict(_query(db_path, "SELECT key, value FROM _meta"))
+    assert meta["db_data_modified_at"] == meta["synced_at"]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE _meta SET value = '2000-01-01T00:00:00Z'")
+    conn.execute("UPDATE base_language SET text = 'a cat' WHERE key = 'the cat'")
+    conn.commit()
+    conn.close()
+
+    meta = dict(_query(db_path, "SELECT key, value FROM _meta"))
+    assert meta["db_data_modified_at"] > "2000-01-01T00:00:00Z"
+
+
+def _add_spanish(data_dir):
+    (data_dir / "625_words-base-es_es.csv").write_text(
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the cat,el gato,/el ˈɡato/,,,AnkiLangs::ES\n"
+    )
+    (data_dir / "625_words-from-en_us-to-es_es.csv").write_text(
+        "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+        "the cat,abc123,,,,,\n"
+    )
+
+
+def test_incremental_import_reloads_changed_file_only(tmp_path):
+    """Only the rows of the changed file are replaced."""
+    data_dir = _create_data_dir(tmp_path)
+    _add_spanish(data_dir)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    (data_dir / "625_words-base-es_es.csv").write_text(
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the cat,el gato,/el ˈɡato/,,,AnkiLangs::ES\n"
+        "the bird,el pájaro,,,,AnkiLangs::ES\n"
+    )
+    csv2sqlite(data_dir, db_path, incremental=True)
+
+    assert _query(
+        db_path, "SELECT key, locale FROM base_language ORDER BY locale, key"
+    ) == [
+        ("the cat", "en_us"),
+        ("the dog", "en_us"),
+        ("the bird", "es_es"),
+        ("the cat", "es_es"),
+    ]
+    assert ("the bird",) in _query(db_path, "SELECT key FROM vocabulary")
+    assert _query(db_path, "SELECT guid FROM translation_pair") == [("abc123",)]
+
+
+def test_incremental_import_matches_full_import(tmp_path):
+    """Incremental and full import produce the same database content."""
+    data_dir = _create_data_dir(tmp_path)
+    _add_spanish(data_dir)
+    incremental_db = tmp_path / "incremental.db"
+    csv2sqlite(data_dir, incremental_db, force=True)
+
+    (data_dir / "625_words-base-es_es.csv").unlink()
+    (data_dir / "625_words-from-en_us-to-es_es.csv").write_text(
+        "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+        "the cat,abc123,a hint,,,,\n"
+        "the fish,def456,,,,,\n"
+    )
+    csv2sqlite(data_dir, incremental_db, incremental=True)
+
+    full_db = tmp_path / "full.db"
+    csv2sqlite(data_dir, full_db, force=True)
+
+    for table in ["vocabulary", "base_language", "translation_pair"]:
+        sql = f"SELECT * FROM {table} ORDER BY key"
+        assert _query(incremental_db, sql) == _query(full_db, sql)
+
+
+def test_incremental_import_discards_unsaved_edits(tmp_path):
+    """With unsaved DB edits the incremental import falls back to a full import."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "UPDATE _meta SET value = '2000-01-01T00:00:00Z' WHERE key = 'synced_at'"
+    )
+    conn.execute("UPDATE base_language SET text = 'a dog' WHERE key = 'the dog'")
+    conn.commit()
+    conn.close()
+
+    csv2sqlite(data_dir, db_path, force=True, incremental=True)
+
+    assert _query(db_path, "SELECT text FROM base_language WHERE key = 'the dog'") == [
+        ("the dog",)
+    ]
+
+
+def test_hot_queries_use_indexes_after_import(tmp_path):
+    """The query plan audit finds no full table scans in an imported database."""
+    data_dir = _create_data_dir(tmp_path)
+    _add_spanish(data_dir)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    assert audit_query_plans(db_path, data_dir) == 0
+
+    # Databases created before the index existed are flagged
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP INDEX idx_translation_pair_guid")
+    conn.close()
+
+    assert audit_query_plans(db_path, data_dir) == 1
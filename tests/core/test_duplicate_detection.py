@@ -146,3 +146,28 @@ def test_no_duplicates_clean_output(tmp_path):
     output = ambiguity_detection(db_path, data_dir, media_dir=None)
 
     assert "DUPLICATE" not in output
+
+
+def test_duplicates_are_listed_per_file(testdata_dir, tmp_path):
+    """Each file lists its duplicates once, sorted, with quoted keys parsed as CSV."""
+    db_path = tmp_path / "test.db"
+    csv2sqlite(testdata_dir, db_path, force=True)
+    output = ambiguity_detection(db_path, testdata_dir, media_dir=None)
+
+    assert output.startswith(
+        """DUPLICATE KEY ERRORS FOUND:
+Duplicate keys in '625_words-base-en_us.csv':
+  - 'the dog'
+  - 'you [plural, y'all]'
+
+Duplicate keys in '625_words-from-en_us-to-es_es.csv':
+  - 'the cat'
+
+Duplicate (key, locale) pairs in 'tts_overrides.csv':
+  - ('the cat', 'en_us')
+
+Duplicate GUIDs in 'minimal_pairs-from-en_us_to_es_es.csv':
+  - 'guid1'
+
+"""
+    )
@@ -0,0 +1,81 @@
+"""Tests for creating missing base language and translation pair entries."""
+
+import sqlite3
+
+from al_tools.core import (
+    csv2sqlite,
+    ensure_base_language_entries_exist,
+    ensure_translation_pairs_exist,
+)
+
+
+def _create_data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "625_words-vocabulary.csv").write_text(
+        "key,clarification\nthe cat,\nthe dog,\nThe End,\n"
+    )
+    (data_dir / "625_words-base-en_us.csv").write_text(
+        "key,text:en,ipa:en,audio:en,audio source:en,tags:en\n"
+        "the cat,the cat,,,,AnkiLangs::EN\n"
+        "the dog,the dog,,,,AnkiLangs::EN\n"
+        "The End,the end,,,,AnkiLangs::EN\n"
+    )
+    (data_dir / "625_words-base-es_es.csv").write_text(
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the dog,el perro,,,,AnkiLangs::ES\n"
+    )
+    (data_dir / "625_words-from-en_us-to-es_es.csv").write_text(
+        "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+        "the dog,abc,,,,,\n"
+    )
+    return data_dir
+
+
+def test_creates_missing_entries_in_db_and_csv(tmp_path):
+    """Missing keys are added to the database and the sorted CSV files."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+
+    ensure_base_language_entries_exist(db_path, data_dir)
+    ensure_translation_pairs_exist(db_path, data_dir)
+
+    assert (data_dir / "625_words-base-es_es.csv").read_text() == (
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the cat,,,,,AnkiLangs::ES\n"
+        "the dog,el perro,,,,AnkiLangs::ES\n"
+        "The End,,,,,AnkiLangs::ES\n"
+    )
+    assert (data_dir / "625_words-from-en_us-to-es_es.csv").read_text() == (
+        "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+        "the cat,,,,,,\n"
+        "the dog,abc,,,,,\n"
+        "The End,,,,,,\n"
+    )
+    conn = sqlite3.connect(db_path)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM translation_pair WHERE target_locale = 'es_es'"
+    ).fetchone() == (3,)
+    conn.close()
+
+
+def test_entries_removed_after_last_run_are_recreated(tmp_path):
+    """Database edits after a run are picked up by the next run."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+    csv2sqlite(data_dir, db_path, force=True)
+    ensure_base_language_entries_exist(db_path, data_dir)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM base_language WHERE key = 'the cat' AND locale = 'es_es'")
+    conn.commit()
+    conn.close()
+
+    ensure_base_language_entries_exist(db_path, data_dir)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM base_language WHERE locale = 'es_es'"
+    ).fetchone() == (3,)
+    conn.close()
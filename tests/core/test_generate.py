@@ -1,6 +1,7 @@
 """Tests for generate_joined_source_fields."""
 
 import csv
+import os
 from pathlib import Path
 
 from al_tools.core import csv2sqlite, generate_joined_source_fields
@@ -59,3 +60,20 @@ def test_no_source_rows_excluded(testdata_dir, tmp_path):
     rows = _read_csv(out_file)
     keys = [r["key"] for r in rows]
     assert "the dog" not in keys
+
+
+def test_unchanged_files_are_not_rewritten(testdata_dir, tmp_path):
+    """Running generate again keeps files with identical content untouched."""
+    db_path = tmp_path / "test.db"
+    csv2sqlite(testdata_dir, db_path, force=True)
+
+    out_dir = tmp_path / "generated"
+    generate_joined_source_fields(db_path, out_dir, testdata_dir)
+    out_file = out_dir / "625_words-from-en_us-to-es_es.csv"
+    content = out_file.read_bytes()
+    os.utime(out_file, ns=(0, 0))
+
+    generate_joined_source_fields(db_path, out_dir, testdata_dir)
+
+    assert out_file.read_bytes() == content
+    assert out_file.stat().st_mtime_ns == 0
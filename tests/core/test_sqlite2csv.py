@@ -1,7 +1,9 @@
 """Tests for SQLite→CSV export."""
 
 import csv
+import stat
 
+from al_tools import core
 from al_tools.core import csv2sqlite, sqlite2csv
 
 
@@ -93,3 +95,21 @@ def test_tags_column_generated_from_locale(testdata_dir, tmp_path):
     with open(en_csv) as f:
         reader = list(csv.DictReader(f))
     assert reader[0]["tags:en"] == "AnkiLangs::EN"
+
+
+def test_exported_files_get_default_or_existing_mode(
+    testdata_dir, tmp_path, monkeypatch
+):
+    """Atomic writes don't leave mkstemp's owner-only mode on the files."""
+    monkeypatch.setattr(core, "_UMASK", 0o022)
+    out_dir = _export(testdata_dir, tmp_path)
+
+    csv_file = out_dir / "625_words-vocabulary.csv"
+    assert stat.S_IMODE(csv_file.stat().st_mode) == 0o644
+
+    # A file that is rewritten keeps its mode
+    csv_file.chmod(0o664)
+    csv_file.write_text("key,clarification\n")
+    sqlite2csv(tmp_path / "test.db", out_dir, force=True)
+    assert csv_file.read_text() != "key,clarification\n"
+    assert stat.S_IMODE(csv_file.stat().st_mode) == 0o664
@@ -1,5 +1,6 @@
 """Tests for CSV/SQLite sync detection."""
 
+import os
 import sqlite3
 import time
 
@@ -145,6 +146,32 @@ class TestSqlite2CsvSucceedsWhenDbModified:
         content = base_csv.read_text()
         assert "the fat cat" in content
 
+    def test_export_writes_changed_files_only(self, minimal_csv_data, tmp_path):
+        db_path = tmp_path / "test.db"
+
+        csv2sqlite(minimal_csv_data, db_path, force=True)
+        sqlite2csv(db_path, minimal_csv_data, force=True)
+        for csv_file in minimal_csv_data.glob("*.csv"):
+            os.utime(csv_file, ns=(0, 0))
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "UPDATE base_language SET text = 'the fat cat' WHERE key = 'the cat'"
+        )
+        conn.commit()
+        conn.close()
+
+        sqlite2csv(db_path, minimal_csv_data, fail_if_conflict=True)
+
+        base_csv = minimal_csv_data / "625_words-base-en_us.csv"
+        assert "the fat cat" in base_csv.read_text()
+        assert base_csv.stat().st_mtime_ns > 0
+        vocabulary_csv = minimal_csv_data / "625_words-vocabulary.csv"
+        assert vocabulary_csv.stat().st_mtime_ns == 0
+
+        # The stored fingerprints match the files on disk
+        sqlite2csv(db_path, minimal_csv_data, fail_if_conflict=True)
+
 
 class TestSqlite2CsvFailsWhenCsvModified:
     """Detects hash mismatch when CSV changed externally."""
@@ -188,3 +215,34 @@ class TestSqlite2CsvFailsWhenCsvModified:
         content = base_csv.read_text()
         assert "the cat,the cat" in content
         assert "external edit" not in content
+
+    def test_detects_same_size_edit_right_after_import(
+        self, minimal_csv_data, tmp_path
+    ):
+        db_path = tmp_path / "test.db"
+
+        csv2sqlite(minimal_csv_data, db_path, force=True)
+
+        # Same size as the original, written within the same second
+        base_csv = minimal_csv_data / "625_words-base-en_us.csv"
+        base_csv.write_text(base_csv.read_text().replace("the cat,", "the cot,"))
+
+        with pytest.raises(SyncConflictError):
+            sqlite2csv(db_path, minimal_csv_data, fail_if_conflict=True)
+
+
+class TestSqlite2CsvSucceedsWhenCsvOnlyTouched:
+    """Only the content of CSV files matters, not their timestamps."""
+
+    def test_touched_csv_is_not_a_conflict(self, minimal_csv_data, tmp_path):
+        db_path = tmp_path / "test.db"
+
+        csv2sqlite(minimal_csv_data, db_path, force=True)
+
+        # Simulates e.g. a git checkout rewriting an unchanged file
+        base_csv = minimal_csv_data / "625_words-base-en_us.csv"
+        base_csv.write_text(base_csv.read_text())
+        os.utime(base_csv, (time.time() + 60, time.time() + 60))
+
+        sqlite2csv(db_path, minimal_csv_data, fail_if_conflict=True)
+        sqlite2csv(db_path, minimal_csv_data, fail_if_conflict=True)
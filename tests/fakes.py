@@ -29,3 +29,24 @@ class FakeTextToSpeechClient:
             }
         )
         return FakeSynthesizeResponse(audio_content=self.audio_bytes)
+
+
+class FlakyTextToSpeechClient(FakeTextToSpeechClient):
+    """Fake Google Cloud TTS client that fails its first calls.
+
+    errors[i] is raised by call i, None lets that call succeed. All calls,
+    failed or not, are recorded.
+    """
+
+    def __init__(self, errors: list, audio_bytes: bytes = b"fake-mp3-audio-content"):
+        super().__init__(audio_bytes)
+        self.errors = errors
+
+    def synthesize_speech(self, *, input, voice, audio_config):
+        call = len(self.calls)
+        response = super().synthesize_speech(
+            input=input, voice=voice, audio_config=audio_config
+        )
+        if call < len(self.errors) and self.errors[call] is not None:
+            raise self.errors[call]
+        return response
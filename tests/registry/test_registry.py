@@ -124,3 +124,51 @@ def test_returns_none_when_no_tags(testdata_dir):
 def test_returns_none_for_unknown_deck(testdata_dir):
     reg = DeckRegistry(testdata_dir / "decks.yaml")
     assert reg.get_latest_release_version("nonexistent") is None
+
+
+def test_latest_release_versions_of_all_decks(testdata_dir):
+    reg = DeckRegistry(testdata_dir / "decks.yaml")
+    with mock.patch("subprocess.run") as mock_run:
+        mock_run.return_value = mock.Mock(
+            stdout="EN_to_ES_625_Words/0.2.0\nEN_to_ES_625_Words/0.3.0\n"
+            "EN_to_ES_Minimal_Pairs/0.1.0\nEN_to_FR_625_Words/0.2.0-dev\n",
+            returncode=0,
+        )
+        versions = reg.get_latest_release_versions()
+    assert mock_run.call_count == 1
+    assert versions == {
+        "en_to_es_625": "0.3.0",
+        "en_to_fr_625": None,
+        "en_to_es_mp": "0.1.0",
+    }
+
+
+def test_versions_are_compared_numerically(testdata_dir):
+    reg = DeckRegistry(testdata_dir / "decks.yaml")
+    with mock.patch("subprocess.run") as mock_run:
+        mock_run.return_value = mock.Mock(
+            stdout="EN_to_ES_625_Words/0.9.0\nEN_to_ES_625_Words/0.10.0\n",
+            returncode=0,
+        )
+        version = reg.get_latest_release_version("en_to_es_625")
+    assert version == "0.10.0"
+
+
+def test_tags_are_cached_until_invalidated(testdata_dir):
+    reg = DeckRegistry(testdata_dir / "decks.yaml")
+    with mock.patch("subprocess.run") as mock_run:
+        mock_run.return_value = mock.Mock(
+            stdout="EN_to_ES_625_Words/0.1.0\n", returncode=0
+        )
+        assert reg.get_latest_release_version("en_to_es_625") == "0.1.0"
+        assert reg.get_latest_release_version("en_to_fr_625") is None
+        assert mock_run.call_count == 1
+
+        mock_run.return_value = mock.Mock(
+            stdout="EN_to_ES_625_Words/0.1.0\nEN_to_ES_625_Words/0.2.0\n",
+            returncode=0,
+        )
+        assert reg.get_latest_release_version("en_to_es_625") == "0.1.0"
+        reg.invalidate_tags()
+        assert reg.get_latest_release_version("en_to_es_625") == "0.2.0"
+    assert mock_run.call_count == 2
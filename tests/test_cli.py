@@ -0,0 +1,202 @@
+"""Tests for the al-tools command line interface."""
+
+import json
+import shutil
+import subprocess
+import sys
+
+from pathlib import Path
+
+import pytest
+
+from al_tools.cli import generate_all_website_pages, print_deck_list
+from al_tools.core import csv2sqlite
+from al_tools.registry import DeckRegistry
+
+HEAVY_MODULES = ["pandas", "google.cloud.texttospeech", "xlsxwriter", "openpyxl"]
+
+_PROBE = """
+import json, sys
+sys.argv = ["al-tools"] + sys.argv[1:]
+from al_tools.cli import cli
+try:
+    cli()
+except SystemExit:
+    pass
+heavy = [name for name in json.loads(sys.stdin.read()) if name in sys.modules]
+print(json.dumps(heavy), file=sys.stderr)
+"""
+
+
+def _run_cli(args, cwd=None):
+    """Run the CLI in a new interpreter.
+
+    Returns:
+        Output of the command and the heavy modules it imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        input=json.dumps(HEAVY_MODULES),
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=cwd,
+    )
+    return result.stdout, json.loads(result.stderr.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--help"],
+        ["generate-ankiweb", "--help"],
+        ["create-deck", "--help"],
+        ["build", "--help"],
+        ["cache", "--help"],
+    ],
+)
+def test_help_does_not_import_heavy_modules(args):
+    _, heavy = _run_cli(args)
+
+    assert heavy == []
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+_CONTENT_DIR = (
+    Path(__file__).parent
+    / "content"
+    / "testdata"
+    / "test_content_generator"
+    / "test_ankiweb_description"
+)
+
+
+def _create_project(tmp_path):
+    """Create a git repository with a Spanish deck, its content and data."""
+    data_dir = tmp_path / "src" / "data"
+    shutil.copytree(
+        Path(__file__).parent.parent / "src" / "data" / "i18n", data_dir / "i18n"
+    )
+    (data_dir / "625_words-vocabulary.csv").write_text(
+        "key,clarification\nthe cat,\nthe dog,\n"
+    )
+    (data_dir / "625_words-base-es_es.csv").write_text(
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the cat,el gato,,[sound:cat.mp3],,AnkiLangs::ES\n"
+        "the dog,,,,,AnkiLangs::ES\n"
+    )
+    content_dir = tmp_path / "content"
+    shutil.copytree(_CONTENT_DIR, content_dir)
+    (tmp_path / "decks.yaml").write_text(
+        f"""decks:
+  en_to_es_625:
+    name: "Spanish (EN to ES) | 625 Words | AnkiLangs.org"
+    tag_name: "EN_to_ES_625_Words"
+    description_file: "description.html"
+    content_dir: "{content_dir}"
+    version: "0.3.0-dev"
+    ankiweb_id: "1234567890"
+    deck_type: "625"
+    source_locale: "en_us"
+    target_locale: "es_es"
+"""
+    )
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "Initial commit")
+    for tag in [
+        "EN_to_ES_625_Words/0.2.0",
+        "EN_to_ES_625_Words/0.3.0-dev",
+        "Other/1.0.0",
+    ]:
+        _git(tmp_path, "tag", tag)
+    csv2sqlite(data_dir, tmp_path / "data.db", force=True)
+
+
+@pytest.mark.parametrize(
+    "args, expected_output",
+    [
+        (["release", "--list"], "en_to_es_625"),
+        (["release", "--list", "--format", "json"], '"last_release": "0.2.0"'),
+        (
+            ["generate-website", "--all", "--output-dir", "website"],
+            "✓ Generated website/en-to-es-625/_index.md",
+        ),
+    ],
+)
+def test_lightweight_commands_do_not_import_heavy_modules(
+    tmp_path, capsys, args, expected_output
+):
+    """Pandas, the TTS client and the Excel libraries are only imported by the
+    commands that use them, which keeps the others fast to start."""
+    _create_project(tmp_path)
+    capsys.readouterr()
+
+    output, heavy = _run_cli(args, cwd=tmp_path)
+
+    assert expected_output in output
+    assert heavy == []
+
+
+def test_deck_list_as_json(tmp_path, monkeypatch, capsys):
+    _create_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    capsys.readouterr()
+
+    print_deck_list(DeckRegistry(tmp_path / "decks.yaml"), tmp_path / "data.db", "json")
+
+    assert json.loads(capsys.readouterr().out) == [
+        {
+            "deck_id": "en_to_es_625",
+            "deck_type": "625",
+            "version": "0.3.0-dev",
+            "last_release": "0.2.0",
+            "ankiweb_id": "1234567890",
+            "translated": 1,
+            "audio": 1,
+            "total": 2,
+        }
+    ]
+
+
+def test_website_pages_are_written_when_changed(tmp_path, capsys):
+    content_dir = tmp_path / "content"
+    shutil.copytree(_CONTENT_DIR, content_dir)
+    (tmp_path / "decks.yaml").write_text(
+        f"""decks:
+  en_to_es_625:
+    name: "Spanish (EN to ES) | 625 Words | AnkiLangs.org"
+    tag_name: "EN_to_ES_625_Words"
+    description_file: "description.html"
+    content_dir: "{content_dir}"
+    version: "0.3.0"
+    ankiweb_id: "1234567890"
+    deck_type: "625"
+    source_locale: "en_us"
+    target_locale: "es_es"
+"""
+    )
+    registry = DeckRegistry(tmp_path / "decks.yaml")
+    output_dir = tmp_path / "website"
+
+    generate_all_website_pages(registry, output_dir)
+    page = output_dir / "en-to-es-625" / "_index.md"
+    assert "# Spanish (EN to ES) | 625 Words" in page.read_text()
+    assert (output_dir / "en-to-es-625" / "screenshots").is_dir()
+    capsys.readouterr()
+
+    (content_dir / "description.md").write_text("A new description\n")
+    generate_all_website_pages(registry, output_dir)
+
+    output = capsys.readouterr().out
+    assert f"✓ Unchanged overview page: {output_dir / '_index.md'}" in output
+    assert f"✓ Generated {page}" in output
+    assert "Copied screenshots" not in output
+    assert "A new description" in page.read_text()
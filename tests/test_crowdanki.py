@@ -0,0 +1,199 @@
+"""Tests for building CrowdAnki decks from SQLite."""
+
+import json
+import shutil
+import sqlite3
+import sys
+
+from pathlib import Path
+
+from al_tools.cli import cli
+from al_tools.core import csv2sqlite
+from al_tools.crowdanki import build_decks, load_note_model
+from al_tools.registry import DeckRegistry
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def _create_project(tmp_path):
+    """Create a project with one English to Spanish deck."""
+    shutil.copytree(REPO_ROOT / "src" / "headers", tmp_path / "src" / "headers")
+    shutil.copytree(
+        REPO_ROOT / "src" / "note_models" / "vocabulary_en_to_es",
+        tmp_path / "src" / "note_models" / "vocabulary_en_to_es",
+    )
+    audio_dir = tmp_path / "src" / "media" / "audio" / "es_ES"
+    audio_dir.mkdir(parents=True)
+    (audio_dir / "al_es_es_el_gato.mp3").write_bytes(b"miau")
+    (audio_dir / ".DS_Store").write_bytes(b"")
+    imgs_dir = tmp_path / "src" / "media" / "imgs"
+    imgs_dir.mkdir()
+    (imgs_dir / "cat.webp").write_bytes(b"cat")
+
+    data_dir = tmp_path / "src" / "data"
+    data_dir.mkdir()
+    (data_dir / "625_words-vocabulary.csv").write_text(
+        "key,clarification\nthe cat,\nthe dog,\n"
+    )
+    (data_dir / "625_words-pictures.csv").write_text(
+        'key,picture,picture source\nthe cat,"<img src=""cat.webp"">",Someone (CC0)\n'
+    )
+    (data_dir / "625_words-base-en_us.csv").write_text(
+        "key,text:en,ipa:en,audio:en,audio source:en,tags:en\n"
+        "the cat,the cat,,,,AnkiLangs::EN\n"
+        "the dog,the dog,,,,AnkiLangs::EN\n"
+    )
+    (data_dir / "625_words-base-es_es.csv").write_text(
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the cat,el gato,/el ˈɡato/,[sound:al_es_es_el_gato.mp3],Google TTS,AnkiLangs::ES\n"
+        "the dog,el perro,,,,AnkiLangs::ES\n"
+    )
+    (data_dir / "625_words-from-en_us-to-es_es.csv").write_text(
+        "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+        "the cat,abc123,,,,,\n"
+        "the dog,,,,,,a dog\n"
+    )
+
+    (tmp_path / "description.html").write_text("<p>Learn Spanish</p>\n")
+    (tmp_path / "decks.yaml").write_text(
+        """decks:
+  en_to_es_625:
+    name: "Spanish (EN to ES) | 625 Words | AnkiLangs.org"
+    tag_name: "EN_to_ES_625_Words"
+    description_file: "description.html"
+    content_dir: "content"
+    version: "0.3.0"
+    ankiweb_id: "1234567890"
+    deck_type: "625"
+    source_locale: "en_us"
+    target_locale: "es_es"
+    crowdanki_uuid: "11111111-2222-3333-4444-555555555555"
+"""
+    )
+    csv2sqlite(data_dir, tmp_path / "data.db", force=True)
+    return data_dir
+
+
+def test_build_deck(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    data_dir = _create_project(tmp_path)
+
+    build_decks(DeckRegistry(Path("decks.yaml")), Path("data.db"), data_dir)
+
+    deck_dir = tmp_path / "build" / "EN_to_ES_625_Words"
+    deck_json = json.loads((deck_dir / "deck.json").read_text())
+    assert list(deck_json)[:3] == ["__type__", "children", "crowdanki_uuid"]
+    assert list(deck_json)[-4:] == ["media_files", "name", "note_models", "notes"]
+    assert deck_json["crowdanki_uuid"] == "11111111-2222-3333-4444-555555555555"
+    assert deck_json["desc"] == "<p>Learn Spanish</p>\n"
+    assert deck_json["name"] == "Spanish (EN to ES) | 625 Words | AnkiLangs.org"
+    assert deck_json["media_files"] == ["al_es_es_el_gato.mp3", "cat.webp"]
+    assert sorted(path.name for path in (deck_dir / "media").iterdir()) == [
+        "al_es_es_el_gato.mp3",
+        "cat.webp",
+    ]
+
+    note_model = deck_json["note_models"][0]
+    assert [field["name"] for field in note_model["flds"]][:3] == [
+        "Source Text",
+        "Target Text",
+        "Target IPA",
+    ]
+    cat, dog = deck_json["notes"]
+    assert cat["guid"] == "abc123"
+    assert cat["note_model_uuid"] == note_model["crowdanki_uuid"]
+    assert cat["tags"] == ["AnkiLangs::ES"]
+    assert cat["fields"][:6] == [
+        "the cat",
+        "el gato",
+        "/el ˈɡato/",
+        "[sound:al_es_es_el_gato.mp3]",
+        '<img src="cat.webp">',
+        "",
+    ]
+    assert len(cat["fields"]) == len(note_model["flds"])
+    assert dog["fields"][5] == "a dog"
+
+    # The new GUID is saved in the database
+    conn = sqlite3.connect(tmp_path / "data.db")
+    (guid,) = conn.execute(
+        "SELECT guid FROM translation_pair WHERE key = 'the dog'"
+    ).fetchone()
+    conn.close()
+    assert guid and dog["guid"] == guid
+
+
+def test_in_memory_builds_keep_new_guids(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    data_dir = _create_project(tmp_path)
+    deck_file = tmp_path / "build" / "EN_to_ES_625_Words" / "deck.json"
+
+    guids = []
+    for _ in range(2):
+        monkeypatch.setattr(sys, "argv", ["al-tools", "build", "--in-memory"])
+        cli()
+        notes = json.loads(deck_file.read_text())["notes"]
+        guids.append([note["guid"] for note in notes])
+
+    assert guids[0] == guids[1]
+    assert guids[0][0] == "abc123" and guids[0][1]
+    pair_file = data_dir / "625_words-from-en_us-to-es_es.csv"
+    assert f"the dog,{guids[0][1]}," in pair_file.read_text()
+
+
+def test_unchanged_decks_are_not_rewritten(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    data_dir = _create_project(tmp_path)
+    registry = DeckRegistry(Path("decks.yaml"))
+    build_decks(registry, Path("data.db"), data_dir)
+    deck_file = tmp_path / "build" / "EN_to_ES_625_Words" / "deck.json"
+    content = deck_file.read_text()
+    capsys.readouterr()
+
+    build_decks(registry, Path("data.db"), data_dir)
+
+    assert deck_file.read_text() == content
+    assert f"{Path('build/EN_to_ES_625_Words/deck.json')} unchanged, 0 media" in (
+        capsys.readouterr().out
+    )
+
+
+def test_load_note_model_splits_card_templates():
+    note_model = load_note_model(
+        REPO_ROOT / "src" / "note_models" / "vocabulary_en_to_es"
+    )
+
+    html = (
+        REPO_ROOT / "src" / "note_models" / "vocabulary_en_to_es" / "reading.html"
+    ).read_text()
+    reading = next(t for t in note_model["tmpls"] if t["name"] == "Reading")
+    assert reading["qfmt"] + "\n\n--\n\n" + reading["afmt"] == html
+    assert list(note_model) == sorted(note_model)
+
+
+def test_parallel_build_matches_serial_build(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    data_dir = _create_project(tmp_path)
+    registry_file = tmp_path / "decks.yaml"
+    # A second deck of the same pair, so that both workers get a deck
+    registry_file.write_text(
+        registry_file.read_text()
+        + registry_file.read_text()
+        .split("\n", 1)[1]
+        .replace("en_to_es_625:", "en_to_es_625_copy:")
+        .replace("EN_to_ES_625_Words", "EN_to_ES_625_Copy")
+    )
+    registry = DeckRegistry(Path("decks.yaml"))
+    build_decks(registry, Path("data.db"), data_dir, Path("serial"))
+    capsys.readouterr()
+
+    build_decks(registry, Path("data.db"), data_dir, Path("parallel"), jobs=2)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith(f"{Path('parallel/EN_to_ES_625_Words/deck.json')} ")
+    assert lines[1].startswith(f"{Path('parallel/EN_to_ES_625_Copy/deck.json')} ")
+    assert "2 job(s)" in lines[-1]
+    for tag_name in ["EN_to_ES_625_Words", "EN_to_ES_625_Copy"]:
+        assert (tmp_path / "parallel" / tag_name / "deck.json").read_text() == (
+            tmp_path / "serial" / tag_name / "deck.json"
+        ).read_text()
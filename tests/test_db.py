@@ -0,0 +1,132 @@
+"""Tests for the shared SQLite connections in al_tools.db."""
+
+import sqlite3
+
+import pytest
+
+from al_tools import db
+from al_tools.core import (
+    ambiguity_detection,
+    csv2sqlite,
+    generate_joined_source_fields,
+    load_in_memory,
+    sqlite2csv,
+)
+
+
+def test_session_shares_one_configured_connection(tmp_path):
+    db_path = tmp_path / "test.db"
+
+    with db.session():
+        conn = db.connect(db_path)
+        db.close(conn)
+        assert db.connect(tmp_path / "." / "test.db") is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert conn.execute("PRAGMA foreign_keys").fetchone() == (1,)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_connections_outside_a_session_are_closed(tmp_path):
+    conn = db.connect(tmp_path / "test.db")
+    db.close(conn)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_close_rolls_back_uncommitted_changes(tmp_path):
+    db_path = tmp_path / "test.db"
+
+    with db.session():
+        conn = db.connect(db_path)
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+        db.close(conn)
+
+        assert db.connect(db_path).execute("SELECT * FROM t").fetchall() == []
+
+
+def test_read_only_connection_does_not_write(tmp_path):
+    db_path = tmp_path / "test.db"
+    conn = db.connect(db_path)
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    db.close(conn)
+
+    conn = db.connect_read_only(db_path)
+    assert conn.execute("SELECT * FROM t").fetchall() == []
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+
+def _create_data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "625_words-base-en_us.csv").write_text(
+        "key,text:en,ipa:en,audio:en,audio source:en,tags:en\n"
+        "the cat,the cat,,,Me,AnkiLangs::EN\n"
+    )
+    (data_dir / "625_words-base-es_es.csv").write_text(
+        "key,text:es,ipa:es,audio:es,audio source:es,tags:es\n"
+        "the cat,el gato,,,You,AnkiLangs::ES\n"
+    )
+    # Missing pair entries are inserted by generate
+    (data_dir / "625_words-from-en_us-to-es_es.csv").write_text(
+        "key,guid,pronunciation hint,spelling hint,reading hint,listening hint,notes\n"
+    )
+    return data_dir
+
+
+def test_commands_share_the_session_connection(tmp_path):
+    """A whole pipeline runs on one connection, which keeps its configuration."""
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+
+    with db.session():
+        csv2sqlite(data_dir, db_path, force=True)
+        generate_joined_source_fields(db_path, tmp_path / "generated", data_dir)
+        sqlite2csv(db_path, data_dir, force=True)
+
+        conn = db.connect(db_path)
+        # The PRAGMAs of the bulk load don't outlive the import
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert conn.execute("PRAGMA foreign_keys").fetchone() == (1,)
+        assert conn.execute(
+            "SELECT key, source_locale, target_locale FROM translation_pair"
+        ).fetchall() == [("the cat", "en_us", "es_es")]
+
+    assert (
+        tmp_path / "generated" / "625_words-from-en_us-to-es_es.csv"
+    ).read_text() == "key,source\nthe cat,Audio:<br>You\n"
+
+
+def test_in_memory_database_leaves_file_untouched(tmp_path):
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+
+    with db.session():
+        load_in_memory(data_dir, db_path)
+        assert ambiguity_detection(db_path, data_dir, media_dir=None) == ""
+        conn = db.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM base_language").fetchone() == (2,)
+
+    assert not db_path.exists()
+
+
+def test_saved_in_memory_database_is_up_to_date(tmp_path):
+    data_dir = _create_data_dir(tmp_path)
+    db_path = tmp_path / "test.db"
+
+    with db.session():
+        load_in_memory(data_dir, db_path)
+        db.save_in_memory(db_path)
+
+    # Would prompt (and fail reading stdin) if the database was out of date
+    assert ambiguity_detection(db_path, data_dir, media_dir=None) == ""
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM base_language").fetchone() == (2,)
+    conn.close()
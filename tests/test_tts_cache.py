@@ -0,0 +1,74 @@
+"""Tests for the TTS audio cache."""
+
+import os
+
+from al_tools.tts_cache import TtsCache, cache_key
+from google.cloud import texttospeech as tts
+
+
+def _key(text: str, voice_name: str = "en-US-Studio-O") -> str:
+    return cache_key(
+        tts.VoiceSelectionParams(language_code="en-US", name=voice_name),
+        tts.SynthesisInput(text=text),
+        tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3),
+    )
+
+
+def test_key_depends_on_voice_and_text():
+    assert _key("the cat") == _key("the cat")
+    assert _key("the cat") != _key("the dog")
+    assert _key("the cat") != _key("the cat", voice_name="en-US-Studio-Q")
+
+
+def test_key_distinguishes_ssml_from_text():
+    voice = tts.VoiceSelectionParams(language_code="en-US", name="en-US-Studio-O")
+    config = tts.AudioConfig(audio_encoding=tts.AudioEncoding.MP3)
+    text = "<speak>the cat</speak>"
+    assert cache_key(voice, tts.SynthesisInput(text=text), config) != cache_key(
+        voice, tts.SynthesisInput(ssml=text), config
+    )
+
+
+def test_get_returns_stored_audio(tmp_path):
+    cache = TtsCache(tmp_path)
+    assert cache.get(_key("the cat")) is None
+
+    cache.put(_key("the cat"), b"cat-audio")
+
+    assert cache.get(_key("the cat")) == b"cat-audio"
+    assert cache.stats().entries == 1
+    assert cache.stats().total_bytes == len(b"cat-audio")
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = TtsCache(tmp_path)
+    for i, text in enumerate(["the cat", "the dog", "the bird"]):
+        cache.put(_key(text), b"x" * 100)
+        path = next(tmp_path.glob(f"*/{_key(text)}.mp3"))
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+
+    # Reading "the cat" makes it the most recently used entry
+    cache.get(_key("the cat"))
+    removed, freed = cache.prune(max_bytes=200)
+
+    assert (removed, freed) == (1, 100)
+    assert cache.get(_key("the dog")) is None
+    assert cache.get(_key("the cat")) is not None
+    assert cache.get(_key("the bird")) is not None
+
+
+def test_put_keeps_cache_below_limit(tmp_path):
+    cache = TtsCache(tmp_path, max_bytes=250)
+    for text in ["the cat", "the dog", "the bird"]:
+        cache.put(_key(text), b"x" * 100)
+
+    assert cache.stats().total_bytes <= 250
+
+
+def test_putting_a_key_again_replaces_its_size(tmp_path):
+    cache = TtsCache(tmp_path)
+    for _ in range(3):
+        cache.put(_key("the cat"), b"x" * 100)
+    cache.put(_key("the dog"), b"x" * 50)
+
+    assert cache.stats().total_bytes == cache._total_bytes == 150